@@ -0,0 +1,31 @@
+"""
+Helpers shared by the benchmarks
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from mpi4py import MPI
+
+def get_parser(description):
+  """ Return an argument parser including the options common to the benchmarks :
+  -o/--output_dir and -r/--repeat """
+  parser = argparse.ArgumentParser(description=description)
+  parser.add_argument('-o', '--output_dir', type=Path, default=Path('.'), help='directory where files are written')
+  parser.add_argument('-r', '--repeat', type=int, default=3, help='number of repetitions for each measure')
+  return parser
+
+def timed(func, comm, repeat, cleanup=None):
+  """ Return the min time (over repetitions) of the slowest rank to execute func().
+  If provided, cleanup() is called by all the ranks after each repetition, out of the measure """
+  timings = []
+  for i in range(repeat):
+    comm.barrier()
+    start = time.perf_counter()
+    func()
+    comm.barrier()
+    timings.append(comm.allreduce(time.perf_counter() - start, MPI.MAX))
+    if cleanup is not None:
+      cleanup()
+  return min(timings)
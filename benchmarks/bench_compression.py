@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""
+Compare the file size and the throughput of distributed IO using several
+dataset creation policies.
+
+A mesh is generated with generate_dist_block and some smooth fields are added,
+then the tree is written (collectively) and read using each policy.
+Usage : mpirun -np 4 python bench_compression.py -n 80 -o /path/to/scratch
+"""
+
+import os
+
+import numpy as np
+from mpi4py import MPI
+
+import maia
+import maia.pytree        as PT
+import maia.pytree.maia   as MT
+import maia.utils.logging as mlog
+
+from _utils import get_parser, timed
+
+comm = MPI.COMM_WORLD
+
+parser = get_parser('Benchmark dataset creation policies')
+parser.add_argument('-n', '--n_vtx', type=int, default=80, help='number of vertices per direction')
+parser.add_argument('-e', '--elt_kind', default='Poly', help='kind of elements of the generated mesh')
+parser.add_argument('-f', '--n_fields', type=int, default=5, help='number of fields to add')
+args = parser.parse_args()
+
+fields_policy = lambda options : {'FlowSolution_t' : options}
+policies = {'contiguous' : None,
+            'chunked'    : fields_policy({'chunks' : True}),
+            'lzf'        : fields_policy({'shuffle' : True, 'compression' : 'lzf'}),
+            'gzip'       : fields_policy({'shuffle' : True, 'compression' : 'gzip'}),
+            'gzip+trunc' : fields_policy({'shuffle' : True, 'compression' : 'gzip', 'keep_bits' : 20})}
+
+dist_tree = maia.factory.generate_dist_block(args.n_vtx, args.elt_kind, comm)
+zone = PT.get_node_from_label(dist_tree, 'Zone_t')
+cx, cy, cz = PT.Zone.coordinates(zone)
+fields = {f'Field{i}' : np.sin((i+1)*cx) * np.cos(cy + i*cz) for i in range(args.n_fields)}
+PT.new_FlowSolution('FlowSolution', loc='Vertex', fields=fields, parent=zone)
+data_size = comm.allreduce(MT.metrics.dtree_nbytes(dist_tree)[2], MPI.SUM)
+
+if comm.Get_rank() == 0:
+  print(f"Tree size : {mlog.bsize_to_str(data_size)}")
+  print(f"{'policy':>12} {'file size':>10} {'write':>10} {'read':>10} {'write bw':>12} {'read bw':>12}")
+
+for name, policy in policies.items():
+  filename = str(args.output_dir / f'bench_compression_{name}.cgns')
+  t_write = timed(lambda: maia.io.dist_tree_to_file(dist_tree, filename, comm, collective=True, policy=policy),
+                  comm, args.repeat)
+  t_read  = timed(lambda: maia.io.file_to_dist_tree(filename, comm, collective=True), comm, args.repeat)
+  if comm.Get_rank() == 0:
+    file_size = os.path.getsize(filename)
+    print(f"{name:>12} {mlog.bsize_to_str(file_size):>10} {t_write:>9.3f}s {t_read:>9.3f}s "
+          f"{mlog.bsize_to_str(data_size/t_write):>10}/s {mlog.bsize_to_str(data_size/t_read):>10}/s")
+    os.remove(filename)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""
+Compare independent and collective writes of distributed trees.
+
+Meshes of increasing size are generated with generate_dist_block, then written
+with dist_tree_to_file using both modes.
+Usage : mpirun -np 4 python bench_dist_tree_write.py -n 20 40 80 -o /path/to/scratch
+"""
+
+import os
+
+from mpi4py import MPI
+
+import maia
+import maia.pytree.maia   as MT
+import maia.utils.logging as mlog
+
+from _utils import get_parser, timed
+
+comm = MPI.COMM_WORLD
+
+parser = get_parser('Benchmark independent vs collective distributed writes')
+parser.add_argument('-n', '--n_vtx', type=int, nargs='+', default=[20, 40, 80], help='number of vertices per direction')
+parser.add_argument('-e', '--elt_kind', default='Poly', help='kind of elements of the generated meshes')
+parser.add_argument('--cb_nodes', type=int, help='cb_nodes hint used in collective mode')
+parser.add_argument('--cb_buffer_size', type=int, help='cb_buffer_size hint used in collective mode')
+parser.add_argument('--striping_factor', type=int, help='striping_factor hint used in collective mode')
+parser.add_argument('--striping_unit', type=int, help='striping_unit hint used in collective mode')
+args = parser.parse_args()
+
+hint_keys = ['cb_nodes', 'cb_buffer_size', 'striping_factor', 'striping_unit']
+hints = {key : getattr(args, key) for key in hint_keys if getattr(args, key) is not None}
+
+def timed_write(dist_tree, filename, collective):
+  """ Return the min time (over repetitions) of the slowest rank """
+  def cleanup():
+    if comm.Get_rank() == 0:
+      os.remove(filename)
+  write = lambda: maia.io.dist_tree_to_file(dist_tree, filename, comm, collective=collective, hints=hints)
+  return timed(write, comm, args.repeat, cleanup)
+
+if comm.Get_rank() == 0:
+  print(f"{'n_vtx':>6} {'size':>10} {'independent':>12} {'collective':>12} {'speedup':>8}")
+
+for n_vtx in args.n_vtx:
+  dist_tree = maia.factory.generate_dist_block(n_vtx, args.elt_kind, comm)
+  data_size = comm.allreduce(MT.metrics.dtree_nbytes(dist_tree)[2], MPI.SUM)
+  filename  = str(args.output_dir / f'bench_write_{n_vtx}.cgns')
+
+  t_indep = timed_write(dist_tree, filename, collective=False)
+  t_coll  = timed_write(dist_tree, filename, collective=True)
+
+  if comm.Get_rank() == 0:
+    print(f"{n_vtx:>6} {mlog.bsize_to_str(data_size):>10} {t_indep:>11.3f}s {t_coll:>11.3f}s {t_indep/t_coll:>8.2f}")
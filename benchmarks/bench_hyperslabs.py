@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Measure the effect of hyperslab coalescing when reading structured blocks.
+
+A structured block is generated with generate_dist_block and written. Then, the block
+is split along the three directions (one sub block per rank) and each rank reads
+the coordinates of its sub block, described line by line by a combined filter.
+The number of selected hyperslabs and the read times are reported with and
+without coalescing of the slabs.
+Usage : mpirun -np 8 python bench_hyperslabs.py -n 50 100 -o /path/to/scratch
+"""
+
+import os
+
+import numpy as np
+from mpi4py import MPI
+
+import maia
+import maia.pytree as PT
+from maia.io.hdf import _hdf_cgns as HCG
+from maia.io.hdf.hdf_dataspace import coalesce_slabs
+
+from _utils import get_parser, timed
+
+comm = MPI.COMM_WORLD
+
+parser = get_parser('Benchmark hyperslab coalescing')
+parser.add_argument('-n', '--n_vtx', type=int, nargs='+', default=[50, 100], help='number of vertices per direction')
+args = parser.parse_args()
+
+def sub_block_filter(n_vtx):
+  """ Filter reading the sub block of the current rank, one slab per line """
+  dims = MPI.Compute_dims(comm.Get_size(), 3)
+  coords = np.unravel_index(comm.Get_rank(), dims, order='F')
+  bounds = [np.linspace(0, n_vtx, n+1).astype(int)[c:c+2] for n, c in zip(dims, coords)]
+  (iS, iE), (jS, jE), (kS, kE) = bounds
+  slabs = []
+  for k in range(kS, kE):
+    for j in range(jS, jE):
+      slabs.extend([[iS,j,k], [1,1,1], [iE-iS,1,1], [1,1,1]])
+  dn = (iE-iS)*(jE-jS)*(kE-kS)
+  return [[0], [1], [dn], [1], slabs, [n_vtx]*3, [0]]
+
+def timed_read(filename, path, filter):
+  """ Return the min time (over repetitions) of the slowest rank """
+  def read():
+    with HCG.FileHandle(filename) as hdf_file:
+      HCG.load_data_partial(hdf_file.open(path), filter)
+  return timed(read, comm, args.repeat)
+
+if comm.Get_rank() == 0:
+  print(f"{'n_vtx':>6} {'slabs':>10} {'coalesced':>10} {'raw read':>10} {'coalesced read':>15}")
+
+for n_vtx in args.n_vtx:
+  dist_tree = maia.factory.generate_dist_block(n_vtx, 'S', comm)
+  filename  = str(args.output_dir / f'bench_hyperslabs_{n_vtx}.cgns')
+  maia.io.dist_tree_to_file(dist_tree, filename, comm)
+  path = PT.predicates_to_paths(dist_tree, 'CGNSBase_t/Zone_t/GridCoordinates_t/CoordinateX')[0]
+
+  filter = sub_block_filter(n_vtx)
+  n_slabs     = comm.allreduce(len(filter[4]) // 4, MPI.MAX)
+  n_coalesced = comm.allreduce(len(coalesce_slabs(filter[4])) // 4, MPI.MAX)
+
+  HCG.coalesce_slabs = lambda slabs: slabs # Disable coalescing
+  t_raw = timed_read(filename, path, filter)
+  HCG.coalesce_slabs = coalesce_slabs
+  t_coalesced = timed_read(filename, path, filter)
+
+  if comm.Get_rank() == 0:
+    print(f"{n_vtx:>6} {n_slabs:>10} {n_coalesced:>10} {t_raw:>9.3f}s {t_coalesced:>14.3f}s")
+    os.remove(filename)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+Compare the strategies available to write partitioned trees.
+
+Meshes of increasing size are generated with generate_dist_block and partitioned,
+then written with part_tree_to_file using links (one file per rank), a single file
+written rank by rank, and a single file written concurrently by all the ranks.
+Usage : mpirun -np 4 python bench_save_part_tree.py -n 20 40 80 -o /path/to/scratch
+"""
+
+import os
+import glob
+
+from mpi4py import MPI
+
+import maia
+import maia.pytree.maia   as MT
+import maia.utils.logging as mlog
+
+from _utils import get_parser, timed
+
+comm = MPI.COMM_WORLD
+
+parser = get_parser('Benchmark the write of partitioned trees')
+parser.add_argument('-n', '--n_vtx', type=int, nargs='+', default=[20, 40, 80], help='number of vertices per direction')
+parser.add_argument('-e', '--elt_kind', default='Poly', help='kind of elements of the generated meshes')
+parser.add_argument('-p', '--n_part', type=int, default=1, help='number of partitions per rank')
+args = parser.parse_args()
+
+modes = {'links'    : {'single_file' : False},
+         'serial'   : {'single_file' : True, 'parallel' : False},
+         'parallel' : {'single_file' : True, 'parallel' : True}}
+
+def timed_write(part_tree, filename, options):
+  """ Return the min time (over repetitions) of the slowest rank """
+  def cleanup():
+    if comm.Get_rank() == 0:
+      base_name, extension = os.path.splitext(filename)
+      for f in [filename] + glob.glob(base_name + '_sub_*' + extension):
+        os.remove(f)
+  return timed(lambda: maia.io.part_tree_to_file(part_tree, filename, comm, **options), comm, args.repeat, cleanup)
+
+if comm.Get_rank() == 0:
+  print(f"{'n_vtx':>6} {'size':>10} " + " ".join([f"{mode:>10}" for mode in modes]))
+
+for n_vtx in args.n_vtx:
+  dist_tree = maia.factory.generate_dist_block(n_vtx, args.elt_kind, comm)
+  zone_to_parts = maia.factory.partitioning.compute_regular_weights(dist_tree, comm, args.n_part)
+  part_tree = maia.factory.partition_dist_tree(dist_tree, comm, zone_to_parts=zone_to_parts)
+  data_size = comm.allreduce(MT.metrics.dtree_nbytes(dist_tree)[2], MPI.SUM)
+  filename  = str(args.output_dir / f'bench_part_{n_vtx}.cgns')
+
+  timings = [timed_write(part_tree, filename, options) for options in modes.values()]
+
+  if comm.Get_rank() == 0:
+    print(f"{n_vtx:>6} {mlog.bsize_to_str(data_size):>10} " + " ".join([f"{t:>9.3f}s" for t in timings]))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+Measure the memory allocated when transferring structured fields from the partitioned
+tree to the distributed tree.
+
+A structured cube is generated with generate_dist_block and partitioned. On each partition,
+fields are set as non contiguous views of a larger array including ghost cells (as a
+solver would provide them), then transferred with part_tree_to_dist_tree_all. The peak of
+the memory allocated during the transfer (tracemalloc, max over the ranks) is reported
+for the current exchange and for the former one, which flattened each field before packing it.
+Usage : mpirun -np 4 python bench_struct_transfer.py -n 50 100 -f 5
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+from mpi4py import MPI
+
+import maia
+import maia.pytree as PT
+from maia.transfer import protocols as EP
+
+comm = MPI.COMM_WORLD
+
+parser = argparse.ArgumentParser(description='Benchmark the memory footprint of structured transfers')
+parser.add_argument('-n', '--n_vtx', type=int, nargs='+', default=[50, 100], help='number of vertices per direction')
+parser.add_argument('-f', '--n_field', type=int, default=5, help='number of vertex fields')
+parser.add_argument('-g', '--n_ghost', type=int, default=2, help='number of ghost layers of the solver arrays')
+args = parser.parse_args()
+
+def _flatten_interlace(arrays):
+  """ Former packing : all the fields were flattened (thus copied if non contiguous)
+  when collected from the partitioned tree, then packed """
+  flat_arrays = [array.ravel(order='F') for array in arrays]
+  n_field = len(flat_arrays)
+  packed = np.empty((flat_arrays[0].size, n_field), flat_arrays[0].dtype)
+  for j, array in enumerate(flat_arrays):
+    packed[:,j] = array
+  return packed.reshape(-1)
+
+def add_ghosted_fields(part_tree):
+  """ Add vertex fields, as views excluding the ghost layers of larger Fortran arrays """
+  g = args.n_ghost
+  for zone in PT.get_all_Zone_t(part_tree):
+    shape = PT.Zone.VertexSize(zone)
+    sol = PT.new_FlowSolution('FlowSolution', loc='Vertex', parent=zone)
+    for i in range(args.n_field):
+      ghosted = np.ones([n + 2*g for n in shape], order='F')
+      PT.new_DataArray(f'Field{i}', ghosted[g:-g, g:-g, g:-g], parent=sol)
+
+def measure(dist_tree, part_tree):
+  """ Return the peak of allocated memory and the time of the transfer (max over the ranks) """
+  comm.barrier()
+  tracemalloc.start()
+  start = time.perf_counter()
+  maia.transfer.part_tree_to_dist_tree_only_labels(dist_tree, part_tree, ['FlowSolution_t'], comm)
+  elapsed = time.perf_counter() - start
+  _, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  return comm.allreduce(peak, MPI.MAX), comm.allreduce(elapsed, MPI.MAX)
+
+if comm.Get_rank() == 0:
+  print(f"{'n_vtx':>6} {'field size':>12} {'former peak':>12} {'peak':>12} {'former time':>12} {'time':>10}")
+
+for n_vtx in args.n_vtx:
+  dist_tree = maia.factory.generate_dist_block(n_vtx, 'S', comm)
+  part_tree = maia.factory.partition_dist_tree(dist_tree, comm)
+  add_ghosted_fields(part_tree)
+  field_size = comm.allreduce(max([PT.Zone.n_vtx(z) for z in PT.get_all_Zone_t(part_tree)]) * 8, MPI.MAX)
+
+  interlace = EP._interlace
+  EP._interlace = _flatten_interlace
+  former_peak, former_time = measure(dist_tree, part_tree)
+  EP._interlace = interlace
+  peak, elapsed = measure(dist_tree, part_tree)
+
+  if comm.Get_rank() == 0:
+    size_to_str = maia.utils.logging.bsize_to_str
+    print(f"{n_vtx:>6} {size_to_str(field_size):>12} {size_to_str(former_peak):>12} {size_to_str(peak):>12} "
+          f"{former_time:>11.3f}s {elapsed:>9.3f}s")
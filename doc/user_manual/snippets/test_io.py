@@ -34,6 +34,51 @@ def test_file_to_dist_tree_filter():
   fill_size_tree(dist_tree, "tree.cgns", MPI.COMM_WORLD)
   #file_to_dist_tree_filter@end
 
+def test_ensure_loaded():
+  #ensure_loaded@start
+  from mpi4py import MPI
+  import maia
+
+  dist_tree = maia.factory.generate_dist_block(10, "Poly", MPI.COMM_WORLD)
+  zone = maia.pytree.get_node_from_label(dist_tree, 'Zone_t')
+  cx = maia.pytree.get_node_from_name(zone, 'CoordinateX')[1]
+  maia.pytree.new_FlowSolution('FlowSolution', loc='Vertex', fields={'CX' : cx}, parent=zone)
+  maia.io.dist_tree_to_file(dist_tree, "tree.cgns", MPI.COMM_WORLD)
+
+  dist_tree = maia.io.file_to_dist_tree("tree.cgns", MPI.COMM_WORLD, lazy=True)
+  # Fields are read only when needed
+  maia.io.ensure_loaded(dist_tree, 'CGNSBase_t/Zone_t/FlowSolution_t')
+  #ensure_loaded@end
+
+def test_append_dist_tree_to_file():
+  #append_dist_tree_to_file@start
+  from mpi4py import MPI
+  import maia
+
+  dist_tree = maia.factory.generate_dist_block(10, "Poly", MPI.COMM_WORLD)
+  maia.io.dist_tree_to_file(dist_tree, "unsteady.cgns", MPI.COMM_WORLD)
+
+  zone = maia.pytree.get_node_from_label(dist_tree, 'Zone_t')
+  cx = maia.pytree.get_node_from_name(zone, 'CoordinateX')[1]
+  for it in range(3):
+    fields = {'Field' : it * cx}
+    maia.pytree.new_FlowSolution(f'FlowSolution#{it}', loc='Vertex', fields=fields, parent=zone)
+    # Only the new solution is written
+    maia.io.append_dist_tree_to_file(dist_tree, "unsteady.cgns", MPI.COMM_WORLD,
+                                     include=[f'*/*/FlowSolution#{it}'])
+  #append_dist_tree_to_file@end
+
+def test_dist_tree_to_file_async():
+  #dist_tree_to_file_async@start
+  from mpi4py import MPI
+  import maia
+
+  dist_tree = maia.factory.generate_dist_block(10, "Poly", MPI.COMM_WORLD)
+  handle = maia.io.dist_tree_to_file_async(dist_tree, "tree.cgns", MPI.COMM_WORLD)
+  # dist_tree can be modified here, while the write is in progress
+  handle.wait()
+  #dist_tree_to_file_async@end
+
 def test_save_part_tree():
   #save_part_tree@start
   from mpi4py import MPI
@@ -45,6 +90,36 @@ def test_save_part_tree():
   maia.io.part_tree_to_file(part_tree, 'part_tree.cgns', MPI.COMM_WORLD)
   #save_part_tree@end
 
+def test_load_part_tree():
+  #load_part_tree@start
+  from mpi4py import MPI
+  import maia
+
+  dist_tree = maia.factory.generate_dist_block(10, "Poly", MPI.COMM_WORLD)
+  part_tree = maia.factory.partition_dist_tree(dist_tree, MPI.COMM_WORLD)
+  maia.io.part_tree_to_file(part_tree, 'part_tree.cgns', MPI.COMM_WORLD, single_file=True)
+
+  # Restart, possibly with another number of processes
+  part_tree = maia.io.load_part_tree('part_tree.cgns', MPI.COMM_WORLD)
+  #load_part_tree@end
+
+def test_file_to_part_tree():
+  #file_to_part_tree@start
+  from mpi4py import MPI
+  import maia
+
+  dist_tree = maia.factory.generate_dist_block(10, "Poly", MPI.COMM_WORLD)
+  zone = maia.pytree.get_node_from_label(dist_tree, 'Zone_t')
+  cx = maia.pytree.get_node_from_name(zone, 'CoordinateX')[1]
+  maia.pytree.new_FlowSolution('FlowSolution', loc='Vertex', fields={'CX' : cx}, parent=zone)
+  maia.io.dist_tree_to_file(dist_tree, "solution.cgns", MPI.COMM_WORLD)
+
+  part_tree = maia.factory.partition_dist_tree(dist_tree, MPI.COMM_WORLD)
+  # Read the solution directly into the partitions
+  maia.io.file_to_part_tree("solution.cgns", part_tree, MPI.COMM_WORLD,
+                            include=['*/*/FlowSolution'])
+  #file_to_part_tree@end
+
 def test_write_tree():
   #write_tree@start
   from mpi4py import MPI
@@ -94,3 +94,131 @@ def test_dist_tree_to_part_tree_only_labels():
   assert PT.get_node_from_path(zone, 'ZoneBC/Bnd2/BCDataSet/DirichletData/TutuZ') is not None
   #dist_tree_to_part_tree_only_labels@end
 
+
+def test_transfer_context():
+  #TransferContext@start
+  from mpi4py import MPI
+  import os
+  import maia
+  from   maia.utils.test_utils import sample_mesh_dir
+
+  comm = MPI.COMM_WORLD
+  filename = os.path.join(sample_mesh_dir, 'quarter_crown_square_8.yaml')
+  dist_tree = maia.io.file_to_dist_tree(filename, comm)
+  part_tree = maia.factory.partition_dist_tree(dist_tree, comm)
+
+  with maia.transfer.TransferContext(comm):
+    for it in range(3):
+      maia.transfer.dist_tree_to_part_tree_only_labels(dist_tree, part_tree, ['FlowSolution_t'], comm)
+      # ... compute ...
+      maia.transfer.part_tree_to_dist_tree_only_labels(dist_tree, part_tree, ['FlowSolution_t'], comm)
+  #TransferContext@end
+
+def test_transfer_stats():
+  #TransferStats@start
+  from mpi4py import MPI
+  import os
+  import maia
+  from   maia.utils.test_utils import sample_mesh_dir
+
+  comm = MPI.COMM_WORLD
+  filename = os.path.join(sample_mesh_dir, 'quarter_crown_square_8.yaml')
+  dist_tree = maia.io.file_to_dist_tree(filename, comm)
+  part_tree = maia.factory.partition_dist_tree(dist_tree, comm)
+
+  with maia.transfer.TransferStats(comm) as stats:
+    maia.transfer.dist_tree_to_part_tree_all(dist_tree, part_tree, comm)
+    maia.transfer.part_tree_to_dist_tree_all(dist_tree, part_tree, comm)
+  stats.report()
+  #TransferStats@end
+
+def test_idist_tree_to_part_tree_all():
+  #idist_tree_to_part_tree_all@start
+  from mpi4py import MPI
+  import os
+  import maia
+  import maia.pytree as PT
+  from   maia.utils.test_utils import sample_mesh_dir
+
+  filename = os.path.join(sample_mesh_dir, 'quarter_crown_square_8.yaml')
+  dist_tree = maia.io.file_to_dist_tree(filename, MPI.COMM_WORLD)
+  part_tree = maia.factory.partition_dist_tree(dist_tree, MPI.COMM_WORLD)
+  request = maia.transfer.idist_tree_to_part_tree_all(dist_tree, part_tree, MPI.COMM_WORLD)
+  # ... do some work not involving the transferred fields ...
+  request.wait()
+
+  zone = PT.get_all_Zone_t(part_tree)[0]
+  assert PT.get_node_from_path(zone, 'FlowSolution/DataX') is not None
+  assert PT.get_node_from_path(zone, 'ZoneBC/Bnd2/BCDataSet/DirichletData/TutuZ') is not None
+
+  for array in PT.get_nodes_from_label(zone, 'DataArray_t'):
+    array[1] = 2 * array[1]
+  maia.transfer.ipart_tree_to_dist_tree_all(dist_tree, part_tree, MPI.COMM_WORLD).wait()
+  #idist_tree_to_part_tree_all@end
+
+def test_part_tree_to_part_tree_all():
+  #part_tree_to_part_tree_all@start
+  from mpi4py import MPI
+  import os
+  import maia
+  import maia.pytree as PT
+  from   maia.utils.test_utils import sample_mesh_dir
+
+  comm = MPI.COMM_WORLD
+  filename = os.path.join(sample_mesh_dir, 'quarter_crown_square_8.yaml')
+  dist_tree = maia.io.file_to_dist_tree(filename, comm)
+  src_tree = maia.factory.partition_dist_tree(dist_tree, comm)
+  maia.transfer.dist_tree_to_part_tree_all(dist_tree, src_tree, comm)
+
+  zone_to_parts = maia.factory.partitioning.compute_regular_weights(dist_tree, comm, 2)
+  tgt_tree = maia.factory.partition_dist_tree(dist_tree, comm, zone_to_parts=zone_to_parts)
+  maia.transfer.part_tree_to_part_tree_all(src_tree, tgt_tree, comm)
+
+  for zone in PT.get_all_Zone_t(tgt_tree):
+    assert PT.get_node_from_path(zone, 'FlowSolution/DataX') is not None
+  #part_tree_to_part_tree_all@end
+
+def test_part_tree_to_part_tree_only_labels():
+  #part_tree_to_part_tree_only_labels@start
+  from mpi4py import MPI
+  import os
+  import maia
+  import maia.pytree as PT
+  from   maia.utils.test_utils import sample_mesh_dir
+
+  comm = MPI.COMM_WORLD
+  filename = os.path.join(sample_mesh_dir, 'quarter_crown_square_8.yaml')
+  dist_tree = maia.io.file_to_dist_tree(filename, comm)
+  src_tree = maia.factory.partition_dist_tree(dist_tree, comm)
+  maia.transfer.dist_tree_to_part_tree_all(dist_tree, src_tree, comm)
+
+  zone_to_parts = maia.factory.partitioning.compute_regular_weights(dist_tree, comm, 2)
+  tgt_tree = maia.factory.partition_dist_tree(dist_tree, comm, zone_to_parts=zone_to_parts)
+  maia.transfer.part_tree_to_part_tree_only_labels(src_tree, tgt_tree, ['FlowSolution_t'], comm)
+
+  for zone in PT.get_all_Zone_t(tgt_tree):
+    assert PT.get_node_from_path(zone, 'FlowSolution/DataX') is not None
+    assert PT.get_node_from_path(zone, 'ZoneSubRegion/Tata') is None
+  #part_tree_to_part_tree_only_labels@end
+
+def test_transfer_sync():
+  #TransferSync@start
+  from mpi4py import MPI
+  import os
+  import maia
+  import maia.pytree as PT
+  from   maia.utils.test_utils import sample_mesh_dir
+
+  comm = MPI.COMM_WORLD
+  filename = os.path.join(sample_mesh_dir, 'quarter_crown_square_8.yaml')
+  dist_tree = maia.io.file_to_dist_tree(filename, comm)
+  part_tree = maia.factory.partition_dist_tree(dist_tree, comm)
+
+  synchro = maia.transfer.TransferSync(dist_tree, part_tree, comm)
+  synchro.dist_to_part()
+  for it in range(3):
+    for zone in PT.get_all_Zone_t(part_tree):
+      PT.get_node_from_path(zone, 'FlowSolution/DataX')[1] += 1.
+    synchro.part_to_dist() # Only DataX is transferred
+  synchro.report()
+  #TransferSync@end
@@ -29,7 +29,8 @@ def discover_nodes_from_matching(dist_node, part_nodes, queries, comm,
       last), 'leaf' (only last)
     merge_rule accepts a function whose argument is the leaf node path. This function can map the path to an
       other, eg to merge splitted node related to a same dist node
-  Todo : could be optimised using a distributed hash table -> see BM
+  Nodes known by several ranks are deduplicated using a distributed directory (see par_utils.allgather_unique)
+  before being gathered.
   """
   collected_part_nodes = dict()
   for part_node in part_nodes:
@@ -55,7 +56,7 @@ def discover_nodes_from_matching(dist_node, part_nodes, queries, comm,
           childs.extend(PT.get_children_from_predicates(leaf, [query]))
         collected_part_nodes[leaf_path] = (labels, values, childs)
 
-  for rank_node_path in comm.allgather(collected_part_nodes):
+  for rank_node_path in par_utils.allgather_unique(collected_part_nodes, comm):
     for node_path, (labels, values, childs) in rank_node_path.items():
       if PT.get_node_from_path(dist_node, node_path) is None:
         nodes_name = node_path.split('/')
@@ -66,17 +67,46 @@ def discover_nodes_from_matching(dist_node, part_nodes, queries, comm,
         for child in childs:
           PT.add_child(ancestor, child)
 
+# Paths of the distributed blocks computed by get_parts_per_blocks are cached as an
+# attribute of the communicator (thus freed with it), indexed by the local paths
+# of the partitioned zones
+_blocks_keyval = MPI.Comm.Create_keyval()
+
+def _get_blocks_cache(comm):
+  cache = comm.Get_attr(_blocks_keyval)
+  if cache is None:
+    cache = {'generation' : 0, 'blocks' : dict()}
+    comm.Set_attr(_blocks_keyval, cache)
+  return cache
+
 def get_parts_per_blocks(part_tree, comm):
   """
   From the partitioned trees, retrieve the paths of the distributed blocks
   and return a dictionnary associating each path to the list of the corresponding
-  partitioned zones
+  partitioned zones.
+  The paths of the blocks are cached : if the partitioned zones did not change
+  on any rank since a previous call, the discovery of the blocks is skipped.
   """
-  dist_doms = PT.new_CGNSTree()
-  discover_nodes_from_matching(dist_doms, [part_tree], 'CGNSBase_t/Zone_t', comm,
-                                    merge_rule=lambda zpath : MT.conv.get_part_prefix(zpath))
+  cache = _get_blocks_cache(comm)
+  part_paths = tuple(PT.predicates_to_paths(part_tree, 'CGNSBase_t/Zone_t'))
+  generation, zone_paths = cache['blocks'].get(part_paths, (-1, None))
+  # Local paths may be the same for different trees (eg rank without partitions) : reuse
+  # the blocks only if all the ranks selected the ones computed at the same discovery
+  gen_min_max = np.array([-generation, generation])
+  comm.Allreduce(MPI.IN_PLACE, gen_min_max, op=MPI.MAX)
+  if not -gen_min_max[0] == gen_min_max[1] >= 0:
+    dist_doms = PT.new_CGNSTree()
+    discover_nodes_from_matching(dist_doms, [part_tree], 'CGNSBase_t/Zone_t', comm,
+                                      merge_rule=lambda zpath : MT.conv.get_part_prefix(zpath))
+    zone_paths = PT.predicates_to_paths(dist_doms, 'CGNSBase_t/Zone_t')
+    cache['blocks'].pop(part_paths, None)
+    if len(cache['blocks']) >= 16:
+      cache['blocks'].pop(next(iter(cache['blocks'])))
+    cache['blocks'][part_paths] = (cache['generation'], zone_paths)
+    cache['generation'] += 1
+
   parts_per_dom = dict()
-  for zone_path in PT.predicates_to_paths(dist_doms, 'CGNSBase_t/Zone_t'):
+  for zone_path in zone_paths:
     parts_per_dom[zone_path] = tr_utils.get_partitioned_zones(part_tree, zone_path)
   return parts_per_dom
 
@@ -200,7 +200,7 @@ def _broadcast_full_to_dist(tree, comm, owner):
   else:
     send_size_tree = None
 
-  recv_size_tree = comm.bcast(send_size_tree, root=owner)
+  recv_size_tree = par_utils.bcast_tree(send_size_tree, comm, root=owner)
 
   # Fix ElementStartOffset depending on receiving rank (0 or cnt#size)
   if comm.Get_rank() != owner:
@@ -228,6 +228,33 @@ def test_get_parts_per_blocks(sub_comm):
     assert PT.get_names(part_per_blocks['BaseI/ZoneB']) == []
     assert PT.get_names(part_per_blocks['BaseII/ZoneA']) == ['ZoneA.P1.N0']
 
+  # Second call uses the cached blocks
+  assert DFP.get_parts_per_blocks(part_tree, sub_comm).keys() == part_per_blocks.keys()
+  # Cache is invalidated if a zone is added on any rank
+  if sub_comm.Get_rank() == 1:
+    PT.new_Zone('ZoneC.P1.N0', parent=PT.get_child_from_name(part_tree, 'BaseII'))
+  part_per_blocks = DFP.get_parts_per_blocks(part_tree, sub_comm)
+  assert list(part_per_blocks.keys()) == ['BaseI/ZoneA', 'BaseI/ZoneB', 'BaseII/ZoneA', 'BaseII/ZoneC']
+
+@mark_mpi_test(2)
+def test_get_parts_per_blocks_empty_rank(sub_comm):
+  # Rank 1 has no partitions, so its local paths are the same for both trees
+  if sub_comm.Get_rank() == 0:
+    part_tree_1 = parse_yaml_cgns.to_cgns_tree("BaseI CGNSBase_t:\n  ZoneA.P0.N0 Zone_t:")
+    part_tree_2 = parse_yaml_cgns.to_cgns_tree("BaseI CGNSBase_t:\n  ZoneB.P0.N0 Zone_t:")
+  else:
+    part_tree_1 = PT.new_CGNSTree()
+    part_tree_2 = PT.new_CGNSTree()
+  for part_tree, expected in [(part_tree_1, ['BaseI/ZoneA']),
+                              (part_tree_2, ['BaseI/ZoneB']),
+                              (part_tree_1, ['BaseI/ZoneA'])]:
+    assert list(DFP.get_parts_per_blocks(part_tree, sub_comm).keys()) == expected
+
+  # Cache is not shared between communicators
+  comm = sub_comm.Dup()
+  assert list(DFP.get_parts_per_blocks(part_tree_2, comm).keys()) == ['BaseI/ZoneB']
+  comm.Free()
+
 @mark_mpi_test(1)
 def test_get_joins_dist_tree(sub_comm):
   pt = """
@@ -1,6 +1,11 @@
 from .cgns_io_tree import file_to_dist_tree, \
                           dist_tree_to_file, \
+                          append_dist_tree_to_file, \
                           read_tree, \
                           write_tree, write_trees
 
+from .lazy_loading import ensure_loaded
+from .async_write  import dist_tree_to_file_async
+
 from .save_part_tree import save_part_tree as part_tree_to_file
+from .read_part_tree import file_to_part_tree, load_part_tree
@@ -3,13 +3,24 @@ from h5py   import h5p, h5f, h5fd
 
 import maia.pytree as PT
 
-from .hdf._hdf_cgns import open_from_path,\
+from maia.utils     import par_utils
+
+from .hdf._hdf_cgns import open_from_path, FileHandle,\
                            load_tree_partial, write_tree_partial,\
+                           write_tree_skeleton, append_tree_partial,\
+                           resolve_dataset_options, has_filters,\
                            load_data_partial, write_data_partial,\
                            write_link
 from .fix_tree      import fix_point_ranges, rm_legacy_nodes,\
                            add_missing_pr_in_bcdataset, check_datasize
 
+# Default MPI-IO hints used for collective reads : enable ROMIO two-phase aggregation
+# (a subset of the ranks gather the slabs requested by all the ranks and perform large
+# contiguous reads)
+default_read_hints = {'romio_cb_read' : 'enable'}
+# Same thing for collective writes
+default_write_hints = {'romio_cb_write' : 'enable'}
+
 def load_data(names, labels):
   """ Function used to determine if the data is heavy or not """
   if len(names) == 1: #First level (Base, CGLibVersion, ...) -> always load + early return
@@ -37,43 +48,120 @@ def load_collective_size_tree(filename, comm):
   else:
     size_tree = None
 
-  size_tree = comm.bcast(size_tree, root=0)
+  size_tree = par_utils.bcast_tree(size_tree, comm, root=0)
 
   return size_tree
 
-def load_partial(filename, dist_tree, hdf_filter):
-  fid = h5f.open(bytes(filename, 'utf-8'), h5f.ACC_RDONLY)
-
-  for path, filter in hdf_filter.items():
-    if isinstance(filter, (list, tuple)):
-      node = PT.get_node_from_path(dist_tree, path[1:]) #! Path has '/'
-      gid = open_from_path(fid, path[1:])
-      node[1] = load_data_partial(gid, filter)
-
-def write_partial(filename, dist_tree, hdf_filter, comm):
-
-  if comm.Get_rank() == 0:
-    write_tree_partial(dist_tree, filename, load_data)
-  comm.barrier()
-
+def _create_mpio_fapl(comm, hints):
+  """ Create a file access property list using the MPIO driver.
+  hints is a dict of MPI-IO hints (eg cb_nodes, cb_buffer_size, striping_factor)
+  which are forwarded to the MPI-IO layer.  """
+  info = MPI.Info.Create()
+  for key, value in hints.items():
+    info.Set(key, str(value))
   fapl = h5p.create(h5p.FILE_ACCESS)
   fapl.set_driver(h5fd.MPIO)
-  fapl.set_fapl_mpio(comm, MPI.Info())
-  fid = h5f.open(bytes(filename, 'utf-8'), h5f.ACC_RDWR, fapl)
+  fapl.set_fapl_mpio(comm, info)
+  info.Free()
+  return fapl
+
+def open_file(filename, comm=None, hints={}):
+  """ Open the file for reading and return a FileHandle.
+
+  If comm is None, the file is opened with the default sequential driver
+  and slabs will be read independently.
+  Otherwise, the file is opened with the MPIO driver and datasets will be read
+  collectively; hints are forwarded to MPI-IO (see default_read_hints).
+  """
+  if comm is None:
+    return FileHandle(filename)
+  else:
+    fapl = _create_mpio_fapl(comm, {**default_read_hints, **hints})
+    xfer_plist = h5p.create(h5p.DATASET_XFER)
+    xfer_plist.set_dxpl_mpio(h5fd.MPIO_COLLECTIVE)
+    return FileHandle(filename, h5f.ACC_RDONLY, fapl, xfer_plist)
+
+def load_partial(filename, dist_tree, hdf_filter, comm=None, hints={}):
+  """ Load the arrays described by hdf_filter into dist_tree.
+
+  filename is either the path of the file, which is then opened using open_file
+  (see this function for comm and hints arguments), or an already open FileHandle,
+  which is reused (and not closed).
+  In collective mode, the function must be called by all the ranks of comm, with
+  hdf_filters having the same keys in the same order.
+  """
+  if isinstance(filename, FileHandle):
+    hdf_file = filename
+  else:
+    hdf_file = open_file(filename, comm, hints)
 
   for path, filter in hdf_filter.items():
-    array = PT.get_node_from_path(dist_tree, path[1:])[1] #! Path has '/'
-    gid = open_from_path(fid, path[1:])
-    write_data_partial(gid, array, filter)
-    gid.close()
-  
-  fid.close()
-
-def read_full(filename):
-  return load_tree_partial(filename, lambda X,Y: True)
-
-def write_full(filename, dist_tree, links=[]):
-  write_tree_partial(dist_tree, filename, lambda X,Y: True)
+    if isinstance(filter, (list, tuple)):
+      node = PT.get_node_from_path(dist_tree, path[1:]) #! Path has '/'
+      gid = hdf_file.open(path[1:])
+      node[1] = load_data_partial(gid, filter, hdf_file.dxpl)
+
+  if hdf_file is not filename:
+    hdf_file.close()
+
+def write_partial(filename, dist_tree, hdf_filter, comm, collective=False, hints={}, paths=None, policy=None):
+  """ Write dist_tree into the file, using the hdf_filter to select the
+  slabs written by each rank.
+
+  If collective is False, rank 0 creates the skeleton of the file, then
+  datasets are created and written using MPIO independent mode.
+  Otherwise, the skeleton (including the datasets, which are allocated early)
+  is created collectively by all the ranks, then datasets are written collectively.
+  Hints are forwarded to MPI-IO (see default_write_hints) and also used when
+  creating the file, allowing to set its striping (eg striping_factor, striping_unit).
+  In this case, the skeleton of dist_tree must be the same on all the ranks.
+
+  If paths is not None, the file must exist : only the subtrees of dist_tree
+  located at these paths (without leading '/') are written in the file, replacing
+  the existing nodes if any (see append_tree_partial). hdf_filter should then
+  be restricted to these subtrees.
+
+  policy describes the dataset creation options (see resolve_dataset_options).
+  Since parallel HDF5 only supports collective writes for filtered datasets
+  (compression, shuffle), they can not be used in independent mode.
+  """
+  dataset_options = resolve_dataset_options(dist_tree, policy)
+  if not collective and any([has_filters(options) for options in dataset_options.values()]):
+    raise ValueError("Compressed datasets can only be written in collective mode")
+
+  if collective:
+    hints = {**default_write_hints, **hints}
+    fapl = _create_mpio_fapl(comm, hints)
+    if paths is None:
+      write_tree_skeleton(dist_tree, filename, load_data, hdf_filter, fapl, comm.Get_rank() == 0,
+                          dataset_options)
+    else:
+      append_tree_partial(dist_tree, filename, load_data, paths, hdf_filter, fapl, comm.Get_rank() == 0,
+                          dataset_options)
+    xfer_plist = h5p.create(h5p.DATASET_XFER)
+    xfer_plist.set_dxpl_mpio(h5fd.MPIO_COLLECTIVE)
+  else:
+    if comm.Get_rank() == 0:
+      if paths is None:
+        write_tree_partial(dist_tree, filename, load_data, dataset_options)
+      else:
+        append_tree_partial(dist_tree, filename, load_data, paths, dataset_options=dataset_options)
+    comm.barrier()
+    fapl = _create_mpio_fapl(comm, {})
+    xfer_plist = None
+
+  with FileHandle(filename, h5f.ACC_RDWR, fapl, xfer_plist) as hdf_file:
+    for path, filter in hdf_filter.items():
+      array = PT.get_node_from_path(dist_tree, path[1:])[1] #! Path has '/'
+      gid = hdf_file.open(path[1:])
+      write_data_partial(gid, array, filter, hdf_file.dxpl, create=not collective,
+                         options=dataset_options.get(path, {}))
+
+def read_full(filename, mmap=False):
+  return load_tree_partial(filename, lambda X,Y: True, mmap)
+
+def write_full(filename, dist_tree, links=[], policy=None):
+  write_tree_partial(dist_tree, filename, lambda X,Y: True, resolve_dataset_options(dist_tree, policy))
 
   # Add links if any
   fid = h5f.open(bytes(filename, 'utf-8'), h5f.ACC_RDWR)
@@ -0,0 +1,114 @@
+import time
+import threading
+import mpi4py.MPI as MPI
+
+import maia.pytree        as PT
+import maia.utils.logging as mlog
+
+from .cgns_io_tree import dist_tree_to_file
+from .lazy_loading import ensure_loaded
+
+class AsyncWriteHandle:
+  """ Handle on a distributed write performed in background (see dist_tree_to_file_async).
+
+  Timings (in seconds, local to each process) are available once the write is completed:
+
+  - ``snapshot_time`` : time spent to copy the tree before starting the write;
+  - ``write_time`` : duration of the background write;
+  - ``exposed_time`` : time during which the calling thread was blocked (snapshot
+    and waiting for the completion of the write);
+  - ``hidden_time`` : part of the write time overlapped with the work of the calling thread.
+  """
+  def __init__(self, filename, comm, snapshot_time):
+    self.filename      = filename
+    self.snapshot_time = snapshot_time
+    self.write_time    = 0.
+    self.wait_time     = 0.
+    self._comm   = comm
+    self._thread = None
+    self._error  = None
+    self._done   = False
+
+  def _run(self, dist_tree, **kwargs):
+    start = time.time()
+    try:
+      dist_tree_to_file(dist_tree, self.filename, self._comm, **kwargs)
+    except Exception as e:
+      self._error = e
+    self.write_time = time.time() - start
+
+  def test(self):
+    """ Return True if the background write of the current process is completed.
+    This function is not collective.  """
+    return self._done or self._thread is None or not self._thread.is_alive()
+
+  def wait(self):
+    """ Block until the write is completed, and report the timings.
+    This function is collective and must be called by all the processes.  """
+    if self._done:
+      return
+    start = time.time()
+    if self._thread is not None:
+      self._thread.join()
+    self.wait_time += time.time() - start
+    self._done = True
+    self._comm.Free()
+    if self._error is not None:
+      raise self._error
+    mlog.stat(f"Background write of file {self.filename} completed -- write time is "
+              f"{self.write_time:.2f} s (hidden {self.hidden_time:.2f} s, exposed {self.exposed_time:.2f} s)")
+
+  @property
+  def exposed_time(self):
+    return self.snapshot_time + self.wait_time
+
+  @property
+  def hidden_time(self):
+    return max(self.write_time - self.wait_time, 0.)
+
+def dist_tree_to_file_async(dist_tree, filename, comm, **kwargs):
+  """Distributed write to a CGNS file, performed in background.
+
+  A snapshot (deep copy) of the distributed tree is taken, then the snapshot is
+  written by a background thread, allowing the caller to modify the tree and to
+  continue its work while the write is in progress. The returned handle must
+  be completed with ``wait()`` (collectively) before writing into the same file
+  again; at most two copies of the data (the tree and the snapshot being
+  written) thus coexist.
+
+  The background thread uses a duplicate of ``comm`` and requires MPI to be initialized
+  with ``MPI.THREAD_MULTIPLE``; otherwise, the write is performed synchronously (and the
+  handle is already completed). Overlap is effective as long as the calling thread
+  releases the GIL (eg during MPI communications or in compiled code).
+
+  Args:
+    dist_tree (CGNSTree) : Distributed tree to write
+    filename (str) : Path of the file
+    comm     (MPIComm) : MPI communicator
+    **kwargs : Additional arguments forwarded to :func:`dist_tree_to_file`
+  Returns:
+    AsyncWriteHandle: handle providing ``test()`` and ``wait()`` methods, and the
+    hidden / exposed IO timings
+
+  Example:
+      .. literalinclude:: snippets/test_io.py
+        :start-after: #dist_tree_to_file_async@start
+        :end-before: #dist_tree_to_file_async@end
+        :dedent: 2
+  """
+  filename = str(filename)
+  start = time.time()
+  ensure_loaded(dist_tree)
+  snapshot = PT.deep_copy(dist_tree)
+  handle = AsyncWriteHandle(filename, comm.Dup(), time.time() - start)
+
+  if MPI.Query_thread() == MPI.THREAD_MULTIPLE:
+    handle._thread = threading.Thread(target=handle._run, args=(snapshot,), kwargs=kwargs, daemon=True)
+    handle._thread.start()
+  else:
+    if comm.Get_rank() == 0:
+      mlog.warning("MPI does not provide THREAD_MULTIPLE support, tree is written synchronously")
+    handle._run(snapshot, **kwargs)
+    handle.wait_time = handle.write_time # Nothing is hidden
+    handle.wait()
+  return handle
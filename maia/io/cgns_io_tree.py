@@ -1,5 +1,6 @@
 import os
 import time
+import fnmatch
 import mpi4py.MPI as MPI
 
 import maia.pytree        as PT
@@ -9,6 +10,7 @@ import maia.utils.logging as mlog
 from .distribution_tree         import add_distribution_info, clean_distribution_info
 from .hdf.tree                  import create_tree_hdf_filter
 from .fix_tree                  import ensure_PE_global_indexing, _enforce_pdm_dtype
+from .lazy_loading              import set_lazy_values, ensure_loaded
 
 from maia.factory     import full_to_dist
 from maia.pytree.yaml import parse_yaml_cgns
@@ -20,28 +22,36 @@ def load_collective_size_tree(filename, comm, legacy=False):
     from ._hdf_io_h5py import load_collective_size_tree
   return load_collective_size_tree(filename, comm)
 
-def load_partial(filename, dist_tree, hdf_filter, comm, legacy):
+def load_partial(filename, dist_tree, hdf_filter, comm, legacy, collective=False, hints={}):
   if legacy:
     from ._hdf_io_cass import load_partial
     load_partial(filename, dist_tree, hdf_filter, comm)
   else:
     from ._hdf_io_h5py import load_partial
-    load_partial(filename, dist_tree, hdf_filter)
+    if collective:
+      load_partial(filename, dist_tree, hdf_filter, comm, hints)
+    else:
+      load_partial(filename, dist_tree, hdf_filter)
 
-def write_partial(filename, dist_tree, hdf_filter, comm, legacy):
+def write_partial(filename, dist_tree, hdf_filter, comm, legacy, collective=False, hints={}, paths=None, policy=None):
   if legacy:
+    assert paths is None, "Append mode is only available with h5py backend"
+    assert policy is None, "Dataset creation policy is only available with h5py backend"
     from ._hdf_io_cass import write_partial
+    write_partial(filename, dist_tree, hdf_filter, comm)
   else:
     from ._hdf_io_h5py import write_partial
-  write_partial(filename, dist_tree, hdf_filter, comm)
+    write_partial(filename, dist_tree, hdf_filter, comm, collective, hints, paths, policy)
 
-def write_tree(tree, filename, links=[], legacy=False):
+def write_tree(tree, filename, links=[], legacy=False, policy=None):
   """Sequential write to a CGNS file.
 
   Args:
     tree (CGNSTree) : Tree to write
     filename (str) : Path of the file
     links   (list) : List of links to create (see SIDS-to-Python guide)
+    policy  (dict, optional) : Dataset creation policy (chunking, compression),
+      see :ref:`dataset creation policy <io_policy>`. Defaults to None.
 
   Example:
       .. literalinclude:: snippets/test_io.py
@@ -50,16 +60,26 @@ def write_tree(tree, filename, links=[], legacy=False):
         :dedent: 2
   """
   if legacy:
+    assert policy is None, "Dataset creation policy is only available with h5py backend"
     from ._hdf_io_cass import write_full
+    write_full(filename, tree, links=links)
   else:
     from ._hdf_io_h5py import write_full
-  write_full(filename, tree, links=links)
+    write_full(filename, tree, links=links, policy=policy)
 
-def read_tree(filename, legacy=False):
+def read_tree(filename, legacy=False, mmap=False):
   """Sequential load of a CGNS file. 
 
+  With ``mmap=True``, the arrays stored contiguously in the file are not read, but
+  memory mapped : opening the tree is almost instantaneous and data is
+  loaded on demand when the arrays are accessed. Arrays are mapped in copy-on-write
+  mode, so they can be modified without altering the file; however, the
+  file must not be modified while the tree is in use. Chunked or
+  compressed arrays are read as usual.
+
   Args:
     filename (str) : Path of the file
+    mmap (bool, optional) : Memory map the contiguous arrays. Defaults to False.
   Returns:
     CGNSTree: Full (not distributed) CGNS tree
   """
@@ -69,20 +89,31 @@ def read_tree(filename, legacy=False):
     return tree
   else:
     if legacy:
+      assert not mmap, "Memory mapping is only available with h5py backend"
       from ._hdf_io_cass import read_full
+      return read_full(filename)
     else:
       from ._hdf_io_h5py import read_full
-    return read_full(filename)
+      return read_full(filename, mmap)
 
 
 
-def load_tree_from_filter(filename, dist_tree, comm, hdf_filter, legacy):
+def load_tree_from_filter(filename, dist_tree, comm, hdf_filter, legacy, collective=False, hints={}, lazy=False):
   """
   """
   hdf_filter_with_dim  = {key: value for (key, value) in hdf_filter.items() \
       if isinstance(value, (list, tuple))}
 
-  load_partial(filename, dist_tree, hdf_filter_with_dim, comm, legacy)
+  if lazy:
+    assert not legacy, "Lazy loading is only available with h5py backend"
+    hdf_filter_with_dim = set_lazy_values(filename, dist_tree, hdf_filter_with_dim)
+
+  hdf_file = filename
+  if not legacy: # Open the file once for all the passes
+    from ._hdf_io_h5py import open_file
+    hdf_file = open_file(filename, comm if collective else None, hints)
+
+  load_partial(hdf_file, dist_tree, hdf_filter_with_dim, comm, legacy, collective, hints)
 
   # > Match with callable
   hdf_filter_with_func = {key: value for (key, value) in hdf_filter.items() \
@@ -99,11 +130,14 @@ def load_tree_from_filter(filename, dist_tree, comm, hdf_filter, legacy):
       except RuntimeError: # Not ready yet
         pass
 
-    load_partial(filename, dist_tree, next_hdf_filter, comm, legacy)
+    load_partial(hdf_file, dist_tree, next_hdf_filter, comm, legacy, collective, hints)
 
     hdf_filter_with_func = {key: value for (key, value) in next_hdf_filter.items() \
         if not isinstance(value, (list, tuple))}
 
+  if not legacy:
+    hdf_file.close()
+
   if(unlock_at_least_one is False):
     raise RuntimeError("Something strange in the loading process")
 
@@ -111,7 +145,8 @@ def load_tree_from_filter(filename, dist_tree, comm, hdf_filter, legacy):
   if n_shifted > 0 and comm.Get_rank() == 0:
     mlog.warning(f"Some NGon/ParentElements have been shift to be CGNS compliant")
 
-def save_tree_from_filter(filename, dist_tree, comm, hdf_filter, legacy):
+def save_tree_from_filter(filename, dist_tree, comm, hdf_filter, legacy, collective=False, hints={}, paths=None,
+                          policy=None):
   """
   """
   hdf_filter_with_dim  = {key: value for (key, value) in hdf_filter.items() if isinstance(value, list)}
@@ -125,24 +160,105 @@ def save_tree_from_filter(filename, dist_tree, comm, hdf_filter, legacy):
   saving_dist_tree = PT.shallow_copy(dist_tree)
   clean_distribution_info(saving_dist_tree)
 
-  write_partial(filename, saving_dist_tree, hdf_filter_with_dim, comm, legacy)
+  write_partial(filename, saving_dist_tree, hdf_filter_with_dim, comm, legacy, collective, hints, paths, policy)
+
+def _concretize_patterns(tree, patterns):
+  """ Return the paths of the nodes of tree matching the patterns (paths with wildcards) """
+  paths = []
+  for pattern in patterns:
+    predicates = [lambda n, _name=name: fnmatch.fnmatch(PT.get_name(n), _name) for name in pattern.split('/')]
+    paths.extend(PT.predicates_to_paths(tree, predicates))
+  return sorted(set(paths))
 
-def fill_size_tree(tree, filename, comm, legacy=False):
+# Labels of the nodes required to interpret their siblings, never removed by prune_size_tree
+kept_labels = ['CGNSLibraryVersion_t', 'ZoneType_t', 'GridLocation_t', 'IndexArray_t', 'IndexRange_t']
+
+def prune_size_tree(size_tree, include=[], exclude=[]):
+  """
+  Remove from size_tree the nodes which are not selected by the include or exclude
+  lists (which are mutually exclusive, as in maia.transfer.utils.create_mask_tree).
+  These lists contain paths starting from the root of the tree (eg 'Base/Zone/FlowSolution')
+  and can use wildcards (eg '*/*/FlowSolution*/Density').
+  Selecting a node selects the whole subtree; ancestors of the selected nodes are kept,
+  as well as the children of these ancestors describing the data (see kept_labels).
+  """
+  if len(include) * len(exclude) != 0:
+    raise ValueError("`include` and `exclude` args are mutually exclusive")
+  if len(include) == 0 and len(exclude) == 0:
+    return
+
+  paths = _concretize_patterns(size_tree, include + exclude)
+
+  def is_selected(path):
+    return any([path == p or path.startswith(p + '/') for p in paths])
+  def is_ancestor(path):
+    return any([p.startswith(path + '/') for p in paths])
+
+  def prune(parent, parent_path):
+    children = PT.get_children(parent)
+    for child in children[:]:
+      name = PT.get_name(child)
+      if name.endswith('#Size'): # Sizes nodes follow their data node
+        name = name[:-len('#Size')]
+        data_node = PT.get_child_from_name(parent, name)
+      else:
+        data_node = child
+      path = f'{parent_path}/{name}' if parent_path else name
+      if data_node is not None and PT.get_label(data_node) in kept_labels:
+        continue
+      if len(include) > 0:
+        if is_ancestor(path) and not is_selected(path):
+          prune(child, path)
+        elif not is_selected(path):
+          children.remove(child)
+      else:
+        if is_selected(path):
+          children.remove(child)
+        elif is_ancestor(path):
+          prune(child, path)
+
+  prune(size_tree, '')
+
+def fill_size_tree(tree, filename, comm, legacy=False, collective=False, hints={}, lazy=False):
   add_distribution_info(tree, comm)
   hdf_filter = create_tree_hdf_filter(tree)
   # Coords#Size appears in dict -> remove it
   hdf_filter = {key:val for key,val in hdf_filter.items() if not key.endswith('#Size')}
 
-  load_tree_from_filter(filename, tree, comm, hdf_filter, legacy)
+  load_tree_from_filter(filename, tree, comm, hdf_filter, legacy, collective, hints, lazy)
   PT.rm_nodes_from_name(tree, '*#Size')
 
 
-def file_to_dist_tree(filename, comm, legacy=False):
+def file_to_dist_tree(filename, comm, legacy=False, collective=False, hints={}, lazy=False,
+                      include=[], exclude=[]):
   """Distributed load of a CGNS file.
 
+  By default, each process reads its part of the data independently. With
+  ``collective=True``, the file is opened with the MPI-IO driver and the datasets
+  are read collectively, which allows MPI-IO to aggregate the requests of
+  all the processes into a few large contiguous reads.
+
+  With ``lazy=True``, the data arrays of FlowSolution_t, DiscreteData_t,
+  ZoneSubRegion_t and BCData_t nodes are not read: their values are
+  placeholders (:class:`~maia.io.lazy_loading.LazyArray`) which are read on first
+  access, or when calling :func:`ensure_loaded`.
+
+  The ``include`` and ``exclude`` lists (which are mutually exclusive) allow to
+  select the nodes to load, using paths starting from the root of the tree with
+  optional wildcards (eg ``'Base/Zone/GridCoordinates'`` or ``'*/*/FlowSolution*'``).
+  Unselected nodes are removed before any data is read, and their datasets
+  are never accessed. Ancestors of the selected nodes are always loaded.
+
   Args:
     filename (str) : Path of the file
     comm     (MPIComm) : MPI communicator
+    collective (bool, optional) : Use collective MPI-IO reads. Defaults to False.
+    hints (dict, optional) : Additional MPI-IO hints used in collective mode, such as
+      ``cb_nodes`` or ``cb_buffer_size``. Two-phase aggregation (``romio_cb_read``)
+      is enabled by default.
+    lazy (bool, optional) : Defer the read of the field arrays. Defaults to False.
+    include (list of str, optional) : Paths of the nodes to load. Defaults to [].
+    exclude (list of str, optional) : Paths of the nodes not to load. Defaults to [].
   Returns:
     CGNSTree: Distributed CGNS tree
   """
@@ -154,13 +270,15 @@ def file_to_dist_tree(filename, comm, legacy=False):
       with open(filename, 'r') as f:
         tree = parse_yaml_cgns.to_cgns_tree(f)
         _enforce_pdm_dtype(tree)  
+      prune_size_tree(tree, include, exclude)
     else:
       tree = None
     dist_tree = full_to_dist.distribute_tree(tree, comm, owner=0) 
 
   else:
     dist_tree = load_collective_size_tree(filename, comm, legacy)
-    fill_size_tree(dist_tree, filename, comm, legacy)
+    prune_size_tree(dist_tree, include, exclude)
+    fill_size_tree(dist_tree, filename, comm, legacy, collective, hints, lazy)
 
   end = time.time()
   dt_size     = sum(MT.metrics.dtree_nbytes(dist_tree))
@@ -170,17 +288,66 @@ def file_to_dist_tree(filename, comm, legacy=False):
             f" (Σ={mlog.bsize_to_str(all_dt_size)})")
   return dist_tree
 
-def dist_tree_to_file(dist_tree, filename, comm, legacy=False):
+def dist_tree_to_file(dist_tree, filename, comm, legacy=False, collective=False, hints={}, policy=None):
   """Distributed write to a CGNS file.
 
+  By default, each process writes its part of the data independently. With
+  ``collective=True``, the datasets are written collectively, which allows MPI-IO
+  to aggregate the requests of all the processes (collective buffering).
+
   Args:
     dist_tree (CGNSTree) : Distributed tree to write
     filename (str) : Path of the file
     comm     (MPIComm) : MPI communicator
+    collective (bool, optional) : Use collective MPI-IO writes. Defaults to False.
+    hints (dict, optional) : Additional MPI-IO hints used in collective mode, such as
+      ``cb_nodes``, ``cb_buffer_size``, ``striping_factor`` or ``striping_unit``.
+      Collective buffering (``romio_cb_write``) is enabled by default.
+    policy (dict, optional) : Dataset creation policy (chunking, compression),
+      see :ref:`dataset creation policy <io_policy>`. Compressed datasets require
+      ``collective=True``. Defaults to None.
   """
   filename = str(filename)
+  ensure_loaded(dist_tree)
   hdf_filter = create_tree_hdf_filter(dist_tree)
-  save_tree_from_filter(filename, dist_tree, comm, hdf_filter, legacy)
+  save_tree_from_filter(filename, dist_tree, comm, hdf_filter, legacy, collective, hints, policy=policy)
+
+def append_dist_tree_to_file(dist_tree, filename, comm, include, legacy=False, collective=False, hints={},
+                             policy=None):
+  """Distributed write of some nodes into an existing CGNS file.
+
+  Only the nodes selected by ``include`` (and their children) are written; if
+  some of them already exist in the file, they are replaced. This allows, for
+  example, to append the FlowSolution_t nodes computed at each iteration
+  of an unsteady computation (as well as the BaseIterativeData_t
+  and ZoneIterativeData_t nodes) to a file in which the mesh has already been
+  written by :func:`dist_tree_to_file`, without writing the mesh again.
+
+  Args:
+    dist_tree (CGNSTree) : Distributed tree
+    filename (str) : Path of the existing file
+    comm     (MPIComm) : MPI communicator
+    include (list of str) : Paths of the nodes to write, starting from the root
+      of the tree and with optional wildcards (eg ``'Base/*/FlowSolution#0042'``)
+    collective (bool, optional) : Use collective MPI-IO writes. Defaults to False.
+    hints (dict, optional) : Additional MPI-IO hints used in collective mode.
+    policy (dict, optional) : Dataset creation policy, as in :func:`dist_tree_to_file`.
+
+  Example:
+      .. literalinclude:: snippets/test_io.py
+        :start-after: #append_dist_tree_to_file@start
+        :end-before: #append_dist_tree_to_file@end
+        :dedent: 2
+  """
+  filename = str(filename)
+  paths = _concretize_patterns(dist_tree, include)
+  for path in paths:
+    ensure_loaded(PT.get_node_from_path(dist_tree, path))
+
+  # Filters are computed from the distribution of the zones, already present in the tree
+  is_appended = lambda key: any([key[1:] == p or key[1:].startswith(p + '/') for p in paths])
+  hdf_filter = {key: value for key, value in create_tree_hdf_filter(dist_tree).items() if is_appended(key)}
+  save_tree_from_filter(filename, dist_tree, comm, hdf_filter, legacy, collective, hints, paths, policy)
 
 def write_trees(tree, filename, comm, legacy=False):
   """Sequential write to CGNS files.
@@ -1,6 +1,9 @@
+import fnmatch
 import numpy as np
 import h5py
-from h5py import h5, h5a, h5d, h5f, h5g, h5p, h5s, h5t, h5o
+from h5py import h5, h5a, h5d, h5f, h5g, h5i, h5p, h5s, h5t, h5o, h5z
+
+from .hdf_dataspace import coalesce_slabs
 
 C33_t = h5t.C_S1.copy()
 C33_t.set_size(33)
@@ -75,8 +78,10 @@ def group_by(iterable, n):
   #https://stackoverflow.com/questions/5389507/iterating-over-every-two-elements-in-a-list
   return zip(*[iter(iterable)] * n)
 
-def add_root_attributes(rootid):
-  """ Write the attributes of the CGNS-HDF root node.  """
+def add_root_attributes(rootid, write_values=True):
+  """ Write the attributes of the CGNS-HDF root node.
+  If write_values is False, the root datasets are created but not filled
+  (usefull when this function is called collectively).  """
 
   attr_writter = AttributeRW()
   attr_writter.write_str_33(rootid, b'name', 'HDF5 MotherNode')
@@ -98,29 +103,76 @@ def add_root_attributes(rootid):
   buffer = np.zeros(33, dtype='c')
   for i,c in enumerate(format):
     buffer[i] = c
-  write_data(rootid, buffer, dataset_name=b' format')
+  write_data(rootid, buffer, dataset_name=b' format', write_values=write_values)
   buffer[:] = '\0'
   for i,c in enumerate(version):
     buffer[i] = c
-  write_data(rootid, buffer, dataset_name=b' hdf5version')
+  write_data(rootid, buffer, dataset_name=b' hdf5version', write_values=write_values)
 
-def open_from_path(fid, path, follow_links=True):
-  """ Return the hdf node registred at the specified path in the file fid.  """
+def open_from_path(fid, path, follow_links=True, cache=None):
+  """ Return the hdf node registred at the specified path in the file fid.
+  If a cache dict is provided (and links are followed), the opened nodes are
+  registered in it using their path, and the walk starts from the deepest
+  ancestor already registered.  """
   attr_reader = AttributeRW()
-  gid = h5g.open(fid, b'/')
-  for name in path.split('/'):
-    gid = h5g.open(gid, name.encode())
+  names = path.split('/')
+  gid = None
+  start = 0
+  if cache is not None and follow_links:
+    for i in range(len(names), 0, -1):
+      gid = cache.get('/'.join(names[:i]))
+      if gid is not None:
+        start = i
+        break
+  else:
+    cache = None
+  if gid is None:
+    gid = h5g.open(fid, b'/')
+  for i in range(start, len(names)):
+    gid = h5g.open(gid, names[i].encode())
     if follow_links and attr_reader.read_bytes_3(gid, b'type') == b'LK': #Follow link
       gid = h5g.open(gid, b' link')
+    if cache is not None:
+      cache['/'.join(names[:i+1])] = gid
   return gid
 
+class FileHandle:
+  """ An open hdf file, which keeps the nodes opened with open() in a cache :
+  walking the hierarchy and following the links is done only once for each node.
+  Cached nodes (and the linked files they belong to) remain open until close() is called.
+  An optional dataset transfer property list can be stored with the file.  """
+  def __init__(self, filename, mode=h5f.ACC_RDONLY, fapl=None, dxpl=None):
+    self.fid  = h5f.open(bytes(filename, 'utf-8'), mode, fapl)
+    self.dxpl = dxpl
+    self._nodes = dict()
+
+  def open(self, path):
+    """ Return the hdf node registred at the specified path (see open_from_path) """
+    return open_from_path(self.fid, path, cache=self._nodes)
+
+  def close(self):
+    for gid in self._nodes.values():
+      if gid.valid:
+        gid.close()
+    self._nodes.clear()
+    self.fid.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.close()
+
 def _select_file_slabs(hdf_space, filter):
   """ Performs the 'select_hyperslab' operation on a open hdf_dataset space,
   using the input filter.
   Filter must be a list of 4 elements (start, stride, count, block)
-  and can be combinated.  """
+  and can be combinated; in this case, slabs are coalesced before being
+  selected (see coalesce_slabs).  """
   if is_combinated(filter):
-    src_filter = filter[4]
+    src_filter = coalesce_slabs(filter[4])
+    if len(src_filter) == 0:
+      hdf_space.select_none()
     for i, src_filter_i in enumerate(group_by(src_filter, 4)): #Iterate 4 by 4 on the combinated slab
       src_start, src_stride, src_count, src_block = [tuple(src_filter_i[i][::-1]) for i in range(4)]
       op = h5s.SELECT_SET if i == 0 else h5s.SELECT_OR
@@ -138,13 +190,124 @@ def _create_mmry_slabs(filter):
   m_dspace.select_hyperslab(dst_start, dst_count, dst_stride, dst_block)
   return m_dspace
 
-def load_data(gid):
+def resolve_dataset_options(tree, policy):
+  """ Compute the dataset creation options of the nodes of tree, according
+  to a policy dict. Keys of the policy are either CGNS labels, applying to all the
+  arrays under a node of this label (the nearest ancestor wins), or path patterns
+  (containing a '/', eg 'Base/*/FlowSolution*/*'), which have the priority.
+  Values are dicts of options (see create_dcpl and truncate_mantissa).
+  Return a dict {path : options} (paths start with '/') for the nodes having a value
+  and some options.  """
+  dataset_options = dict()
+  if not policy:
+    return dataset_options
+  path_keys  = [key for key in policy if '/' in key]
+  def visit(node, names, labels):
+    names.append(node[0])
+    labels.append(node[3])
+    if node[1] is not None:
+      path = '/'.join(names)
+      options = next((policy[key] for key in path_keys if fnmatch.fnmatch(path, key)), None)
+      if options is None:
+        options = next((policy[label] for label in labels[::-1] if label in policy), None)
+      if options:
+        dataset_options['/' + path] = options
+    for child in node[2]:
+      visit(child, names, labels)
+    names.pop()
+    labels.pop()
+  for node in tree[2]:
+    visit(node, [], [])
+  return dataset_options
+
+def has_filters(options):
+  """ Return True if dataset options use some hdf filters """
+  return bool(options.get('shuffle', False) or options.get('compression', None))
+
+def _auto_chunks(glob_dims, itemsize, target=2**20):
+  """ Compute a chunk shape (F order) of approximatively target bytes """
+  chunks = [max(1, d) for d in glob_dims]
+  i = len(chunks) - 1
+  while np.prod(chunks) * itemsize > target and i >= 0:
+    other = np.prod(chunks) // chunks[i]
+    chunks[i] = int(max(1, target // (other * itemsize)))
+    i -= 1
+  return chunks
+
+def create_dcpl(glob_dims, dtype, options):
+  """ Create a dataset creation property list from a dict of options :
+  - chunks : shape of the chunks (F order) or True for an automatic shape
+    (default: contiguous dataset, or automatic if filters are used);
+  - shuffle : use the shuffle filter (default: False);
+  - compression : 'gzip' or 'lzf' (default: None);
+  - compression_opts : compression level for gzip (default: 4).  """
+  dc_pl = h5p.create(h5p.DATASET_CREATE)
+  chunks = options.get('chunks', None)
+  if chunks is None and has_filters(options):
+    chunks = True
+  if chunks is not None and np.prod(glob_dims) > 0:
+    if chunks is True:
+      chunks = _auto_chunks(list(glob_dims), np.dtype(dtype).itemsize)
+    chunks = [min(max(c, 1), max(d, 1)) for c, d in zip(chunks, glob_dims)]
+    dc_pl.set_chunk(tuple(chunks[::-1]))
+    if options.get('shuffle', False):
+      dc_pl.set_shuffle()
+    compression = options.get('compression', None)
+    if compression == 'gzip':
+      dc_pl.set_deflate(options.get('compression_opts', 4))
+    elif compression == 'lzf':
+      dc_pl.set_filter(h5z.FILTER_LZF, h5z.FLAG_OPTIONAL)
+    elif compression is not None:
+      raise ValueError(f"Unknown compression {compression}")
+  return dc_pl
+
+def truncate_mantissa(array, options):
+  """ If options has a 'keep_bits' entry, return a copy of the floating point array
+  where only the keep_bits highest bits of the mantissa are kept (lossy compression,
+  improving the compression ratio). Otherwise, or for non float arrays, return array.  """
+  keep_bits = options.get('keep_bits', None)
+  if keep_bits is None or array.dtype.kind != 'f':
+    return array
+  n_bits = {4 : 23, 8 : 52}[array.dtype.itemsize]
+  if keep_bits >= n_bits:
+    return array
+  uint_t = {4 : np.uint32, 8 : np.uint64}[array.dtype.itemsize]
+  mask   = uint_t(~((1 << (n_bits - keep_bits)) - 1) & np.iinfo(uint_t).max)
+  truncated = array.copy(order='A')
+  truncated.view(uint_t)[...] &= mask
+  return truncated
+
+def _map_data(hdf_dataset, mmaps):
+  """ Return a F ordered view of the dataset, taken from a copy-on-write memory
+  map of the file containing it; the file is mapped once and stored in the
+  mmaps dict. Return None if the dataset is not stored contiguously
+  and uncompressed in native byte order.  """
+  dc_pl = hdf_dataset.get_create_plist()
+  dtype = hdf_dataset.dtype
+  offset = hdf_dataset.get_offset()
+  if dc_pl.get_layout() != h5d.CONTIGUOUS or dc_pl.get_nfilters() > 0 or offset is None \
+      or not dtype.isnative or hdf_dataset.get_storage_size() == 0:
+    return None
+  filename = h5i.get_file_id(hdf_dataset).name.decode()
+  if filename not in mmaps:
+    mmaps[filename] = np.memmap(filename, dtype=np.uint8, mode='c')
+  nbytes = hdf_dataset.get_storage_size()
+  return mmaps[filename][offset:offset+nbytes].view(dtype).reshape(hdf_dataset.shape).T
+
+def load_data(gid, mmaps=None):
   """ Create a numpy array from the dataset stored in the hdf node gid,
   reading all data (no hyperslab).
   HDFNode must have data (type != MT).
-  Numpy array is reshaped to F order **but** kind is not converted.  """
+  Numpy array is reshaped to F order **but** kind is not converted.
+  If mmaps is not None, contiguous datasets are not read but memory mapped
+  (see _map_data), and mmaps dict is used to store the mapped files.  """
   hdf_dataset = h5d.open(gid, b' data')
 
+  if mmaps is not None:
+    array = _map_data(hdf_dataset, mmaps)
+    if array is not None:
+      return array
+
   shape = hdf_dataset.shape[::-1]
 
   array = np.empty(shape, hdf_dataset.dtype, order='F')
@@ -153,10 +316,12 @@ def load_data(gid):
 
   return array
 
-def load_data_partial(gid, filter):
+def load_data_partial(gid, filter, dxpl=None):
   """ Create a numpy array from the dataset stored in the hdf node gid,
   reading partial data (using global filter object).
   HDFNode must have data (type != MT).
+  An optional dataset transfer property list can be provided (eg to
+  perform a collective read when file has been opened with MPIO driver).
   Numpy array is reshaped to F order **but** kind is not converted.  """
   hdf_dataset = h5d.open(gid, b' data')
 
@@ -167,25 +332,51 @@ def load_data_partial(gid, filter):
 
   array = np.empty(m_dspace.shape[::-1], hdf_dataset.dtype, order='F')
   array_view = array.T
-  hdf_dataset.read(m_dspace, hdf_space, array_view)
+  hdf_dataset.read(m_dspace, hdf_space, array_view, dxpl=dxpl)
 
   return array
 
 
-def write_data(gid, array, dataset_name=b' data'):
+def create_data_early(gid, glob_dims, dtype, options={}):
+  """ Create (without writing it) the dataset of node gid, from the
+  global dimensions of the array (F order) and its kind.
+  Storage is allocated at creation time and no fill value is written, so
+  the dataset can be directly filled using write_data_partial.
+  Dataset creation options can be provided (see create_dcpl); filtered datasets
+  are allocated using the default policy of the library.  """
+  if dtype == 'S1':
+    dtype = np.dtype(np.int8)
+  dc_pl = create_dcpl(glob_dims, dtype, options)
+  if not has_filters(options):
+    dc_pl.set_alloc_time(h5d.ALLOC_TIME_EARLY)
+    dc_pl.set_fill_time(h5d.FILL_TIME_NEVER)
+  space = h5s.create_simple(tuple(glob_dims[::-1]))
+  h5d.create(gid, b' data', h5t.py_create(dtype), space, dcpl=dc_pl)
+
+def write_data(gid, array, dataset_name=b' data', write_values=True, options={}):
   """ Write a dataset on node gid from a numpy array,
-  dumping all data (no hyperslab).  """
-  array_view = array.T
+  dumping all data (no hyperslab).
+  If write_values is False, the dataset is only created.
+  Dataset creation options can be provided (see create_dcpl and truncate_mantissa).  """
+  array_view = truncate_mantissa(array, options).T
   if array_view.dtype == 'S1':
     array_view.dtype = np.int8
 
   space = h5s.create_simple(array_view.shape)
-  data = h5d.create(gid, dataset_name, h5t.py_create(array_view.dtype), space)
-  data.write(h5s.ALL, h5s.ALL, array_view)
+  dc_pl = create_dcpl(array.shape, array_view.dtype, options) if options else None
+  data = h5d.create(gid, dataset_name, h5t.py_create(array_view.dtype), space, dcpl=dc_pl)
+  if write_values:
+    data.write(h5s.ALL, h5s.ALL, array_view)
 
-def write_data_partial(gid, array, filter):
+def write_data_partial(gid, array, filter, dxpl=None, create=True, options={}):
   """ Write a dataset on node gid from a numpy array,
-  using hyperslabls (from filter object).  """
+  using hyperslabls (from filter object).
+  If no dataset transfer property list is provided, data is written
+  using MPIO independent mode.
+  If create is False, the dataset must have been created before
+  (see create_data_early); otherwise, dataset creation options can be
+  provided (see create_dcpl). Mantissa truncation option is applied
+  in both cases.  """
   glob_dims = tuple(filter[-2][::-1])
 
   # Prepare dataspaces
@@ -193,13 +384,18 @@ def write_data_partial(gid, array, filter):
   _select_file_slabs(hdf_space, filter)
   m_dspace = _create_mmry_slabs(filter)
 
-  array_view = array.T
+  array_view = truncate_mantissa(array, options).T
   if array_view.dtype == 'S1':
     array_view.dtype = np.int8
-  data = h5d.create(gid, b' data', h5t.py_create(array_view.dtype), hdf_space)
-  xfer_plist = h5p.create(h5p.DATASET_XFER)
-  xfer_plist.set_dxpl_mpio(h5py.h5fd.MPIO_INDEPENDENT)
-  data.write(m_dspace, hdf_space, array_view, dxpl=xfer_plist)
+  if create:
+    dc_pl = create_dcpl(filter[-2], array_view.dtype, options) if options else None
+    data = h5d.create(gid, b' data', h5t.py_create(array_view.dtype), hdf_space, dcpl=dc_pl)
+  else:
+    data = h5d.open(gid, b' data')
+  if dxpl is None:
+    dxpl = h5p.create(h5p.DATASET_XFER)
+    dxpl.set_dxpl_mpio(h5py.h5fd.MPIO_INDEPENDENT)
+  data.write(m_dspace, hdf_space, array_view, dxpl=dxpl)
 
 def write_link(gid, node_name, target_file, target_node):
   """ Create a linked child named node_name under the open parent node gid
@@ -216,7 +412,7 @@ def write_link(gid, node_name, target_file, target_node):
 
   node_id.links.create_external(" link".encode(), target_file.encode(), target_node.encode())
 
-def _load_node_partial(gid, parent, load_if, ancestors_stack):
+def _load_node_partial(gid, parent, load_if, ancestors_stack, mmaps=None):
   """ Internal recursive implementation for load_tree_partial.  """
 
   attr_reader = AttributeRW()
@@ -236,7 +432,7 @@ def _load_node_partial(gid, parent, load_if, ancestors_stack):
 
   if load_if(*ancestors_stack):
     if b_kind != b'MT':
-      value = load_data(gid)
+      value = load_data(gid, mmaps)
       if b_kind==b'C1':
         value.dtype = 'S1'
   elif b_kind != b'MT':
@@ -252,7 +448,7 @@ def _load_node_partial(gid, parent, load_if, ancestors_stack):
 
   # Define the function that will be applied to the child of the current hdf node
   # thought iterate : we just start next recursion level if child is not a dataset
-  iter_func = lambda n : _load_node_partial(h5g.open(gid, n), pynode, load_if, ancestors_stack) \
+  iter_func = lambda n : _load_node_partial(h5g.open(gid, n), pynode, load_if, ancestors_stack, mmaps) \
       if h5o.get_info(gid, n).type == h5o.TYPE_GROUP else None
 
   idx_type = h5.INDEX_CRT_ORDER if knows_crt_order(gid) else h5.INDEX_NAME
@@ -260,12 +456,10 @@ def _load_node_partial(gid, parent, load_if, ancestors_stack):
   ancestors_stack[0].pop()
   ancestors_stack[1].pop()
 
-def _write_node_partial(gid, node, write_if, ancestors_stack):
-  """ Internal recursive implementation for write_tree_partial.  """
-
+def _create_node(gid, node):
+  """ Create the hdf group related to node under the open parent gid,
+  and write its attributes. Return the created group.  """
   cgtype = 'MT' if node[1] is None else DTYPE_TO_CGNSTYPE[node[1].dtype.name]
-  ancestors_stack[0].append(node[0])
-  ancestors_stack[1].append(node[3])
 
   gc_pl = h5p.create(h5p.GROUP_CREATE)
   gc_pl.set_link_creation_order(h5p.CRT_ORDER_TRACKED | h5p.CRT_ORDER_INDEXED)
@@ -278,18 +472,48 @@ def _write_node_partial(gid, node, write_if, ancestors_stack):
   attr_writter.write_str_33(node_id, b'label', node[3])
   attr_writter.write_str_3 (node_id, b'type',  cgtype)
   attr_writter.write_flag(node_id) 
+  return node_id
+
+def _write_node_partial(gid, node, write_if, ancestors_stack, dataset_options={}):
+  """ Internal recursive implementation for write_tree_partial.  """
+
+  ancestors_stack[0].append(node[0])
+  ancestors_stack[1].append(node[3])
+
+  node_id = _create_node(gid, node)
 
   if write_if(*ancestors_stack) and node[1] is not None:
-    write_data(node_id, node[1])
+    node_path = '/' + '/'.join(ancestors_stack[0])
+    write_data(node_id, node[1], options=dataset_options.get(node_path, {}))
 
   # Write children
   for child in node[2]:
-    _write_node_partial(node_id, child, write_if, ancestors_stack)
+    _write_node_partial(node_id, child, write_if, ancestors_stack, dataset_options)
   ancestors_stack[0].pop()
   ancestors_stack[1].pop()
 
+def _write_node_skeleton(gid, node, write_if, ancestors_stack, data_filters, write_values, dataset_options={}):
+  """ Internal recursive implementation for write_tree_skeleton.  """
+
+  ancestors_stack[0].append(node[0])
+  ancestors_stack[1].append(node[3])
+
+  node_id = _create_node(gid, node)
+
+  node_path = '/' + '/'.join(ancestors_stack[0])
+  options = dataset_options.get(node_path, {})
+  if node_path in data_filters:
+    create_data_early(node_id, data_filters[node_path][-2], node[1].dtype, options)
+  elif write_if(*ancestors_stack) and node[1] is not None:
+    write_data(node_id, node[1], write_values=write_values, options=options)
+
+  # Write children
+  for child in node[2]:
+    _write_node_skeleton(node_id, child, write_if, ancestors_stack, data_filters, write_values, dataset_options)
+  ancestors_stack[0].pop()
+  ancestors_stack[1].pop()
 
-def load_tree_partial(filename, load_predicate):
+def load_tree_partial(filename, load_predicate, mmap=False):
   """
   Create a pyCGNS tree from the (partial) read of an hdf file.
 
@@ -301,13 +525,18 @@ def load_tree_partial(filename, load_predicate):
     tree as the value of an additional node of name name Node#Size
 
   Note : if load_predicate returns always True, the tree is then fully read.
+
+  If mmap is True, the values of the contiguous datasets are not read but are
+  copy-on-write memory mapped views of the file (pages are then read on demand).
+  Other datasets (chunked, compressed) are read as usual.
   """
   tree = ['CGNSTree', None, [], 'CGNSTree_t']
+  mmaps = dict() if mmap else None
 
   fid = h5f.open(bytes(filename, 'utf-8'), h5f.ACC_RDONLY)
   rootid = h5g.open(fid, b'/')
 
-  iter_func = lambda n : _load_node_partial(h5g.open(rootid, n), tree, load_predicate, ([],[])) \
+  iter_func = lambda n : _load_node_partial(h5g.open(rootid, n), tree, load_predicate, ([],[]), mmaps) \
       if h5o.get_info(rootid, n).type == h5o.TYPE_GROUP else None
   idx_type = h5.INDEX_CRT_ORDER if knows_crt_order(rootid) else h5.INDEX_NAME
   rootid.links.iterate(iter_func, idx_type=idx_type)
@@ -315,7 +544,7 @@ def load_tree_partial(filename, load_predicate):
   fid.close()
   return tree
 
-def write_tree_partial(tree, filename, write_predicate):
+def write_tree_partial(tree, filename, write_predicate, dataset_options={}):
   """
   Write a (partial) hdf file from a pyCGNS tree.
 
@@ -327,6 +556,9 @@ def write_tree_partial(tree, filename, write_predicate):
     datakind is written)
 
   Note : if write_predicate returns always False, the tree is then fully writed.
+
+  dataset_options is a dict {path : options} used to create the datasets
+  (see resolve_dataset_options).
   """
 
   fc_pl = h5p.create(h5p.FILE_CREATE)
@@ -338,7 +570,81 @@ def write_tree_partial(tree, filename, write_predicate):
   # Write some attributes of root node
   add_root_attributes(rootid)
   for node in tree[2]:
-    _write_node_partial(rootid, node, write_predicate, ([],[]))
+    _write_node_partial(rootid, node, write_predicate, ([],[]), dataset_options)
+
+  fid.close()
+
+
+def write_tree_skeleton(tree, filename, write_predicate, data_filters, fapl=None, write_values=True,
+                        dataset_options={}):
+  """
+  Write the skeleton of an hdf file from a pyCGNS tree, in a single pass.
+
+  Nodes are created as in write_tree_partial, but in addition the datasets of
+  the nodes whose path (starting with '/') appears in data_filters are created,
+  without being filled : their dimensions are taken from the global dims entry
+  of the related filter, and their storage is allocated early. These datasets
+  can then be directly filled using write_data_partial(..., create=False).
+
+  This function is intended to be called collectively (using a MPIO fapl) by
+  all the ranks, which must hold the same tree structure. In this case,
+  write_values should be True on exactly one rank (which writes the values of the
+  nodes selected by write_predicate) and False on the other ranks.
+  dataset_options is a dict {path : options} used to create the datasets
+  (see resolve_dataset_options).
+  """
+
+  fc_pl = h5p.create(h5p.FILE_CREATE)
+  fc_pl.set_link_creation_order(h5p.CRT_ORDER_TRACKED | h5p.CRT_ORDER_INDEXED)
+  fid = h5f.create(bytes(filename, 'utf-8'), fcpl=fc_pl, fapl=fapl)
+
+  rootid = h5g.open(fid, b'/')
+
+  add_root_attributes(rootid, write_values)
+  for node in tree[2]:
+    _write_node_skeleton(rootid, node, write_predicate, ([],[]), data_filters, write_values, dataset_options)
 
   fid.close()
 
+def append_tree_partial(tree, filename, write_predicate, paths, data_filters=None, fapl=None, write_values=True,
+                        dataset_options={}):
+  """
+  Add some nodes of a pyCGNS tree into an existing hdf file.
+
+  Only the subtrees of tree located at paths (without leading '/') are written;
+  if a node already exists in the file at one of these paths, it is replaced.
+  Missing ancestors are created, existing ones are left untouched.
+  If data_filters is None, nodes are written as in write_tree_partial; otherwise,
+  nodes are written as in write_tree_skeleton (and the same restrictions apply).
+  dataset_options is a dict {path : options} used to create the datasets.
+
+  Note : the space used by the replaced nodes is not reclaimed in the file.
+  """
+  fid = h5f.open(bytes(filename, 'utf-8'), h5f.ACC_RDWR, fapl)
+  rootid = h5g.open(fid, b'/')
+
+  for path in paths:
+    ancestors_stack = ([],[])
+    gid  = rootid
+    node = tree
+    for name in path.split('/')[:-1]:
+      node = next(child for child in node[2] if child[0] == name)
+      ancestors_stack[0].append(node[0])
+      ancestors_stack[1].append(node[3])
+      if gid.links.exists(name.encode()):
+        gid = h5g.open(gid, name.encode())
+      else:
+        gid = _create_node(gid, node)
+        if write_predicate(*ancestors_stack) and node[1] is not None:
+          options = dataset_options.get('/' + '/'.join(ancestors_stack[0]), {})
+          write_data(gid, node[1], write_values=write_values, options=options)
+    node = next(child for child in node[2] if child[0] == path.split('/')[-1])
+
+    if gid.links.exists(node[0].encode()):
+      gid.unlink(node[0].encode())
+    if data_filters is None:
+      _write_node_partial(gid, node, write_predicate, ancestors_stack, dataset_options)
+    else:
+      _write_node_skeleton(gid, node, write_predicate, ancestors_stack, data_filters, write_values, dataset_options)
+
+  fid.close()
@@ -1,3 +1,5 @@
+import numpy as np
+
 from maia.utils.numbering.range_to_slab import compute_slabs
 
 def create_combined_dataspace(data_shape, distrib):
@@ -83,3 +85,112 @@ def create_data_array_filter(distrib, data_shape=None):
     hdf_data_space = create_combined_dataspace(data_shape, distrib)
 
   return hdf_data_space
+
+def create_indices_dataspace(data_shape, indices):
+  """
+  Create a dataspace loading the elements of given indices from an array of
+  shape data_shape. Indices are flat indices (in the F order of the array),
+  starting at 0, and must be sorted and unique. Each run of consecutive indices is
+  converted into one slab (1d arrays) or into the slabs given by compute_slabs
+  (2d and 3d arrays), giving a combined dataspace.
+  Elements are loaded in a flat array, in the order of indices.
+  """
+  dim = len(data_shape)
+  is_start = np.diff(indices, prepend=-2) != 1
+  starts = indices[is_start]
+  ends   = indices[np.roll(is_start, -1)] + 1
+  DSFILE = []
+  if dim == 1:
+    for start, end in zip(starts.tolist(), ends.tolist()):
+      DSFILE.extend([[start], [1], [end-start], [1]])
+  else:
+    for start, end in zip(starts.tolist(), ends.tolist()):
+      for slab in compute_slabs(data_shape, [start, end]):
+        DSFILE.extend([[bounds[0] for bounds in slab[:dim]], [1]*dim,
+                       [bounds[1]-bounds[0] for bounds in slab[:dim]], [1]*dim])
+  DSMMRY = [[0], [1], [len(indices)], [1]]
+  return DSMMRY + [DSFILE] + [list(data_shape)] + [[0]]
+
+def _sort_by_key(slabs, key_cols, d):
+  """ Sort the slabs (array of shape (n_slabs, 4, dim)) according to the columns
+  key_cols (list of (k, j) indices) then to the start in dimension d.
+  Return the sorted slabs and a bool array indicating, for each pair of consecutive
+  sorted slabs, if they share the same key.  """
+  keys = np.stack([slabs[:,k,j] for k, j in key_cols], axis=1)
+  order = np.lexsort([slabs[:,0,d]] + [keys[:,i] for i in range(keys.shape[1]-1, -1, -1)])
+  slabs, keys = slabs[order], keys[order]
+  return slabs, (keys[1:] == keys[:-1]).all(axis=1)
+
+def _merge_contiguous(slabs, d):
+  """ Merge the slabs that are identical except in dimension d,
+  where they describe adjacent blocks.  """
+  dim = slabs.shape[2]
+  key_cols = [(k, j) for k in range(4) for j in range(dim) if j != d or k in [1,2]]
+  slabs, same_key = _sort_by_key(slabs, key_cols, d)
+  start, count, block = slabs[:,0,d], slabs[:,2,d], slabs[:,3,d]
+  merge_with_prev = same_key & (count[1:] == 1) & (start[1:] == start[:-1] + block[:-1])
+  first = np.flatnonzero(np.concatenate([[True], ~merge_with_prev]))
+  merged = slabs[first]
+  merged[:,3,d] = np.add.reduceat(block, first)
+  return merged
+
+def _merge_strided(slabs, d):
+  """ Rewrite the series of slabs which are identical except in dimension d,
+  where they describe blocks of same size separated by a constant offset,
+  as a single strided slab.  """
+  dim = slabs.shape[2]
+  key_cols = [(k, j) for k in range(4) for j in range(dim) if j != d or k != 0]
+  slabs, same_key = _sort_by_key(slabs, key_cols, d)
+  start, count, block = slabs[:,0,d], slabs[:,2,d], slabs[:,3,d]
+  offset = start[1:] - start[:-1]
+  candidate = (same_key & (count[1:] == 1) & (offset > block[:-1])).tolist()
+  _offset = offset.tolist()
+  first, n_merged = [], []
+  i = 0
+  while i < len(slabs):
+    j = i + 1
+    while j < len(slabs) and candidate[j-1] and _offset[j-1] == _offset[i]:
+      j += 1
+    first.append(i)
+    n_merged.append(j-i)
+    i = j
+  merged = slabs[first]
+  strided = np.flatnonzero(np.array(n_merged) > 1)
+  merged[strided,1,d] = offset[np.array(first)[strided]]
+  merged[strided,2,d] = np.array(n_merged)[strided]
+  return merged
+
+def coalesce_slabs(slab_list):
+  """
+  Reduce the number of hyperslabs of a combined dataspace, without changing the
+  selected elements. slab_list is a flat list [start_1, stride_1, count_1, block_1,
+  start_2, stride_2, ...] as found in the file part of combined dataspaces.
+  Empty slabs are removed, adjacent slabs are merged and series of slabs separated by a
+  constant offset are rewritten as a single strided slab. Since HDF5 always
+  iterates over the union of the selected slabs in file order, the result can be used in
+  place of slab_list.
+  Return a flat list having the same structure than slab_list.
+  """
+  if len(slab_list) == 0:
+    return []
+  dim = len(slab_list[0])
+  slabs = np.array(slab_list, dtype=np.int64).reshape(-1, 4, dim)
+  slabs = slabs[(slabs[:,2] * slabs[:,3] > 0).all(axis=1)]
+
+  # Rewrite dimensions describing a contiguous range of indices as a single block
+  is_dense = (slabs[:,2] == 1) | (slabs[:,1] == slabs[:,3])
+  slabs[:,3] = np.where(is_dense, slabs[:,2] * slabs[:,3], slabs[:,3])
+  slabs[:,1:3][np.stack([is_dense, is_dense], axis=1)] = 1
+
+  n_slabs = None
+  while len(slabs) > 1 and len(slabs) != n_slabs:
+    n_slabs = len(slabs)
+    for d in range(dim):
+      slabs = _merge_contiguous(slabs, d)
+  if len(slabs) > 1:
+    for d in range(dim):
+      slabs = _merge_strided(slabs, d)
+    for d in range(dim):
+      slabs = _merge_contiguous(slabs, d)
+
+  return [list(slab) for slab in slabs.reshape(-1, dim).tolist()]
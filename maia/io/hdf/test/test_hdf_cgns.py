@@ -5,7 +5,7 @@ import numpy as np
 import shutil
 import subprocess
 from pathlib import Path
-from h5py    import h5f, h5g
+from h5py    import h5d, h5f, h5g
 
 import maia.pytree as PT
 
@@ -112,6 +112,20 @@ def test_open_from_path(ref_hdf_file):
   gid = HCG.open_from_path(fid, 'Base/ZoneS/ZoneType')
   gid = HCG.open_from_path(fid, 'Base')
 
+  cache = {}
+  gid = HCG.open_from_path(fid, 'Base/ZoneS/ZoneType', cache=cache)
+  assert sorted(cache.keys()) == ['Base', 'Base/ZoneS', 'Base/ZoneS/ZoneType']
+  assert HCG.open_from_path(fid, 'Base/ZoneS/ZoneType', cache=cache) is gid
+  HCG.open_from_path(fid, 'Base/ZoneU', cache=cache)
+  assert len(cache) == 4
+
+def test_file_handle(ref_hdf_file):
+  with HCG.FileHandle(ref_hdf_file) as hdf_file:
+    gid = hdf_file.open('Base/ZoneU/GridCoordinates/CoordinateX')
+    assert np.array_equal(HCG.load_data(gid), [1,2,3,4,5,6])
+    assert hdf_file.open('Base/ZoneU/GridCoordinates/CoordinateX') is gid
+  assert not gid.valid and not hdf_file.fid.valid
+
 def test_load_data(ref_hdf_file):
   fid = h5f.open(bytes(ref_hdf_file, 'utf-8'), h5f.ACC_RDONLY)
   gid = HCG.open_from_path(fid, 'Base/ZoneU')
@@ -141,6 +155,42 @@ def test_write_data(tmp_hdf_file):
     out[idx+1] = out[idx+1][4:] #Some hdf version include (0) before data : remote it
   assert out[idx+1] == '0, 0, 0, 1, 1, 1'
 
+def test_resolve_dataset_options():
+  tree = parse_yaml_cgns.to_cgns_tree(sample_tree)
+  PT.new_FlowSolution('FS', fields={'Rho' : np.ones(6)}, parent=PT.get_node_from_name(tree, 'ZoneU'))
+  policy = {'GridCoordinates_t' : {'chunks' : True},
+            'FlowSolution_t'    : {'compression' : 'gzip'},
+            'Base/ZoneS/*/CoordinateY' : {'compression' : 'lzf'}}
+  options = HCG.resolve_dataset_options(tree, policy)
+  assert options == {'/Base/ZoneU/GridCoordinates/CoordinateX' : {'chunks' : True},
+                     '/Base/ZoneU/GridCoordinates/CoordinateY' : {'chunks' : True},
+                     '/Base/ZoneU/FS/Rho'                      : {'compression' : 'gzip'},
+                     '/Base/ZoneS/GridCoordinates/CoordinateX' : {'chunks' : True},
+                     '/Base/ZoneS/GridCoordinates/CoordinateY' : {'compression' : 'lzf'}}
+  assert HCG.resolve_dataset_options(tree, None) == {}
+
+def test_truncate_mantissa():
+  array = np.array([1/3, 2/3])
+  assert HCG.truncate_mantissa(array, {}) is array
+  truncated = HCG.truncate_mantissa(array, {'keep_bits' : 4})
+  assert np.array_equal(truncated, [0.328125, 0.65625]) and array[0] == 1/3
+  array = np.array([1, 2], np.int32)
+  assert HCG.truncate_mantissa(array, {'keep_bits' : 4}) is array
+
+@pytest.mark.parametrize("options", [{'chunks' : [2]}, {'compression' : 'gzip', 'shuffle' : True}, {'compression' : 'lzf'}])
+def test_write_data_options(tmp_hdf_file, options):
+  fid = h5f.open(bytes(tmp_hdf_file, 'utf-8'), h5f.ACC_RDWR)
+  gid = HCG.open_from_path(fid, 'Base/ZoneU/GridCoordinates')
+  gid = h5g.create(gid, 'CoordinateZ'.encode())
+  HCG.write_data(gid, np.array([0,1,2,3,4,5], np.float64), options=options)
+  dcpl = h5d.open(gid, b' data').get_create_plist()
+  assert dcpl.get_layout() == h5d.CHUNKED
+  assert dcpl.get_nfilters() == len(options) - ('chunks' in options)
+  # Partial read of chunked data
+  filter = [[0], [1], [2], [1], [3], [1], [2], [1], [6], [1]]
+  assert np.array_equal(HCG.load_data_partial(gid, filter), [3,4])
+  fid.close()
+
 def test_write_link(tmp_hdf_file):
   fid = h5f.open(bytes(tmp_hdf_file, 'utf-8'), h5f.ACC_RDWR)
   gid = HCG.open_from_path(fid, 'Base/ZoneU/GridCoordinates')
@@ -177,6 +227,12 @@ def test_load_data_partial(ref_hdf_file):
                                      [[1,0], [1,1], [1,2], [1,1], [0,0],[1,1],[1,1],[1,1]], [2,2], [0]])
   assert np.array_equal(data, [1,3,4]) and data.dtype == np.float64
 
+  # Multiple, coalesced
+  data = HCG.load_data_partial(gid, [[0], [1], [4], [1], 
+                                     [[1,1], [1,1], [1,1], [1,1], [0,0],[1,1],[1,1],[1,1],
+                                      [0,1], [1,1], [1,1], [1,1], [1,0],[1,1],[1,1],[1,1]], [2,2], [0]])
+  assert np.array_equal(data, [1,3,2,4]) and data.dtype == np.float64
+
 @pytest.mark.parametrize('combinated', [False, True])
 def test_write_data_partial(tmp_hdf_file, combinated):
   fid = h5f.open(bytes(tmp_hdf_file, 'utf-8'), h5f.ACC_RDWR)
@@ -284,9 +340,73 @@ def test_load_tree_partial(partial, ref_hdf_file):
     yt = sample_tree
   assert PT.is_same_tree(tree, parse_yaml_cgns.to_cgns_tree(yt))
 
+def test_load_tree_partial_mmap(ref_hdf_file, tmp_path):
+  tree = HCG.load_tree_partial(ref_hdf_file, lambda N,L : True, mmap=True)
+  assert PT.is_same_tree(tree, parse_yaml_cgns.to_cgns_tree(sample_tree))
+  coord = PT.get_node_from_path(tree, 'Base/ZoneS/GridCoordinates/CoordinateX')[1]
+  assert isinstance(coord, np.memmap) and np.isfortran(coord)
+  coord[0,0] = 42. # Copy on write : file is not modified
+  tree = HCG.load_tree_partial(ref_hdf_file, lambda N,L : True)
+  assert PT.get_node_from_path(tree, 'Base/ZoneS/GridCoordinates/CoordinateX')[1][0,0] == 1.
+
+  # Compressed data is read
+  tree = parse_yaml_cgns.to_cgns_tree(sample_tree)
+  outfile = str(tmp_path / Path('compressed.hdf'))
+  HCG.write_tree_partial(tree, outfile, lambda N,L : True, {'/Base/ZoneU/GridCoordinates/CoordinateX' : {'compression' : 'gzip'}})
+  tree = HCG.load_tree_partial(outfile, lambda N,L : True, mmap=True)
+  assert PT.is_same_tree(tree, parse_yaml_cgns.to_cgns_tree(sample_tree))
+  assert not isinstance(PT.get_node_from_path(tree, 'Base/ZoneU/GridCoordinates/CoordinateX')[1], np.memmap)
+  assert isinstance(PT.get_node_from_path(tree, 'Base/ZoneU/GridCoordinates/CoordinateY')[1], np.memmap)
+
 def test_write_tree_partial(tmp_path, ref_hdf_file):
   tree = parse_yaml_cgns.to_cgns_tree(sample_tree)
   outfile = str(tmp_path / Path('only_coords.hdf'))
   HCG.write_tree_partial(tree, outfile, lambda N,L : True)
   cmd = ["h5diff", f"{ref_hdf_file}", f"{outfile}", "Base"] #hdf5version dataset can vary
   assert subprocess.run(cmd).returncode == 0
+
+def test_write_tree_skeleton(tmp_path):
+  tree = parse_yaml_cgns.to_cgns_tree(sample_tree)
+  outfile = str(tmp_path / Path('skeleton.hdf'))
+  data_filters = {'/Base/ZoneU/GridCoordinates/CoordinateX' : [[0], [1], [2], [1], [4], [1], [2], [1], [6], [1]]}
+  HCG.write_tree_skeleton(tree, outfile, lambda N,L : N[-1] != 'CoordinateY', data_filters)
+
+  fid = h5f.open(bytes(outfile, 'utf-8'), h5f.ACC_RDWR)
+  # Dataset is allocated but not written
+  gid = HCG.open_from_path(fid, 'Base/ZoneU/GridCoordinates/CoordinateX')
+  assert h5d.open(gid, b' data').shape == (6,)
+  HCG.write_data_partial(gid, np.array([5., 6.]), data_filters['/Base/ZoneU/GridCoordinates/CoordinateX'], create=False)
+  # Other nodes are written according to predicate
+  gid = HCG.open_from_path(fid, 'Base/ZoneS/GridCoordinates/CoordinateX')
+  assert np.array_equal(HCG.load_data(gid), [[1., 2.], [3., 4.]])
+  gid = HCG.open_from_path(fid, 'Base/ZoneS/GridCoordinates/CoordinateY')
+  assert HCG.AttributeRW().read_bytes_3(gid, b'type') == b'R8'
+  assert not gid.links.exists(b' data')
+  fid.close()
+
+  fid = h5f.open(bytes(outfile, 'utf-8'), h5f.ACC_RDONLY)
+  gid = HCG.open_from_path(fid, 'Base/ZoneU/GridCoordinates/CoordinateX')
+  assert np.array_equal(HCG.load_data(gid)[4:], [5., 6.])
+  fid.close()
+
+def test_append_tree_partial(tmp_path):
+  tree = parse_yaml_cgns.to_cgns_tree(sample_tree)
+  outfile = str(tmp_path / Path('append.hdf'))
+  HCG.write_tree_partial(tree, outfile, lambda N,L : True)
+
+  zone = PT.get_node_from_name(tree, 'ZoneU')
+  PT.new_FlowSolution('FS', fields={'Rho' : np.ones(6)}, parent=zone)
+  PT.new_node('BaseIterativeData', 'BaseIterativeData_t', 1, parent=PT.get_node_from_name(tree, 'Base'))
+  PT.rm_nodes_from_name(tree, 'CoordinateY') # Not in paths : not removed from file
+  HCG.append_tree_partial(tree, outfile, lambda N,L : True, ['Base/ZoneU/FS', 'Base/BaseIterativeData'])
+  PT.set_value(PT.get_node_from_name(tree, 'BaseIterativeData'), 2)
+  HCG.append_tree_partial(tree, outfile, lambda N,L : True, ['Base/BaseIterativeData'])
+
+  fid = h5f.open(bytes(outfile, 'utf-8'), h5f.ACC_RDONLY)
+  gid = HCG.open_from_path(fid, 'Base/ZoneU/FS/Rho')
+  assert np.array_equal(HCG.load_data(gid), np.ones(6))
+  gid = HCG.open_from_path(fid, 'Base/ZoneU/GridCoordinates/CoordinateY')
+  assert np.array_equal(HCG.load_data(gid), [-1., -2., -3., -4., -5., -6.])
+  gid = HCG.open_from_path(fid, 'Base/BaseIterativeData')
+  assert HCG.load_data(gid) == 2
+  fid.close()
@@ -54,3 +54,27 @@ def test_create_data_array_filter():
   assert hdf_dataspace.create_data_array_filter([0,10,100], [5,4,5]) == \
       hdf_dataspace.create_combined_dataspace([5,4,5], [0,10,100])
 
+
+def test_coalesce_slabs():
+  assert hdf_dataspace.coalesce_slabs([]) == []
+  # Empty slabs are removed
+  assert hdf_dataspace.coalesce_slabs([[0,0], [1,1], [2,0], [1,1], [0,1], [1,1], [2,1], [1,1]]) == \
+      [[0,1], [1,1], [1,1], [2,1]]
+  # Adjacent lines are merged
+  assert hdf_dataspace.coalesce_slabs([[0,0], [1,1], [4,1], [1,1], [0,1], [1,1], [4,1], [1,1],
+                                       [0,2], [1,1], [4,1], [1,1]]) == \
+      [[0,0], [1,1], [1,1], [4,3]]
+  # Sub block of a 3d array : lines are merged into a single slab
+  slabs = []
+  for k in range(5,25):
+    for j in range(3,17):
+      slabs.extend([[2,j,k], [1,1,1], [10,1,1], [1,1,1]])
+  assert hdf_dataspace.coalesce_slabs(slabs) == [[2,3,5], [1,1,1], [1,1,1], [10,14,20]]
+  # Regularly spaced planes are rewritten as a strided slab
+  slabs = []
+  for k in range(0,40,2):
+    slabs.extend([[0,0,k], [1,1,1], [20,30,1], [1,1,1]])
+  assert hdf_dataspace.coalesce_slabs(slabs) == [[0,0,0], [1,1,2], [1,1,20], [20,30,1]]
+  # Slabs from compute_slabs are kept
+  slabs = hdf_dataspace.create_combined_dataspace([10,2,5], [3,57,100])[4]
+  assert len(hdf_dataspace.coalesce_slabs(slabs)) == len(slabs)
@@ -0,0 +1,152 @@
+import numpy as np
+
+import maia.pytree as PT
+
+# DataArray_t nodes found under these containers are not loaded in lazy mode
+lazy_containers = ['FlowSolution_t', 'DiscreteData_t', 'ZoneSubRegion_t', 'BCData_t']
+
+class LazyArray(np.lib.mixins.NDArrayOperatorsMixin):
+  """ A placeholder for the (distributed) value of a DataArray_t node, which
+  is read from the file only when it is accessed.
+
+  The placeholder stores the name of the file, the path of the node in the file
+  and the hdf filter describing the slab to read. Data is read (independently
+  by each process) when ``load()`` is called, when the placeholder is converted
+  to a numpy array (eg with ``np.asarray``) or by ``ensure_loaded``; the
+  placeholder is then replaced by the loaded array in the tree.
+  Other array accesses (indexing, operators, ufuncs, ``reshape``, ``astype``, ...)
+  also load the data and are forwarded to the loaded array.
+  """
+  def __init__(self, filename, path, filter, node=None):
+    self.filename = filename
+    self.path     = path
+    self.filter   = filter
+    self.shape    = tuple(filter[2])
+    self._node    = node
+    self._dtype   = None
+    self._array   = None
+
+  @property
+  def ndim(self):
+    return len(self.shape)
+
+  @property
+  def size(self):
+    return int(np.prod(self.shape))
+
+  @property
+  def nbytes(self):
+    """ Resident size of the data : 0 until it is loaded """
+    return 0 if self._array is None else self._array.nbytes
+
+  @property
+  def dtype(self):
+    if self._array is not None:
+      return self._array.dtype
+    if self._dtype is None:
+      from h5py import h5d
+      from .hdf._hdf_cgns import FileHandle
+      with FileHandle(self.filename) as hdf_file:
+        gid = hdf_file.open(self.path[1:]) #! Path has '/'
+        self._dtype = h5d.open(gid, b' data').dtype
+    return self._dtype
+
+  def load(self, hdf_file=None):
+    """ Read the data from the file and return it. If the placeholder is
+    still the value of its node, the node is updated with the loaded array.
+    An already open FileHandle can be provided. Data is read only once.  """
+    if self._array is None:
+      from .hdf._hdf_cgns import FileHandle, load_data_partial
+      _hdf_file = FileHandle(self.filename) if hdf_file is None else hdf_file
+      gid = _hdf_file.open(self.path[1:]) #! Path has '/'
+      self._array = load_data_partial(gid, self.filter)
+      if hdf_file is None:
+        _hdf_file.close()
+    if self._node is not None and self._node[1] is self:
+      self._node[1] = self._array
+    return self._array
+
+  def __array__(self, dtype=None, copy=None):
+    array = self.load()
+    return array if dtype is None else array.astype(dtype, copy=False)
+
+  def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+    inputs = [x.load() if isinstance(x, LazyArray) else x for x in inputs]
+    if 'out' in kwargs:
+      kwargs['out'] = tuple(x.load() if isinstance(x, LazyArray) else x for x in kwargs['out'])
+    return getattr(ufunc, method)(*inputs, **kwargs)
+
+  def __getattr__(self, name):
+    # Only called for the attributes not defined by the placeholder
+    if name.startswith('_'):
+      raise AttributeError(name)
+    return getattr(self.load(), name)
+
+  def __getitem__(self, key):
+    return self.load()[key]
+
+  def __setitem__(self, key, value):
+    self.load()[key] = value
+
+  def __len__(self):
+    return len(self.load())
+
+  def __repr__(self):
+    return f"LazyArray({self.path}, shape={self.shape})"
+
+def is_lazy(node):
+  """ Return True if the value of node is a LazyArray """
+  return isinstance(node[1], LazyArray)
+
+def set_lazy_values(filename, dist_tree, hdf_filter):
+  """
+  For each DataArray_t of hdf_filter found under a container listed in lazy_containers,
+  set a LazyArray as value of the node of dist_tree instead of reading it.
+  Return the filter of the remaining (non lazy) entries.
+  """
+  remaining_filter = dict()
+  for path, filter in hdf_filter.items():
+    node   = PT.get_node_from_path(dist_tree, path[1:]) #! Path has '/'
+    parent = PT.get_node_from_path(dist_tree, PT.path_head(path[1:]))
+    if PT.get_label(node) == 'DataArray_t' and PT.get_label(parent) in lazy_containers:
+      node[1] = LazyArray(filename, path, filter, node)
+    else:
+      remaining_filter[path] = filter
+  return remaining_filter
+
+def ensure_loaded(tree, predicates=None):
+  """Load the lazy values of a distributed tree.
+
+  All the lazy values found in the subtrees matching predicates (or in the whole
+  tree if predicates is None) are read from the file, and replace the
+  placeholders in the tree. This function does not need to be called
+  collectively.
+
+  Args:
+    tree (CGNSTree) : Distributed tree, loaded with ``lazy=True``
+    predicates (optional) : Predicates selecting the subtrees to load, eg
+      ``'CGNSBase_t/Zone_t/FlowSolution_t'``. Defaults to None.
+
+  Example:
+      .. literalinclude:: snippets/test_io.py
+        :start-after: #ensure_loaded@start
+        :end-before: #ensure_loaded@end
+        :dedent: 2
+  """
+  roots = [tree] if predicates is None else PT.get_nodes_from_predicates(tree, predicates)
+  lazy_nodes = {}
+  for root in roots:
+    for node in PT.iter_nodes_from_predicate(root, is_lazy, explore='deep'):
+      lazy_nodes[id(node)] = node
+
+  # Group by file to open each file only once
+  files_to_nodes = {}
+  for node in lazy_nodes.values():
+    files_to_nodes.setdefault(node[1].filename, []).append(node)
+
+  if files_to_nodes:
+    from .hdf._hdf_cgns import FileHandle
+  for filename, nodes in files_to_nodes.items():
+    with FileHandle(filename) as hdf_file:
+      for node in nodes:
+        node[1] = node[1].load(hdf_file)
@@ -0,0 +1,286 @@
+import time
+import heapq
+import numpy as np
+import mpi4py.MPI as MPI
+
+import maia.pytree        as PT
+import maia.pytree.maia   as MT
+import maia.utils.logging as mlog
+
+from maia.transfer import utils as te_utils
+from maia.utils    import par_utils
+from maia.factory.partitioning.load_balancing.multi_zone_balancing import karmarkar_karp
+
+from .cgns_io_tree      import load_collective_size_tree, prune_size_tree
+from .hdf.hdf_dataspace import create_indices_dataspace
+
+# Containers which can be read from a distributed file directly into the partitions
+part_containers = ['GridCoordinates_t', 'FlowSolution_t', 'DiscreteData_t']
+
+def _iter_loadable_containers(dist_zone):
+  """ Yield the (container, location) pairs of the containers of dist_zone which
+  can be loaded into the partitions, ie the nodes of label part_containers which
+  are not subsets and are located at vertices or cells.  """
+  for container in PT.get_children(dist_zone):
+    if PT.get_label(container) == 'GridCoordinates_t':
+      yield container, 'Vertex'
+    elif PT.get_label(container) in part_containers:
+      is_subset = PT.get_child_from_name(container, 'PointList') is not None or \
+                  PT.get_child_from_name(container, 'PointRange') is not None
+      location = PT.Subset.GridLocation(container)
+      if not is_subset and location in ['Vertex', 'CellCenter']:
+        yield container, location
+
+def _load_part_container(hdf_file, container_path, container, location, part_zones):
+  """ Read the arrays of a distributed container into the partitioned zones.
+  Each process reads only the rows required by its partitions (deduced from their
+  global numbering) and dispatches them. Return the number of bytes read.  """
+  from .hdf._hdf_cgns import load_data_partial
+
+  gnum_name = 'Vertex' if location == 'Vertex' else 'Cell'
+  lngn_list = te_utils.collect_cgns_g_numbering(part_zones, gnum_name)
+  indices   = np.unique(np.concatenate([np.empty(0, np.int64)] + lngn_list)) - 1
+  positions = [np.searchsorted(indices, lngn - 1) for lngn in lngn_list]
+
+  p_containers = []
+  for part_zone in part_zones:
+    p_container = PT.update_child(part_zone, PT.get_name(container), PT.get_label(container))
+    if PT.get_label(container) != 'GridCoordinates_t':
+      PT.update_child(p_container, 'GridLocation', 'GridLocation_t', location)
+    p_containers.append(p_container)
+
+  n_bytes = 0
+  for array_n in PT.get_children_from_label(container, 'DataArray_t'):
+    if PT.get_name(array_n).endswith('#Size'):
+      continue
+    data_shape = PT.get_child_from_name(container, PT.get_name(array_n) + '#Size')[1].tolist()
+    filter = create_indices_dataspace(data_shape, indices)
+    gid = hdf_file.open(f'{container_path}/{PT.get_name(array_n)}')
+    array = load_data_partial(gid, filter, hdf_file.dxpl)
+    n_bytes += array.nbytes
+    for part_zone, p_container, position in zip(part_zones, p_containers, positions):
+      shape = PT.Zone.VertexSize(part_zone) if location == 'Vertex' else PT.Zone.CellSize(part_zone)
+      PT.update_child(p_container, PT.get_name(array_n), 'DataArray_t', array[position].reshape(shape, order='F'))
+  return n_bytes
+
+def file_to_part_tree(filename, part_tree, comm, include=[], exclude=[], collective=False, hints={}):
+  """Load the fields of a distributed CGNS file directly into a partitioned tree.
+
+  The partitioned zones of ``part_tree`` (obtained from a previous partitioning
+  of the same mesh, eg loaded with :func:`load_part_tree`) must hold their
+  ``:CGNS#GlobalNumbering`` nodes. The GridCoordinates_t, FlowSolution_t and DiscreteData_t
+  nodes of the file which are located at Vertex or CellCenter (and are not
+  defined with a PointList or a PointRange) are read, and added (or replaced) in the
+  corresponding partitioned zones.
+
+  Each process only reads the rows required by its partitions, using the
+  global numbering of their vertices or cells; the distributed tree is never
+  built, which roughly halves the memory footprint compared to
+  :func:`file_to_dist_tree` followed by a transfer to the partitions.
+  This function is only available with the h5py backend.
+
+  Args:
+    filename (str) : Path of the file
+    part_tree (CGNSTree) : Partitioned tree, updated inplace
+    comm     (MPIComm) : MPI communicator
+    include (list of str, optional) : Paths of the nodes to load (see :func:`file_to_dist_tree`).
+      Defaults to [].
+    exclude (list of str, optional) : Paths of the nodes not to load. Defaults to [].
+    collective (bool, optional) : Use collective MPI-IO reads. Defaults to False.
+    hints (dict, optional) : Additional MPI-IO hints used in collective mode.
+
+  Example:
+      .. literalinclude:: snippets/test_io.py
+        :start-after: #file_to_part_tree@start
+        :end-before: #file_to_part_tree@end
+        :dedent: 2
+  """
+  from ._hdf_io_h5py import open_file
+
+  mlog.info(f"Partitioned read of file {filename}...")
+  start = time.time()
+  filename = str(filename)
+
+  size_tree = load_collective_size_tree(filename, comm)
+  prune_size_tree(size_tree, include, exclude)
+
+  n_bytes  = 0
+  hdf_file = open_file(filename, comm if collective else None, hints)
+  for zone_path in PT.predicates_to_paths(size_tree, 'CGNSBase_t/Zone_t'):
+    dist_zone  = PT.get_node_from_path(size_tree, zone_path)
+    part_zones = te_utils.get_partitioned_zones(part_tree, zone_path)
+    if len(part_zones) == 0 and not collective:
+      continue
+    for container, location in _iter_loadable_containers(dist_zone):
+      container_path = f'{zone_path}/{PT.get_name(container)}'
+      n_bytes += _load_part_container(hdf_file, container_path, container, location, part_zones)
+  hdf_file.close()
+
+  end = time.time()
+  all_n_bytes = comm.allreduce(n_bytes, MPI.SUM)
+  mlog.info(f"Read completed ({end-start:.2f} s) --"
+            f" Size of data read by current rank is {mlog.bsize_to_str(n_bytes)}"
+            f" (Σ={mlog.bsize_to_str(all_n_bytes)})")
+
+def _load_top_tree(filename):
+  """ Load the top level nodes of a partitioned file : the bases and their children, excepted
+  the zones. Return this tree and the list of (path, dims) of the zones.  """
+  from h5py import h5, h5g, h5o
+  from .hdf._hdf_cgns import FileHandle, AttributeRW, knows_crt_order, load_data, _load_node_partial
+
+  attr_reader = AttributeRW()
+  top_tree = ['CGNSTree', None, [], 'CGNSTree_t']
+  zones = []
+
+  def load_child(gid, parent, ancestors_stack):
+    if attr_reader.read_bytes_3(gid, b'type') == b'LK':
+      gid = h5g.open(gid, b' link')
+    name  = attr_reader.read_str_33(gid, b'name')
+    label = attr_reader.read_str_33(gid, b'label')
+    if label == 'CGNSBase_t':
+      base = PT.new_node(name, label, load_data(gid), parent=parent)
+      iterate(gid, base, ([name], [label]))
+    elif label == 'Zone_t':
+      zones.append((f'{ancestors_stack[0][0]}/{name}', load_data(gid)))
+    else:
+      _load_node_partial(gid, parent, lambda X,Y: True, ancestors_stack)
+
+  def iterate(gid, parent, ancestors_stack):
+    iter_func = lambda n : load_child(h5g.open(gid, n), parent, ancestors_stack) \
+        if h5o.get_info(gid, n).type == h5o.TYPE_GROUP else None
+    idx_type = h5.INDEX_CRT_ORDER if knows_crt_order(gid) else h5.INDEX_NAME
+    gid.links.iterate(iter_func, idx_type=idx_type)
+
+  with FileHandle(filename) as hdf_file:
+    iterate(h5g.open(hdf_file.fid, b'/'), top_tree, ([], []))
+  return top_tree, zones
+
+def _repart_partitions(weights, n_rank):
+  """ Distribute the partitions (of given weights) over n_rank processes.
+  Return, for each process, the list of the indices of its partitions.  """
+  if len(weights) * n_rank <= 2**20:
+    return karmarkar_karp(weights, n_rank)
+  # Karmarkar-Karp stores n_rank subsets for each partition : use greedy LPT heuristic
+  # (heaviest partition to least loaded process) for large cases
+  loads = [(0, i) for i in range(n_rank)]
+  repart = [[] for i in range(n_rank)]
+  for i_part in np.argsort(weights, kind='stable')[::-1]:
+    load, i_rank = heapq.heappop(loads)
+    repart[i_rank].append(int(i_part))
+    heapq.heappush(loads, (load + weights[i_part], i_rank))
+  return repart
+
+def _rename_partitions(part_tree, renaming):
+  """ Rename the partitioned zones of part_tree according to renaming dict
+  {old_zone_path : new_zone_path}, and update the references to these zones
+  (donor names of the joins, and names of the joins between partitions).
+  renaming must include the zones of all the processes.  """
+  is_1to1_gc = lambda n: PT.get_label(n) in ['GridConnectivity_t', 'GridConnectivity1to1_t'] \
+                         and PT.GridConnectivity.is1to1(n)
+  for p_base, p_zone in PT.iter_children_from_predicates(part_tree, 'CGNSBase_t/Zone_t', ancestors=True):
+    cur_zone_path = renaming[PT.get_name(p_base) + '/' + PT.get_name(p_zone)]
+    PT.set_name(p_zone, PT.path_tail(cur_zone_path))
+    for gc in PT.iter_children_from_predicates(p_zone, ['ZoneGridConnectivity_t', is_1to1_gc]):
+      opp_zone_path = PT.getZoneDonorPath(PT.get_name(p_base), gc)
+      opp_zone_path = renaming.get(opp_zone_path, opp_zone_path)
+      PT.set_value(gc, opp_zone_path if '/' in PT.get_value(gc) else PT.path_tail(opp_zone_path))
+      if MT.conv.is_intra_gc(PT.get_name(gc)):
+        cur_suffix = MT.conv.get_part_suffix(cur_zone_path)
+        opp_suffix = MT.conv.get_part_suffix(opp_zone_path)
+        PT.set_name(gc, MT.conv.name_intra_gc(*cur_suffix, *opp_suffix))
+        donor_name = PT.get_child_from_name(gc, 'GridConnectivityDonorName')
+        if donor_name is not None:
+          PT.set_value(donor_name, MT.conv.name_intra_gc(*opp_suffix, *cur_suffix))
+
+def _pop_saved_comm_size(top_tree):
+  """ Remove from the bases of top_tree the nodes recording the number of processes used
+  to write the file (see save_part_tree), and return this number (None if not
+  recorded, eg for older files).  """
+  comm_size = None
+  for base in PT.get_all_CGNSBase_t(top_tree):
+    save_info = PT.get_child_from_name(base, ':CGNS#SaveInfo')
+    if save_info is not None:
+      comm_size = int(PT.get_value(PT.get_child_from_name(save_info, 'CommSize'))[0])
+      PT.rm_child(base, save_info)
+  return comm_size
+
+def load_part_tree(filename, comm):
+  """Load a partitioned tree written with :func:`part_tree_to_file`.
+
+  The file can be a single file or a main file linking to subfiles. If the number of
+  processes is the same than when the tree was written, each process
+  reads the partitions it wrote. Otherwise, the saved partitions are distributed
+  (without being split) over the processes, balancing their number of cells
+  with the Karmarkar-Karp algorithm; they are then renamed according to the maia
+  convention (``Zone.P<rank>.N<i>``), and the joins between partitions are
+  updated. In both cases, no partitioning is performed.
+  This function is only available with the h5py backend.
+
+  Args:
+    filename (str) : Path of the file
+    comm     (MPIComm) : MPI communicator
+  Returns:
+    CGNSTree: Partitioned CGNS tree
+
+  Example:
+      .. literalinclude:: snippets/test_io.py
+        :start-after: #load_part_tree@start
+        :end-before: #load_part_tree@end
+        :dedent: 2
+  """
+  from .hdf._hdf_cgns import FileHandle, _load_node_partial
+
+  mlog.info(f"Read of partitioned file {filename}...")
+  start = time.time()
+  filename = str(filename)
+  n_rank = comm.Get_size()
+
+  if comm.Get_rank() == 0:
+    top_tree, zones = _load_top_tree(filename)
+    zone_paths = [path for path, _ in zones]
+    saved_ranks = [MT.conv.get_part_suffix(path)[0] for path in zone_paths]
+    saved_n_rank = _pop_saved_comm_size(top_tree)
+    if saved_n_rank is None: # Older files : guess it from the ranks owning a partition
+      saved_n_rank = max(saved_ranks) + 1 if saved_ranks else n_rank
+    if len(zones) == 0 or saved_n_rank == n_rank:
+      repart = [[] for i in range(n_rank)]
+      for i_part, i_rank in enumerate(saved_ranks):
+        repart[i_rank].append(i_part)
+      renaming = None
+    else:
+      weights = [int(np.prod(dims[:,1])) for _, dims in zones]
+      repart = _repart_partitions(weights, n_rank)
+      renaming = dict()
+      for i_rank, rank_parts in enumerate(repart):
+        repart[i_rank] = sorted(rank_parts)
+        n_part_per_zone = dict()
+        for i_part in repart[i_rank]:
+          base_name, zone_name = zone_paths[i_part].split('/')
+          dist_zone_path = f'{base_name}/{MT.conv.get_part_prefix(zone_name)}'
+          i_part_zone = n_part_per_zone.get(dist_zone_path, 0)
+          n_part_per_zone[dist_zone_path] = i_part_zone + 1
+          renaming[zone_paths[i_part]] = MT.conv.add_part_suffix(dist_zone_path, i_rank, i_part_zone)
+    my_zone_paths = [[zone_paths[i_part] for i_part in rank_parts] for rank_parts in repart]
+  else:
+    top_tree, my_zone_paths, renaming = None, None, None
+
+  top_tree      = par_utils.bcast_tree(top_tree, comm, root=0)
+  my_zone_paths = comm.scatter(my_zone_paths, root=0)
+  renaming      = comm.bcast(renaming, root=0)
+
+  part_tree = top_tree
+  with FileHandle(filename) as hdf_file:
+    for zone_path in my_zone_paths:
+      base_name = PT.path_head(zone_path)
+      gid = hdf_file.open(zone_path)
+      _load_node_partial(gid, PT.get_child_from_name(part_tree, base_name), lambda X,Y: True,
+                         ([base_name], ['CGNSBase_t']))
+
+  if renaming is not None:
+    _rename_partitions(part_tree, renaming)
+
+  end = time.time()
+  n_part = comm.allreduce(len(my_zone_paths), MPI.SUM)
+  mlog.info(f"Read completed ({end-start:.2f} s) -- {n_part} partitions distributed over {n_rank} processes"
+            f"{'' if renaming is None else ' (partitions have been redistributed)'}")
+  return part_tree
@@ -1,4 +1,6 @@
 import os
+import numpy as np
+
 import maia
 import maia.pytree        as PT
 
@@ -6,19 +8,93 @@ from maia.factory.dist_from_part import discover_nodes_from_matching
 
 from .cgns_io_tree import write_tree
 
-def save_part_tree(part_tree, filename, comm, single_file=False, legacy=False):
+def _to_skeleton(node):
+  """ Return a copy of node where values are replaced by their (dtype, shape) """
+  meta = None if node[1] is None else (node[1].dtype.str, node[1].shape)
+  return [node[0], meta, [_to_skeleton(child) for child in node[2]], node[3]]
+
+def _from_skeleton(node):
+  """ Inverse of _to_skeleton : values are replaced by (non allocated) broadcasted arrays """
+  value = None if node[1] is None else np.broadcast_to(np.empty(1, node[1][0]), node[1][1])
+  return [node[0], value, [_from_skeleton(child) for child in node[2]], node[3]]
+
+def _iter_valued_nodes(node, path):
+  """ Yield the (path, node) pairs of the descendants of node having a value """
+  for child in node[2]:
+    child_path = f'{path}/{child[0]}' if path else child[0]
+    if child[1] is not None:
+      yield child_path, child
+    yield from _iter_valued_nodes(child, child_path)
+
+def _write_part_tree_parallel(top_tree, part_tree, filename, comm, hints, policy):
+  """ Write the top tree (by rank 0) and the partitioned zones (by their owner)
+  concurrently into a single file. The skeleton of the file is created collectively
+  (from gathered metadata) with the MPIO driver, then each rank writes
+  its datasets independently.  """
+  from h5py import h5f
+  from ._hdf_io_h5py import _create_mpio_fapl
+  from .hdf._hdf_cgns import open_from_path, write_tree_skeleton, write_data_partial,\
+                             resolve_dataset_options, has_filters
+
+  owned_nodes = list(_iter_valued_nodes(top_tree, '')) if comm.Get_rank() == 0 else []
+
+  # Gather the skeleton of all the zones
+  local_zones = [(PT.get_name(base), _to_skeleton(zone)) for base, zone in \
+      PT.iter_nodes_from_predicates(part_tree, 'CGNSBase_t/Zone_t', ancestors=True)]
+  full_tree = PT.shallow_copy(top_tree)
+  for rank_zones in comm.allgather(local_zones):
+    for base_name, zone in rank_zones:
+      PT.add_child(PT.get_child_from_name(full_tree, base_name), _from_skeleton(zone))
+  for base, zone in PT.iter_nodes_from_predicates(part_tree, 'CGNSBase_t/Zone_t', ancestors=True):
+    owned_nodes.extend(_iter_valued_nodes([None, None, [zone], None], PT.get_name(base)))
+
+  # Full dataspaces
+  full_filter = lambda shape : [[0]*len(shape), [1]*len(shape), list(shape), [1]*len(shape)] * 2 \
+      + [list(shape), [0]]
+  data_filters = {'/'+path : full_filter(node[1].shape) for path, node in _iter_valued_nodes(full_tree, '')}
+
+  dataset_options = resolve_dataset_options(full_tree, policy)
+  if any([has_filters(options) for options in dataset_options.values()]):
+    raise ValueError("Compressed datasets can not be written in parallel mode")
+
+  fapl = _create_mpio_fapl(comm, hints)
+  write_tree_skeleton(full_tree, filename, lambda X,Y: False, data_filters, fapl, comm.Get_rank() == 0,
+                      dataset_options)
+
+  fid = h5f.open(bytes(filename, 'utf-8'), h5f.ACC_RDWR, fapl)
+  for path, node in owned_nodes:
+    if node[1].size > 0:
+      gid = open_from_path(fid, path)
+      write_data_partial(gid, node[1], data_filters['/'+path], create=False,
+                         options=dataset_options.get('/'+path, {}))
+      gid.close()
+  fid.close()
+
+def save_part_tree(part_tree, filename, comm, single_file=False, legacy=False, parallel=False, hints={},
+                   policy=None):
   """Gather the partitioned zones managed by all the processes and write it in a unique
   hdf container.
 
   If ``single_file`` is True, one file named *filename* storing all the partitioned
   zones is written.  Otherwise, hdf links are used to produce a main file *filename*
   linking to additional subfiles.
+
+  By default, the processes write their zones in the single file one after the other.
+  If ``parallel`` is True, the structure of the file is created collectively using
+  the MPI-IO driver, then all the processes write their zones concurrently; MPI-IO
+  hints can be provided through ``hints``.
   
   Args:
     part_tree (CGNSTree) : Partitioned tree
     filename (str) : Path of the output file
     comm     (MPIComm) : MPI communicator
     single_file (bool) : Produce a unique file if True; use CGNS links otherwise.
+    parallel (bool, optional) : Write the zones concurrently in single file mode.
+      Defaults to False.
+    hints (dict, optional) : MPI-IO hints used in parallel mode.
+    policy (dict, optional) : Dataset creation policy (chunking, compression), see
+      :ref:`dataset creation policy <io_policy>`. Compressed datasets can not be used
+      in parallel mode. Defaults to None.
 
   Example:
       .. literalinclude:: snippets/test_io.py
@@ -33,12 +109,20 @@ def save_part_tree(part_tree, filename, comm, single_file=False, legacy=False):
   # Recover base data and families
   top_tree = PT.new_CGNSTree()
   discover_nodes_from_matching(top_tree, [part_tree], 'CGNSBase_t', comm, get_value='all', child_list=['Family_t'])
+  # Record the number of processes, used by load_part_tree to detect a restart on the same number
+  for base in PT.get_all_CGNSBase_t(top_tree):
+    save_info = PT.new_node(':CGNS#SaveInfo', 'UserDefinedData_t', parent=base)
+    PT.new_DataArray('CommSize', np.array([comm.Get_size()], np.int32), parent=save_info)
+
+  if single_file and parallel:
+    assert not legacy, "Parallel write is only available with h5py backend"
+    _write_part_tree_parallel(top_tree, part_tree, filename, comm, hints, policy)
 
-  if single_file:
+  elif single_file:
     # Sequential write seems to be faster than collective io -- see 01d84da7 for other methods
     # Create file and write Bases
     if rank == 0:
-      write_tree(top_tree, filename, legacy=legacy)
+      write_tree(top_tree, filename, legacy=legacy, policy=policy)
     comm.barrier()
     for i in range(comm.Get_size()):
       if i == rank:
@@ -47,12 +131,14 @@ def save_part_tree(part_tree, filename, comm, single_file=False, legacy=False):
           writeZones(part_tree, filename, proc=-1)
         else:
           from h5py import h5f
-          from .hdf._hdf_cgns import open_from_path, _write_node_partial
+          from .hdf._hdf_cgns import open_from_path, _write_node_partial, resolve_dataset_options
+          dataset_options = resolve_dataset_options(part_tree, policy)
           fid = h5f.open(bytes(filename, 'utf-8'), h5f.ACC_RDWR)
           for zone_path in maia.pytree.predicates_to_paths(part_tree, 'CGNSBase_t/Zone_t'):
             zone = PT.get_node_from_path(part_tree, zone_path)
             gid = open_from_path(fid, zone_path.split('/')[0])
-            _write_node_partial(gid, zone, lambda X,Y: True, ([],[]))
+            _write_node_partial(gid, zone, lambda X,Y: True, ([zone_path.split('/')[0]],['CGNSBase_t']),
+                                dataset_options)
             gid.close()
           fid.close()
       comm.barrier()
@@ -62,10 +148,10 @@ def save_part_tree(part_tree, filename, comm, single_file=False, legacy=False):
     for zone_path in maia.pytree.predicates_to_paths(part_tree, 'CGNSBase_t/Zone_t'):
       links += [['', subfilename, zone_path, zone_path]]
 
-    write_tree(part_tree, subfilename, legacy=legacy) #Use direct API to manage name
+    write_tree(part_tree, subfilename, legacy=legacy, policy=policy) #Use direct API to manage name
 
     _links = comm.gather(links, root=0)
     if rank == 0:
       links  = [l for proc_links in _links for l in proc_links] #Flatten gather result
-      write_tree(top_tree, filename, links=links, legacy=legacy)
+      write_tree(top_tree, filename, links=links, legacy=legacy, policy=policy)
 
@@ -0,0 +1,50 @@
+from pytest_mpi_check._decorator import mark_mpi_test
+
+import os
+import numpy as np
+
+import maia.pytree as PT
+import maia.utils.test_utils as TU
+from maia.pytree.yaml import parse_yaml_cgns
+
+import maia.io
+
+@mark_mpi_test(2)
+def test_dist_tree_to_file_async(sub_comm):
+  if sub_comm.Get_rank() == 0:
+    yt = """
+Base CGNSBase_t I4 [3, 3]:
+  Zone Zone_t I4 [[6, 0, 0]]:
+    ZoneType ZoneType_t 'Unstructured':
+    GridCoordinates GridCoordinates_t:
+      CoordinateX DataArray_t R8 [0., 1., 2., 3.]:
+    :CGNS#Distribution UserDefinedData_t:
+      Vertex DataArray_t I4 [0, 4, 6]:
+      Cell DataArray_t I4 [0, 0, 0]:
+"""
+  else:
+    yt = """
+Base CGNSBase_t I4 [3, 3]:
+  Zone Zone_t I4 [[6, 0, 0]]:
+    ZoneType ZoneType_t 'Unstructured':
+    GridCoordinates GridCoordinates_t:
+      CoordinateX DataArray_t R8 [4., 5.]:
+    :CGNS#Distribution UserDefinedData_t:
+      Vertex DataArray_t I4 [4, 6, 6]:
+      Cell DataArray_t I4 [0, 0, 0]:
+"""
+  dist_tree = parse_yaml_cgns.to_cgns_tree(yt)
+
+  tmp_dir = TU.create_collective_tmp_dir(sub_comm)
+  out_file = os.path.join(tmp_dir, 'yt.cgns')
+  handle = maia.io.dist_tree_to_file_async(dist_tree, out_file, sub_comm)
+  # Tree can be modified while writing
+  PT.get_node_from_name(dist_tree, 'CoordinateX')[1][:] = -1
+  handle.wait()
+  assert handle.test()
+  assert handle.exposed_time >= handle.snapshot_time and handle.hidden_time >= 0
+
+  if sub_comm.Get_rank() == 0:
+    t = maia.io.read_tree(out_file)
+    assert np.array_equal(PT.get_node_from_name(t, "CoordinateX")[1], [0.,1.,2.,3.,4.,5.])
+  TU.rm_collective_dir(tmp_dir, sub_comm)
@@ -68,3 +68,81 @@ Base CGNSBase_t I4 [3, 3]:
     t = maia.io.cgns_io_tree.read_tree(out_file)
     assert (PT.get_value(PT.get_node_from_name(t,"CoordinateX")) == [0.,1.,2.,3.]).all()
   TU.rm_collective_dir(tmp_dir, sub_comm)
+
+def test_prune_size_tree():
+  yt = """
+  Base CGNSBase_t I4 [3, 3]:
+    Zone Zone_t I4 [[4, 0, 0]]:
+      ZoneType ZoneType_t 'Unstructured':
+      GridCoordinates GridCoordinates_t:
+        CoordinateX DataArray_t:
+        CoordinateX#Size DataArray_t I8 [4]:
+      FlowSolution FlowSolution_t:
+        GridLocation GridLocation_t 'Vertex':
+        Density DataArray_t:
+        Density#Size DataArray_t I8 [4]:
+        Pressure DataArray_t:
+        Pressure#Size DataArray_t I8 [4]:
+      FlowSolution2 FlowSolution_t:
+        PointList IndexArray_t:
+        PointList#Size DataArray_t I8 [1,2]:
+        Density DataArray_t:
+        Density#Size DataArray_t I8 [2]:
+    Family Family_t:
+  """
+  with pytest.raises(ValueError):
+    maia.io.cgns_io_tree.prune_size_tree(parse_yaml_cgns.to_cgns_tree(yt), ['Base'], ['Base/Family'])
+
+  tree = parse_yaml_cgns.to_cgns_tree(yt)
+  maia.io.cgns_io_tree.prune_size_tree(tree, include=['Base/Zone/GridCoordinates', '*/*/FlowSolution*/Density'])
+  assert PT.get_node_from_path(tree, 'Base/Zone/GridCoordinates/CoordinateX#Size') is not None
+  assert PT.get_node_from_path(tree, 'Base/Zone/ZoneType') is not None
+  assert PT.get_node_from_path(tree, 'Base/Zone/FlowSolution/GridLocation') is not None
+  assert PT.get_names(PT.get_children(PT.get_node_from_path(tree, 'Base/Zone/FlowSolution2'))) == \
+      ['PointList', 'PointList#Size', 'Density', 'Density#Size']
+  assert PT.get_node_from_path(tree, 'Base/Zone/FlowSolution/Pressure') is None
+  assert PT.get_node_from_path(tree, 'Base/Zone/FlowSolution/Pressure#Size') is None
+  assert PT.get_node_from_path(tree, 'Base/Family') is None
+
+  tree = parse_yaml_cgns.to_cgns_tree(yt)
+  maia.io.cgns_io_tree.prune_size_tree(tree, exclude=['Base/Zone/FlowSolution2', 'Base/Zone/FlowSolution/P*'])
+  assert PT.get_node_from_path(tree, 'Base/Zone/FlowSolution2') is None
+  assert PT.get_node_from_path(tree, 'Base/Zone/FlowSolution/Pressure#Size') is None
+  assert PT.get_node_from_path(tree, 'Base/Zone/FlowSolution/Density#Size') is not None
+  assert PT.get_node_from_path(tree, 'Base/Family') is not None
+
+@mark_mpi_test(1)
+def test_append_dist_tree_to_file(sub_comm):
+  yt = """
+Base CGNSBase_t I4 [3, 3]:
+  Zone Zone_t I4 [[4, 0, 0]]:
+    ZoneType ZoneType_t 'Unstructured':
+    GridCoordinates GridCoordinates_t:
+      CoordinateX DataArray_t R8 [0., 1., 2., 3.]:
+    :CGNS#Distribution UserDefinedData_t:
+      Vertex DataArray_t I4 [0, 4, 4]:
+      Cell DataArray_t I4 [0, 0, 0]:
+"""
+  dist_tree = parse_yaml_cgns.to_cgns_tree(yt)
+
+  tmp_dir = TU.create_collective_tmp_dir(sub_comm)
+  out_file = os.path.join(tmp_dir, 'yt.cgns')
+  maia.io.dist_tree_to_file(dist_tree, out_file, sub_comm)
+
+  zone = PT.get_node_from_name(dist_tree, 'Zone')
+  base = PT.get_node_from_name(dist_tree, 'Base')
+  PT.new_FlowSolution('FS#0', loc='Vertex', fields={'Rho' : [1., 1., 1., 1.]}, parent=zone)
+  PT.new_node('BaseIterativeData', 'BaseIterativeData_t', 1, parent=base)
+  maia.io.append_dist_tree_to_file(dist_tree, out_file, sub_comm, ['*/*/FS#0', 'Base/BaseIterativeData'])
+
+  PT.new_FlowSolution('FS#1', loc='Vertex', fields={'Rho' : [2., 2., 2., 2.]}, parent=zone)
+  PT.set_value(PT.get_child_from_name(base, 'BaseIterativeData'), 2)
+  maia.io.append_dist_tree_to_file(dist_tree, out_file, sub_comm, ['*/*/FS#1', 'Base/BaseIterativeData'])
+
+  t = maia.io.read_tree(out_file)
+  assert (PT.get_node_from_path(t, 'Base/Zone/GridCoordinates/CoordinateX')[1] == [0.,1.,2.,3.]).all()
+  assert (PT.get_node_from_path(t, 'Base/Zone/FS#0/Rho')[1] == 1.).all()
+  assert (PT.get_node_from_path(t, 'Base/Zone/FS#1/Rho')[1] == 2.).all()
+  assert PT.get_value(PT.get_node_from_path(t, 'Base/BaseIterativeData')) == 2
+  assert len(PT.get_nodes_from_label(t, 'BaseIterativeData_t')) == 1
+  TU.rm_collective_dir(tmp_dir, sub_comm)
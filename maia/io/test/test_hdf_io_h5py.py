@@ -69,7 +69,32 @@ def test_load_partial():
   assert np.allclose(PT.get_node_from_name(tree, 'CoordinateX')[1], [5., 6.])
 
 @mark_mpi_test(2)
-def test_write_partial(sub_comm, tmp_path):
+def test_load_partial_collective(sub_comm):
+  filename = str(TU.sample_mesh_dir / 'only_coords.hdf')
+  yt = """
+  Base CGNSBase_t [2,2]:
+    ZoneU Zone_t [[6, 0, 0]]:
+      ZoneType ZoneType_t "Unstructured":
+      GridCoordinates GridCoordinates_t:
+        CoordinateX DataArray_t:
+        CoordinateY DataArray_t:
+  """
+  tree = parse_yaml_cgns.to_cgns_tree(yt)
+  if sub_comm.Get_rank() == 0:
+    hdf_filter = {'/Base/ZoneU/GridCoordinates/CoordinateX' : [[0], [1], [4], [1], [0], [1], [4], [1], [6], [1]],
+                  '/Base/ZoneU/GridCoordinates/CoordinateY' : [[0], [1], [4], [1], [0], [1], [4], [1], [6], [1]]}
+    expected_x = [1., 2., 3., 4.]
+  else:
+    hdf_filter = {'/Base/ZoneU/GridCoordinates/CoordinateX' : [[0], [1], [2], [1], [4], [1], [2], [1], [6], [1]],
+                  '/Base/ZoneU/GridCoordinates/CoordinateY' : [[0], [1], [2], [1], [4], [1], [2], [1], [6], [1]]}
+    expected_x = [5., 6.]
+  IOH.load_partial(filename, tree, hdf_filter, sub_comm, hints={'cb_nodes' : 1})
+  assert np.allclose(PT.get_node_from_name(tree, 'CoordinateX')[1], expected_x)
+  assert np.allclose(PT.get_node_from_name(tree, 'CoordinateY')[1], -np.array(expected_x))
+
+@mark_mpi_test(2)
+@pytest.mark.parametrize("collective", [False, True])
+def test_write_partial(collective, sub_comm, tmp_path):
   if sub_comm.rank == 0:
     yt = """
     Base CGNSBase_t [2,2]:
@@ -96,7 +121,7 @@ def test_write_partial(sub_comm, tmp_path):
   tree = parse_yaml_cgns.to_cgns_tree(yt)
   with TU.collective_tmp_dir(sub_comm) as tmpdir:
     filename = str(Path(tmpdir) / 'out.hdf')
-    IOH.write_partial(filename, tree, hdf_filter, sub_comm)
+    IOH.write_partial(filename, tree, hdf_filter, sub_comm, collective)
     sub_comm.barrier()
 
     if sub_comm.rank == 0:
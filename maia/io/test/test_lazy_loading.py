@@ -0,0 +1,104 @@
+import pytest
+from pytest_mpi_check._decorator import mark_mpi_test
+import os
+import numpy as np
+
+import maia
+import maia.pytree as PT
+from maia.pytree.yaml import parse_yaml_cgns
+import maia.utils.test_utils as TU
+
+from maia.io import _hdf_io_h5py as IOH
+from maia.io import lazy_loading as LL
+
+yt = """
+Base CGNSBase_t [3,3]:
+  Zone Zone_t [[6, 0, 0]]:
+    ZoneType ZoneType_t "Unstructured":
+    GridCoordinates GridCoordinates_t:
+      CoordinateX DataArray_t R8 [1,2,3,4,5,6]:
+    FlowSolution FlowSolution_t:
+      GridLocation GridLocation_t "Vertex":
+      Density DataArray_t R8 [10,20,30,40,50,60]:
+      Pressure DataArray_t I4 [1,2,3,4,5,6]:
+"""
+hdf_filter = {'/Base/Zone/GridCoordinates/CoordinateX'  : [[0], [1], [2], [1], [4], [1], [2], [1], [6], [1]],
+              '/Base/Zone/FlowSolution/Density'         : [[0], [1], [2], [1], [4], [1], [2], [1], [6], [1]],
+              '/Base/Zone/FlowSolution/Pressure'        : [[0], [1], [3], [1], [0], [1], [3], [1], [6], [1]]}
+
+def get_lazy_tree(filename):
+  IOH.write_full(filename, parse_yaml_cgns.to_cgns_tree(yt))
+  tree = parse_yaml_cgns.to_cgns_tree(yt)
+  for node in PT.get_nodes_from_label(tree, 'DataArray_t'):
+    node[1] = None
+  remaining = LL.set_lazy_values(filename, tree, hdf_filter)
+  return tree, remaining
+
+def test_set_lazy_values(tmp_path):
+  tree, remaining = get_lazy_tree(str(tmp_path / 'out.hdf'))
+  assert list(remaining.keys()) == ['/Base/Zone/GridCoordinates/CoordinateX']
+  density = PT.get_node_from_name(tree, 'Density')
+  assert isinstance(density[1], LL.LazyArray)
+  assert density[1].shape == (2,) and density[1].nbytes == 0
+  assert density[1].dtype == np.float64
+  assert PT.get_node_from_name(tree, 'CoordinateX')[1] is None
+
+def test_lazy_array_load(tmp_path):
+  tree, _ = get_lazy_tree(str(tmp_path / 'out.hdf'))
+  density = PT.get_node_from_name(tree, 'Density')
+  array = np.asarray(density[1])
+  assert np.array_equal(array, [50., 60.])
+  assert density[1] is array #Node has been updated
+
+def test_lazy_array_access(tmp_path):
+  tree, _ = get_lazy_tree(str(tmp_path / 'out.hdf'))
+  density  = PT.get_node_from_name(tree, 'Density')
+  pressure = PT.get_node_from_name(tree, 'Pressure')
+  lazy = density[1]
+  assert lazy[1] == 60. and len(lazy) == 2
+  assert isinstance(density[1], np.ndarray) #Node has been updated
+  assert lazy.load() is density[1] #Data is read once
+  assert np.array_equal(pressure[1].astype(np.float64), [1., 2., 3.])
+  assert isinstance(pressure[1], np.ndarray)
+  assert lazy.nbytes == density[1].nbytes == 16
+
+def test_lazy_array_operators(tmp_path):
+  tree, _ = get_lazy_tree(str(tmp_path / 'out.hdf'))
+  density  = PT.get_node_from_name(tree, 'Density')
+  assert np.array_equal(density[1] == 60., [False, True])
+  assert isinstance(density[1], np.ndarray) #Node has been updated
+  pressure = PT.get_node_from_name(tree, 'Pressure')
+  assert np.array_equal(pressure[1] + 1, [2, 3, 4])
+  tree, _ = get_lazy_tree(str(tmp_path / 'out.hdf'))
+  density  = PT.get_node_from_name(tree, 'Density')
+  assert np.allclose(np.sqrt(density[1]), np.sqrt([50., 60.]))
+  assert np.array_equal(2 * density[1], [100., 120.])
+
+def test_ensure_loaded(tmp_path):
+  tree, _ = get_lazy_tree(str(tmp_path / 'out.hdf'))
+  LL.ensure_loaded(tree, 'CGNSBase_t/Zone_t/GridCoordinates_t')
+  assert LL.is_lazy(PT.get_node_from_name(tree, 'Density'))
+  LL.ensure_loaded(tree)
+  assert np.array_equal(PT.get_node_from_name(tree, 'Density')[1], [50., 60.])
+  assert np.array_equal(PT.get_node_from_name(tree, 'Pressure')[1], [1, 2, 3])
+  assert PT.get_node_from_name(tree, 'Pressure')[1].dtype == np.int32
+
+@mark_mpi_test(2)
+def test_lazy_tree_transfer(sub_comm):
+  tmp_dir = TU.create_collective_tmp_dir(sub_comm)
+  filename = os.path.join(tmp_dir, 'lazy.hdf')
+
+  dist_tree = maia.factory.generate_dist_block(4, "Poly", sub_comm)
+  zone = PT.get_node_from_label(dist_tree, 'Zone_t')
+  cx = PT.get_node_from_name(zone, 'CoordinateX')[1]
+  PT.new_FlowSolution('FlowSolution', loc='Vertex', fields={'CX' : cx}, parent=zone)
+  maia.io.dist_tree_to_file(dist_tree, filename, sub_comm)
+
+  dist_tree = maia.io.file_to_dist_tree(filename, sub_comm, lazy=True)
+  assert LL.is_lazy(PT.get_node_from_name(dist_tree, 'CX'))
+  part_tree = maia.factory.partition_dist_tree(dist_tree, sub_comm)
+  maia.transfer.dist_tree_to_part_tree_all(dist_tree, part_tree, sub_comm)
+  for part_zone in PT.get_all_Zone_t(part_tree):
+    assert np.array_equal(PT.get_node_from_path(part_zone, 'FlowSolution/CX')[1],
+                          PT.get_node_from_path(part_zone, 'GridCoordinates/CoordinateX')[1])
+  TU.rm_collective_dir(tmp_dir, sub_comm)
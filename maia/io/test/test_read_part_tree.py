@@ -0,0 +1,182 @@
+import pytest
+from pytest_mpi_check._decorator import mark_mpi_test
+
+import os
+import numpy as np
+
+import maia.pytree      as PT
+import maia.pytree.maia as MT
+import maia.utils.test_utils as TU
+from maia.pytree.yaml import parse_yaml_cgns
+
+import maia.io
+from maia.io import read_part_tree as RPT
+
+dist_yt = """
+Base CGNSBase_t I4 [3, 3]:
+  ZoneU Zone_t I4 [[6, 3, 0]]:
+    ZoneType ZoneType_t 'Unstructured':
+    GridCoordinates GridCoordinates_t:
+      CoordinateX DataArray_t R8 [1., 2., 3., 4., 5., 6.]:
+    FlowSolution FlowSolution_t:
+      GridLocation GridLocation_t 'CellCenter':
+      Density DataArray_t R8 [10., 20., 30.]:
+    BCSol FlowSolution_t:
+      GridLocation GridLocation_t 'CellCenter':
+      PointList IndexArray_t I4 [[1]]:
+      Density DataArray_t R8 [10.]:
+  ZoneS Zone_t I4 [[3, 2, 0], [2, 1, 0]]:
+    ZoneType ZoneType_t 'Structured':
+    GridCoordinates GridCoordinates_t:
+      CoordinateX DataArray_t R8 [[1., 4.], [2., 5.], [3., 6.]]:
+"""
+
+def test_iter_loadable_containers():
+  dist_tree = parse_yaml_cgns.to_cgns_tree(dist_yt)
+  zone = PT.get_node_from_name(dist_tree, 'ZoneU')
+  containers = [(PT.get_name(c), loc) for c, loc in RPT._iter_loadable_containers(zone)]
+  assert containers == [('GridCoordinates', 'Vertex'), ('FlowSolution', 'CellCenter')]
+
+@mark_mpi_test(2)
+@pytest.mark.parametrize("include", [[], ['*/*/GridCoordinates']])
+def test_file_to_part_tree(include, sub_comm):
+  rank = sub_comm.Get_rank()
+  if rank == 0:
+    part_yt = """
+Base CGNSBase_t I4 [3, 3]:
+  ZoneU.P0.N0 Zone_t I4 [[3, 2, 0]]:
+    ZoneType ZoneType_t 'Unstructured':
+    :CGNS#GlobalNumbering UserDefinedData_t:
+      Vertex DataArray_t I4 [6, 1, 2]:
+      Cell DataArray_t I4 [3, 1]:
+  ZoneS.P0.N0 Zone_t I4 [[2, 1, 0], [2, 1, 0]]:
+    ZoneType ZoneType_t 'Structured':
+    :CGNS#GlobalNumbering UserDefinedData_t:
+      Vertex DataArray_t I4 [1, 2, 4, 5]:
+"""
+  else:
+    part_yt = """
+Base CGNSBase_t I4 [3, 3]:
+  ZoneU.P1.N0 Zone_t I4 [[3, 1, 0]]:
+    ZoneType ZoneType_t 'Unstructured':
+    :CGNS#GlobalNumbering UserDefinedData_t:
+      Vertex DataArray_t I4 [2, 3, 4]:
+      Cell DataArray_t I4 [2]:
+  ZoneU.P1.N1 Zone_t I4 [[0, 0, 0]]:
+    ZoneType ZoneType_t 'Unstructured':
+    :CGNS#GlobalNumbering UserDefinedData_t:
+      Vertex DataArray_t I4 []:
+      Cell DataArray_t I4 []:
+"""
+  part_tree = parse_yaml_cgns.to_cgns_tree(part_yt)
+
+  tmp_dir = TU.create_collective_tmp_dir(sub_comm)
+  dist_file = os.path.join(tmp_dir, 'dist.cgns')
+  if rank == 0:
+    maia.io.write_tree(parse_yaml_cgns.to_cgns_tree(dist_yt), dist_file)
+  sub_comm.barrier()
+
+  maia.io.file_to_part_tree(dist_file, part_tree, sub_comm, include=include)
+
+  assert PT.get_node_from_name(part_tree, 'BCSol') is None
+  if rank == 0:
+    zone = PT.get_node_from_name(part_tree, 'ZoneU.P0.N0')
+    assert np.array_equal(PT.get_node_from_name(zone, 'CoordinateX')[1], [6., 1., 2.])
+    zone = PT.get_node_from_name(part_tree, 'ZoneS.P0.N0')
+    coords = PT.get_node_from_name(zone, 'CoordinateX')[1]
+    assert coords.shape == (2,2) and np.array_equal(coords, [[1., 4.], [2., 5.]])
+  else:
+    zone = PT.get_node_from_name(part_tree, 'ZoneU.P1.N0')
+    assert np.array_equal(PT.get_node_from_name(zone, 'CoordinateX')[1], [2., 3., 4.])
+    zone = PT.get_node_from_name(part_tree, 'ZoneU.P1.N1')
+    assert PT.get_node_from_name(zone, 'CoordinateX')[1].size == 0
+  if include:
+    assert PT.get_node_from_name(part_tree, 'FlowSolution') is None
+  else:
+    sol = PT.get_node_from_name(part_tree, 'FlowSolution')
+    assert PT.Subset.GridLocation(sol) == 'CellCenter'
+    expected = [30., 10.] if rank == 0 else [20.]
+    assert np.array_equal(PT.get_node_from_name(sol, 'Density')[1], expected)
+  TU.rm_collective_dir(tmp_dir, sub_comm)
+
+def test_repart_partitions():
+  repart = RPT._repart_partitions([9,4,7,6,8,5], 3)
+  assert sorted([i for rank_parts in repart for i in rank_parts]) == list(range(6))
+  assert sorted([sum([[9,4,7,6,8,5][i] for i in rank_parts]) for rank_parts in repart]) == [13,13,13]
+  repart = RPT._repart_partitions([1,1,1], 4)
+  assert sorted([len(rank_parts) for rank_parts in repart]) == [0,1,1,1]
+
+def test_rename_partitions():
+  yt = """
+Base CGNSBase_t I4 [3, 3]:
+  Zone.P2.N0 Zone_t I4 [[3, 2, 0]]:
+    ZoneGridConnectivity ZoneGridConnectivity_t:
+      JN.P2.N0.LT.P0.N1 GridConnectivity_t 'Zone.P0.N1':
+        GridConnectivityType GridConnectivityType_t 'Abutting1to1':
+        GridConnectivityDonorName Descriptor_t 'JN.P0.N1.LT.P2.N0':
+      match GridConnectivity_t 'Base/Other.P1.N0':
+        GridConnectivityType GridConnectivityType_t 'Abutting1to1':
+"""
+  part_tree = parse_yaml_cgns.to_cgns_tree(yt)
+  renaming = {'Base/Zone.P2.N0' : 'Base/Zone.P1.N0', 'Base/Zone.P0.N1' : 'Base/Zone.P0.N0',
+              'Base/Other.P1.N0' : 'Base/Other.P0.N0'}
+  RPT._rename_partitions(part_tree, renaming)
+  zone = PT.get_node_from_path(part_tree, 'Base/Zone.P1.N0')
+  assert zone is not None
+  gc = PT.get_node_from_name(zone, 'JN.P1.N0.LT.P0.N0')
+  assert PT.get_value(gc) == 'Zone.P0.N0'
+  assert PT.get_value(PT.get_child_from_name(gc, 'GridConnectivityDonorName')) == 'JN.P0.N0.LT.P1.N0'
+  assert PT.get_value(PT.get_node_from_name(zone, 'match')) == 'Base/Other.P0.N0'
+
+@mark_mpi_test(2)
+@pytest.mark.parametrize("n_saved", [2, 3])
+def test_load_part_tree(n_saved, sub_comm):
+  tmp_dir = TU.create_collective_tmp_dir(sub_comm)
+  out_file = os.path.join(tmp_dir, 'parts.cgns')
+  if sub_comm.Get_rank() == 0:
+    saved_tree = PT.new_CGNSTree()
+    base = PT.new_CGNSBase(parent=saved_tree)
+    PT.new_Family('Family', parent=base)
+    for i in range(n_saved):
+      zone = PT.new_Zone(f'Zone.P{i}.N0', size=[[i+2, i+1, 0]], type='Unstructured', parent=base)
+      PT.new_GridCoordinates(fields={'CoordinateX' : np.full(i+2, i, float)}, parent=zone)
+    maia.io.write_tree(saved_tree, out_file)
+  sub_comm.barrier()
+
+  part_tree = maia.io.load_part_tree(out_file, sub_comm)
+
+  assert PT.get_node_from_path(part_tree, 'Base/Family') is not None
+  zones = PT.get_all_Zone_t(part_tree)
+  assert all([MT.conv.get_part_suffix(PT.get_name(zone))[0] == sub_comm.Get_rank() for zone in zones])
+  n_cells = [PT.Zone.n_cell(zone) for zone in zones]
+  if n_saved == 2:
+    assert n_cells == [sub_comm.Get_rank() + 1]
+  else: # Zones of 3 and 1+2 cells
+    assert sum(n_cells) == 3
+  for zone in zones:
+    assert PT.get_node_from_name(zone, 'CoordinateX')[1].size == PT.Zone.n_vtx(zone)
+  TU.rm_collective_dir(tmp_dir, sub_comm)
+
+@mark_mpi_test(2)
+def test_load_part_tree_empty_rank(sub_comm):
+  # Saved on 2 processes, the last one having no partitions
+  tmp_dir = TU.create_collective_tmp_dir(sub_comm)
+  out_file = os.path.join(tmp_dir, 'parts.cgns')
+  yt = """
+Base CGNSBase_t I4 [3, 3]:
+  Zone.P0.N0 Zone_t I4 [[2, 1, 0]]:
+    ZoneType ZoneType_t 'Unstructured':
+  Zone.P0.N1 Zone_t I4 [[3, 2, 0]]:
+    ZoneType ZoneType_t 'Unstructured':
+"""
+  part_tree = parse_yaml_cgns.to_cgns_tree(yt if sub_comm.Get_rank() == 0 else 'Base CGNSBase_t I4 [3, 3]:')
+  maia.io.part_tree_to_file(part_tree, out_file, sub_comm, single_file=True)
+  sub_comm.barrier()
+
+  part_tree = maia.io.load_part_tree(out_file, sub_comm)
+  assert PT.get_node_from_name(part_tree, ':CGNS#SaveInfo') is None
+  if sub_comm.Get_rank() == 0:
+    assert PT.get_names(PT.get_all_Zone_t(part_tree)) == ['Zone.P0.N0', 'Zone.P0.N1']
+  else:
+    assert PT.get_all_Zone_t(part_tree) == []
+  TU.rm_collective_dir(tmp_dir, sub_comm)
@@ -0,0 +1,40 @@
+import pytest
+from pytest_mpi_check._decorator import mark_mpi_test
+
+import os
+import numpy as np
+
+import maia.pytree as PT
+import maia.utils.test_utils as TU
+from maia.pytree.yaml import parse_yaml_cgns
+
+import maia.io
+
+@mark_mpi_test(2)
+@pytest.mark.parametrize("single_file, parallel", [(False, False), (True, False), (True, True)])
+def test_save_part_tree(single_file, parallel, sub_comm):
+  rank = sub_comm.Get_rank()
+  yt = f"""
+Base CGNSBase_t I4 [3, 3]:
+  Zone.P{rank}.N0 Zone_t I4 [[3, 0, 0]]:
+    ZoneType ZoneType_t 'Unstructured':
+    GridCoordinates GridCoordinates_t:
+      CoordinateX DataArray_t R8 [{rank}., {rank}., {rank}.]:
+  Family Family_t:
+"""
+  part_tree = parse_yaml_cgns.to_cgns_tree(yt)
+
+  tmp_dir = TU.create_collective_tmp_dir(sub_comm)
+  out_file = os.path.join(tmp_dir, 'parts.cgns')
+  maia.io.part_tree_to_file(part_tree, out_file, sub_comm, single_file=single_file, parallel=parallel)
+  sub_comm.barrier()
+
+  if rank == 0:
+    t = maia.io.read_tree(out_file)
+    assert PT.get_node_from_path(t, 'Base/Family') is not None
+    assert PT.get_value(PT.get_node_from_path(t, 'Base/:CGNS#SaveInfo/CommSize')) == 2
+    for i in range(2):
+      zone = PT.get_node_from_path(t, f'Base/Zone.P{i}.N0')
+      assert PT.Zone.Type(zone) == 'Unstructured'
+      assert np.array_equal(PT.get_node_from_name(zone, 'CoordinateX')[1], [i, i, i])
+  TU.rm_collective_dir(tmp_dir, sub_comm)
@@ -1,2 +1,5 @@
 from .dist_to_part.tree_api import *
 from .part_to_dist.tree_api import *
+from .part_to_part.tree_api import *
+from .protocols import TransferContext, TransferStats
+from .sync import TransferSync
@@ -31,34 +31,43 @@ def dist_coords_to_part_coords(dist_zone, part_zones, comm):
 
 
 
-def _dist_to_part_sollike(dist_zone, part_zones, mask_tree, comm):
+def _transfer(transfers, comm, request=None):
   """
-  Shared code for FlowSolution_t and DiscreteData_t
+  Exchange the data of each transfer (dist_data, distribution, lngn_list, fill)
+  and call fill with the partitioned data.
+  If request is not None, exchanges are only posted and registered in the
+  TransferRequest, fill being called when it is waited.
   """
-  #Get distribution
-  for mask_sol in PT.get_children(mask_tree):
-    d_sol = PT.get_child_from_name(dist_zone, PT.get_name(mask_sol)) #True container
-    location = PT.Subset.GridLocation(d_sol)
-    has_pl   = PT.get_child_from_name(d_sol, 'PointList') is not None
-    if has_pl:
-      distribution = te_utils.get_cgns_distribution(d_sol, 'Index')
-      lntogn_list  = te_utils.collect_cgns_g_numbering(part_zones, 'Index', PT.get_name(d_sol))
+  for dist_data, distribution, lngn_list, fill in transfers:
+    if request is None:
+      fill(EP.block_to_part(dist_data, distribution, lngn_list, comm))
     else:
-      assert location in ['Vertex', 'CellCenter']
-      if location == 'Vertex':
-        distribution = te_utils.get_cgns_distribution(dist_zone, 'Vertex')
-        lntogn_list  = te_utils.collect_cgns_g_numbering(part_zones, 'Vertex')
-      elif location == 'CellCenter':
-        distribution = te_utils.get_cgns_distribution(dist_zone, 'Cell')
-        lntogn_list  = te_utils.collect_cgns_g_numbering(part_zones, 'Cell')
+      request.add(EP.iblock_to_part(dist_data, distribution, lngn_list, comm), fill)
 
-    #Get data
-    fields = [PT.get_name(n) for n in PT.get_children(mask_sol)]
-    dist_data = {field : PT.get_child_from_name(d_sol, field)[1] for field in fields}
+def _sollike_transfer(dist_zone, part_zones, mask_sol):
+  """
+  Return the transfer of a FlowSolution_t or DiscreteData_t container
+  """
+  d_sol = PT.get_child_from_name(dist_zone, PT.get_name(mask_sol)) #True container
+  location = PT.Subset.GridLocation(d_sol)
+  has_pl   = PT.get_child_from_name(d_sol, 'PointList') is not None
+  if has_pl:
+    distribution = te_utils.get_cgns_distribution(d_sol, 'Index')
+    lntogn_list  = te_utils.collect_cgns_g_numbering(part_zones, 'Index', PT.get_name(d_sol))
+  else:
+    assert location in ['Vertex', 'CellCenter']
+    if location == 'Vertex':
+      distribution = te_utils.get_cgns_distribution(dist_zone, 'Vertex')
+      lntogn_list  = te_utils.collect_cgns_g_numbering(part_zones, 'Vertex')
+    elif location == 'CellCenter':
+      distribution = te_utils.get_cgns_distribution(dist_zone, 'Cell')
+      lntogn_list  = te_utils.collect_cgns_g_numbering(part_zones, 'Cell')
 
-    #Exchange
-    part_data = EP.block_to_part(dist_data, distribution, lntogn_list, comm)
+  #Get data
+  fields = [PT.get_name(n) for n in PT.get_children(mask_sol)]
+  dist_data = {field : PT.get_child_from_name(d_sol, field)[1] for field in fields}
 
+  def fill(part_data):
     for ipart, part_zone in enumerate(part_zones):
       #Skip void flow solution (can occur with point lists)
       if lntogn_list[ipart].size > 0:
@@ -66,103 +75,116 @@ def _dist_to_part_sollike(dist_zone, part_zones, mask_tree, comm):
           p_sol = PT.get_child_from_name(part_zone, PT.get_name(d_sol))
           shape = PT.get_child_from_name(p_sol, 'PointList')[1].shape[1]
         else:
-          p_sol = PT.new_child(part_zone, PT.get_name(d_sol), PT.get_label(d_sol))
-          PT.new_GridLocation(location, parent=p_sol)
+          # Container may already exist if fields are refreshed
+          p_sol = PT.update_child(part_zone, PT.get_name(d_sol), PT.get_label(d_sol))
+          PT.update_child(p_sol, 'GridLocation', 'GridLocation_t', location)
           shape = PT.Zone.VertexSize(part_zone) if location == 'Vertex' else PT.Zone.CellSize(part_zone)
         for data_name, data in part_data.items():
           #F is mandatory to keep shared reference. Normally no copy is done
           shaped_data = data[ipart].reshape(shape, order='F')
-          PT.new_DataArray(data_name, shaped_data, parent=p_sol)
+          PT.update_child(p_sol, data_name, 'DataArray_t', shaped_data)
+
+  return dist_data, distribution, lntogn_list, fill
+
+def _dist_to_part_sollike(dist_zone, part_zones, mask_tree, comm, request=None):
+  """
+  Shared code for FlowSolution_t and DiscreteData_t
+  """
+  transfers = (_sollike_transfer(dist_zone, part_zones, mask_sol) for mask_sol in PT.get_children(mask_tree))
+  _transfer(transfers, comm, request)
 
-def dist_sol_to_part_sol(dist_zone, part_zones, comm, include=[], exclude=[]):
+def dist_sol_to_part_sol(dist_zone, part_zones, comm, include=[], exclude=[], request=None):
   """
   Transfert all the data included in FlowSolution_t nodes from a distributed
   zone to the partitioned zones
   """
   mask_tree = te_utils.create_mask_tree(dist_zone, ['FlowSolution_t', 'DataArray_t'], include, exclude)
-  _dist_to_part_sollike(dist_zone, part_zones, mask_tree, comm)
+  _dist_to_part_sollike(dist_zone, part_zones, mask_tree, comm, request)
 
-def dist_discdata_to_part_discdata(dist_zone, part_zones, comm, include=[], exclude=[]):
+def dist_discdata_to_part_discdata(dist_zone, part_zones, comm, include=[], exclude=[], request=None):
   """
   Transfert all the data included in DiscreteData_t nodes from a distributed
   zone to the partitioned zones
   """
   mask_tree = te_utils.create_mask_tree(dist_zone, ['DiscreteData_t', 'DataArray_t'], include, exclude)
-  _dist_to_part_sollike(dist_zone, part_zones, mask_tree, comm)
+  _dist_to_part_sollike(dist_zone, part_zones, mask_tree, comm, request)
 
-def dist_dataset_to_part_dataset(dist_zone, part_zones, comm, include=[], exclude=[]):
+def _dataset_transfer(dist_zone, part_zones, bc_path, mask_dataset):
+  """
+  Return the transfer of a BCDataSet_t node
+  """
+  d_bc = PT.get_node_from_path(dist_zone, bc_path) #True BC
+  ds_path = bc_path + '/' + PT.get_name(mask_dataset)
+  d_dataset = PT.get_node_from_path(dist_zone, ds_path) #True DataSet
+  #If dataset has its own PointList, we must override bc distribution and lngn
+  if MT.getDistribution(d_dataset) is not None:
+    distribution = te_utils.get_cgns_distribution(d_dataset, 'Index')
+    lngn_list    = te_utils.collect_cgns_g_numbering(part_zones, 'Index', ds_path)
+  else: #Fallback to bc distribution
+    distribution = te_utils.get_cgns_distribution(d_bc, 'Index')
+    lngn_list    = te_utils.collect_cgns_g_numbering(part_zones, 'Index', bc_path)
+  #Get data
+  data_paths = PT.predicates_to_paths(mask_dataset, ['*', '*'])
+  dist_data = {data_path : PT.get_node_from_path(d_dataset, data_path)[1] for data_path in data_paths}
+
+  #Put part data in tree
+  def fill(part_data):
+    for ipart, part_zone in enumerate(part_zones):
+      part_bc = PT.get_node_from_path(part_zone, bc_path)
+      # Skip void bcs
+      if lngn_list[ipart].size > 0:
+        # Create dataset if no existing
+        part_ds = PT.update_child(part_bc, PT.get_name(d_dataset), PT.get_label(d_dataset), PT.get_value(d_dataset))
+        # Add data
+        for data_name, data in part_data.items():
+          container_name, field_name = data_name.split('/')
+          p_container = PT.update_child(part_ds, container_name, 'BCData_t')
+          PT.update_child(p_container, field_name, 'DataArray_t', data[ipart])
+
+  return dist_data, distribution, lngn_list, fill
+
+def dist_dataset_to_part_dataset(dist_zone, part_zones, comm, include=[], exclude=[], request=None):
   """
   Transfert all the data included in BCDataSet_t/BCData_t nodes from a distributed
   zone to the partitioned zones
   """
+  transfers = []
   for d_zbc in PT.iter_children_from_label(dist_zone, "ZoneBC_t"):
     labels = ['BC_t', 'BCDataSet_t', 'BCData_t', 'DataArray_t']
     mask_tree = te_utils.create_mask_tree(d_zbc, labels, include, exclude)
     for mask_bc in PT.get_children(mask_tree):
       bc_path = PT.get_name(d_zbc) + '/' + PT.get_name(mask_bc)
-      d_bc = PT.get_node_from_path(dist_zone, bc_path) #True BC
       for mask_dataset in PT.get_children(mask_bc):
-        ds_path = bc_path + '/' + PT.get_name(mask_dataset)
-        d_dataset = PT.get_node_from_path(dist_zone, ds_path) #True DataSet
-        #If dataset has its own PointList, we must override bc distribution and lngn
-        if MT.getDistribution(d_dataset) is not None:
-          distribution = te_utils.get_cgns_distribution(d_dataset, 'Index')
-          lngn_list    = te_utils.collect_cgns_g_numbering(part_zones, 'Index', ds_path)
-        else: #Fallback to bc distribution
-          distribution = te_utils.get_cgns_distribution(d_bc, 'Index')
-          lngn_list    = te_utils.collect_cgns_g_numbering(part_zones, 'Index', bc_path)
-        #Get data
-        data_paths = PT.predicates_to_paths(mask_dataset, ['*', '*'])
-        dist_data = {data_path : PT.get_node_from_path(d_dataset, data_path)[1] for data_path in data_paths}
-
-        #Exchange
-        part_data = EP.block_to_part(dist_data, distribution, lngn_list, comm)
-
-        #Put part data in tree
-        for ipart, part_zone in enumerate(part_zones):
-          part_bc = PT.get_node_from_path(part_zone, bc_path)
-          # Skip void bcs
-          if lngn_list[ipart].size > 0:
-            # Create dataset if no existing
-            part_ds = PT.update_child(part_bc, PT.get_name(d_dataset), PT.get_label(d_dataset), PT.get_value(d_dataset))
-            # Add data
-            for data_name, data in part_data.items():
-              container_name, field_name = data_name.split('/')
-              p_container = PT.update_child(part_ds, container_name, 'BCData_t')
-              PT.new_DataArray(field_name, data[ipart], parent=p_container)
-
-def dist_subregion_to_part_subregion(dist_zone, part_zones, comm, include=[], exclude=[]):
+        transfers.append(_dataset_transfer(dist_zone, part_zones, bc_path, mask_dataset))
+  _transfer(transfers, comm, request)
+
+def _subregion_transfer(dist_zone, part_zones, mask_zsr):
   """
-  Transfert all the data included in ZoneSubRegion_t nodes from a distributed
-  zone to the partitioned zones
+  Return the transfer of a ZoneSubRegion_t node
   """
-  mask_tree = te_utils.create_mask_tree(dist_zone, ['ZoneSubRegion_t', 'DataArray_t'], include, exclude)
-  for mask_zsr in PT.get_children(mask_tree):
-    d_zsr = PT.get_child_from_name(dist_zone, PT.get_name(mask_zsr)) #True ZSR
-    # Search matching region
-    matching_region_path = PT.getSubregionExtent(d_zsr, dist_zone)
-    matching_region = PT.get_node_from_path(dist_zone, matching_region_path)
-    assert matching_region is not None
-
-    #Get distribution and dist data
-    distribution = te_utils.get_cgns_distribution(matching_region, 'Index')
-    fields = [PT.get_name(n) for n in PT.get_children(mask_zsr)]
-    dist_data = {field : PT.get_child_from_name(d_zsr, field)[1] for field in fields}
-
-    if PT.get_label(matching_region) in ['GridConnectivity_t', 'GridConnectivity1to1_t']:
-      # Joins have been split so search multiple part nodes
-      ancestor, leaf = PT.path_head(matching_region_path), PT.path_tail(matching_region_path)
-      lngn_list    = list()
-      for i_part, part_zone in enumerate(part_zones):
-        for node in PT.iter_children_from_predicates(part_zone, [ancestor, leaf+'*']):
-          lngn_list.append(PT.get_value(MT.getGlobalNumbering(node, 'Index')))
-    else:
-      lngn_list = te_utils.collect_cgns_g_numbering(part_zones, 'Index', matching_region_path)
-
-    #Exchange
-    part_data = EP.block_to_part(dist_data, distribution, lngn_list, comm)
-
-    #Put part data in tree
+  d_zsr = PT.get_child_from_name(dist_zone, PT.get_name(mask_zsr)) #True ZSR
+  # Search matching region
+  matching_region_path = PT.getSubregionExtent(d_zsr, dist_zone)
+  matching_region = PT.get_node_from_path(dist_zone, matching_region_path)
+  assert matching_region is not None
+
+  #Get distribution and dist data
+  distribution = te_utils.get_cgns_distribution(matching_region, 'Index')
+  fields = [PT.get_name(n) for n in PT.get_children(mask_zsr)]
+  dist_data = {field : PT.get_child_from_name(d_zsr, field)[1] for field in fields}
+
+  if PT.get_label(matching_region) in ['GridConnectivity_t', 'GridConnectivity1to1_t']:
+    # Joins have been split so search multiple part nodes
+    ancestor, leaf = PT.path_head(matching_region_path), PT.path_tail(matching_region_path)
+    lngn_list    = list()
+    for i_part, part_zone in enumerate(part_zones):
+      for node in PT.iter_children_from_predicates(part_zone, [ancestor, leaf+'*']):
+        lngn_list.append(PT.get_value(MT.getGlobalNumbering(node, 'Index')))
+  else:
+    lngn_list = te_utils.collect_cgns_g_numbering(part_zones, 'Index', matching_region_path)
+
+  #Put part data in tree
+  def fill(part_data):
     if PT.get_label(matching_region) in ['GridConnectivity_t', 'GridConnectivity1to1_t']:
       i_pseudo_part = 0
       # Use same loop order than data lngn collecting
@@ -175,7 +197,7 @@ def dist_subregion_to_part_subregion(dist_zone, part_zones, comm, include=[], ex
                                and PT.get_value(PT.get_child_from_name(n, 'GridConnectivityRegionName')) == PT.get_name(node)
           p_zsr = PT.get_node_from_predicate(part_zone, good_zsr)
           for field_name, data in part_data.items():
-            PT.new_DataArray(field_name, data[i_pseudo_part], parent=p_zsr)
+            PT.update_child(p_zsr, field_name, 'DataArray_t', data[i_pseudo_part])
           i_pseudo_part += 1
     else:
       for ipart, part_zone in enumerate(part_zones):
@@ -184,4 +206,15 @@ def dist_subregion_to_part_subregion(dist_zone, part_zones, comm, include=[], ex
           # Create ZSR if not existing (eg was defined by bc/gc)
           p_zsr = PT.update_child(part_zone, PT.get_name(d_zsr), PT.get_label(d_zsr), PT.get_value(d_zsr))
           for field_name, data in part_data.items():
-            PT.new_DataArray(field_name, data[ipart], parent=p_zsr)
+            PT.update_child(p_zsr, field_name, 'DataArray_t', data[ipart])
+
+  return dist_data, distribution, lngn_list, fill
+
+def dist_subregion_to_part_subregion(dist_zone, part_zones, comm, include=[], exclude=[], request=None):
+  """
+  Transfert all the data included in ZoneSubRegion_t nodes from a distributed
+  zone to the partitioned zones
+  """
+  mask_tree = te_utils.create_mask_tree(dist_zone, ['ZoneSubRegion_t', 'DataArray_t'], include, exclude)
+  transfers = (_subregion_transfer(dist_zone, part_zones, mask_zsr) for mask_zsr in PT.get_children(mask_tree))
+  _transfer(transfers, comm, request)
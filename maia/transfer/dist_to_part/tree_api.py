@@ -1,12 +1,14 @@
 import maia.pytree as PT
 
 import maia.transfer as TE
+from maia.transfer import protocols as EP
 from . import data_exchange
 
 __all__ = ['dist_zone_to_part_zones_only',
            'dist_zone_to_part_zones_all',
            'dist_tree_to_part_tree_only_labels',
-           'dist_tree_to_part_tree_all']
+           'dist_tree_to_part_tree_all',
+           'idist_tree_to_part_tree_all']
 
 #Managed labels and corresponding funcs
 LABELS = ['FlowSolution_t', 'DiscreteData_t', 'ZoneSubRegion_t', 'BCDataSet_t']
@@ -15,7 +17,7 @@ FUNCS = [data_exchange.dist_sol_to_part_sol,
          data_exchange.dist_subregion_to_part_subregion,
          data_exchange.dist_dataset_to_part_dataset]
 
-def _dist_zone_to_part_zones(dist_zone, part_zones, comm, filter_dict):
+def _dist_zone_to_part_zones(dist_zone, part_zones, comm, filter_dict, request=None):
   """
   Low level API to transfert data fields from the distributed zone to the partitioned zones.
   filter_dict must a dict containing, for each label defined in LABELS, a tuple (flag, paths):
@@ -24,13 +26,14 @@ def _dist_zone_to_part_zones(dist_zone, part_zones, comm, filter_dict):
       data_exchange functions defined in FUNCS
   If paths == [], all data will be transfered if flag == 'E' (= exclude nothing), and not data
   will be transfered if flag == 'I' (=include nothing)
+  If request is not None, the exchanges are posted in this TransferRequest
   """
   for label, func in zip(LABELS, FUNCS):
     tag, paths = filter_dict[label]
     if tag == 'I' and paths != []:
-      func(dist_zone, part_zones, comm, include=paths)
+      func(dist_zone, part_zones, comm, include=paths, request=request)
     elif tag == 'E':
-      func(dist_zone, part_zones, comm, exclude=paths)
+      func(dist_zone, part_zones, comm, exclude=paths, request=request)
 
 def dist_zone_to_part_zones_only(dist_zone, part_zones, comm, include_dict):
   """ Transfer the data fields specified in include_dict from a distributed zone
@@ -89,5 +92,29 @@ def dist_tree_to_part_tree_all(dist_tree, part_tree, comm):
         :dedent: 2
   """
   dist_tree_to_part_tree_only_labels(dist_tree, part_tree, LABELS, comm)
+
+def idist_tree_to_part_tree_all(dist_tree, part_tree, comm):
+  """ Non blocking version of :func:`dist_tree_to_part_tree_all`.
+
+  The exchanges of all the data fields are posted, and a request handle is returned.
+  Its ``wait()`` method must then be called collectively to complete the exchanges
+  and fill the partitioned tree. Until then, the fields of the distributed tree
+  must not be modified.
+
+  Returns:
+    TransferRequest: Handle on the posted exchanges
+
+  Example:
+      .. literalinclude:: snippets/test_transfer.py
+        :start-after: #idist_tree_to_part_tree_all@start
+        :end-before: #idist_tree_to_part_tree_all@end
+        :dedent: 2
+  """
+  request = EP.TransferRequest()
+  filter_dict = {label : ('E', []) for label in LABELS}
+  for d_base, d_zone in PT.get_children_from_labels(dist_tree, ['CGNSBase_t', 'Zone_t'], ancestors=True):
+    p_zones = TE.utils.get_partitioned_zones(part_tree, PT.get_name(d_base) + '/' + PT.get_name(d_zone))
+    _dist_zone_to_part_zones(d_zone, p_zones, comm, filter_dict, request)
+  return request
  
 #Possible improvement : dist_tree_to_part_tree only and all API with global paths
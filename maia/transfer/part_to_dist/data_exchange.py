@@ -26,19 +26,26 @@ def _discover_wrapper(dist_zone, part_zones, pl_path, data_path, comm):
 
   discover_nodes_from_matching(dist_zone, part_zones, pl_path,   comm, child_list=['GridLocation_t', 'Descriptor_t'])
   discover_nodes_from_matching(dist_zone, part_zones, data_path, comm)
+
+  # Get the existence status of the index nodes of all the subsets at once
+  subsets = []
   for nodes in PT.iter_children_from_predicates(dist_zone, pl_path, ancestors=True):
-    node_path   = '/'.join([PT.get_name(node) for node in nodes])
-    if PT.get_node_from_path(nodes[-1], 'PointRange') is None and \
-       par_utils.exists_anywhere(part_zones, node_path+'/PointRange', comm):
+    subsets.append((nodes[-1], '/'.join([PT.get_name(node) for node in nodes])))
+  suffixes = ['/PointRange', '/PointList', '/:CGNS#GlobalNumbering/Index']
+  status = par_utils.exists_status(part_zones, [path+suffix for _, path in subsets for suffix in suffixes], comm)
+
+  for node, node_path in subsets:
+    has_gnum = status[node_path+'/:CGNS#GlobalNumbering/Index'][0]
+    if PT.get_node_from_path(node, 'PointRange') is None and status[node_path+'/PointRange'][0]:
        # PointRange must be computed on dist node
-       if not par_utils.exists_anywhere(part_zones, node_path+'/:CGNS#GlobalNumbering/Index', comm):
+       if not has_gnum:
          # > GlobalNumbering is required to do that
          IPTB.create_part_pr_gnum(dist_zone, part_zones, node_path, comm)
+         has_gnum = True
        IPTB.part_pr_to_dist_pr(dist_zone, part_zones, node_path, comm)
-    if PT.get_node_from_path(nodes[-1], 'PointList') is None and \
-       par_utils.exists_anywhere(part_zones, node_path+'/PointList', comm):
+    if PT.get_node_from_path(node, 'PointList') is None and status[node_path+'/PointList'][0]:
       # > Pointlist must be computed on dist node
-      if not par_utils.exists_anywhere(part_zones, node_path+'/:CGNS#GlobalNumbering/Index', comm):
+      if not has_gnum:
         # > GlobalNumbering is required to do that
         IPTB.create_part_pl_gnum(dist_zone, part_zones, node_path, comm)
       IPTB.part_pl_to_dist_pl(dist_zone, part_zones, node_path, comm)
@@ -72,8 +79,7 @@ def part_coords_to_dist_coords(dist_zone, part_zones, comm, reduce_func=None):
   for part_zone in part_zones:
     p_grid_co = PT.get_child_from_name(part_zone, PT.get_name(d_grid_co))
     for coord in PT.iter_children_from_label(p_grid_co, 'DataArray_t'):
-      flat_data = coord[1].ravel(order='A') #Reshape structured arrays for PDM exchange
-      part_data[PT.get_name(coord)].append(flat_data)
+      part_data[PT.get_name(coord)].append(coord[1]) #Structured arrays are flattened by the exchange
 
   # Exchange
   dist_data = EP.part_to_block(part_data, distribution, lntogn_list, comm, reduce_func)
@@ -81,136 +87,209 @@ def part_coords_to_dist_coords(dist_zone, part_zones, comm, reduce_func=None):
     dist_coord = PT.get_child_from_name(d_grid_co, coord)
     PT.set_value(dist_coord, array)
 
-def _part_to_dist_sollike(dist_zone, part_zones, mask_tree, comm, reduce_func=None):
+def _transfer(transfers, comm, reduce_func=None, request=None):
   """
-  Shared code for FlowSolution_t and DiscreteData_t
+  Exchange the data of each transfer (part_data, distribution, lngn_list, fill)
+  and call fill with the distributed data.
+  If request is not None, exchanges are only posted and registered in the
+  TransferRequest, fill being called when it is waited.
   """
-  for mask_sol in PT.get_children(mask_tree):
-    d_sol = PT.get_child_from_name(dist_zone, PT.get_name(mask_sol)) #True container
-
-    if not par_utils.exists_everywhere(part_zones, PT.get_name(d_sol), comm):
-      continue #Skip FS that remains on dist_tree but are not present on part tree
+  for part_data, distribution, lngn_list, fill in transfers:
+    if request is None:
+      fill(EP.part_to_block(part_data, distribution, lngn_list, comm, reduce_func))
+    else:
+      request.add(EP.ipart_to_block(part_data, distribution, lngn_list, comm, reduce_func), fill)
+
+def _finalize(cleanup, request=None):
+  """ Call cleanup now, or after the exchanges registered in request """
+  if request is None:
+    cleanup()
+  else:
+    request.add(None, cleanup)
+
+def _set_dist_values(dist_parent, get_node):
+  """ Return a function putting the received distributed data in the tree """
+  def fill(dist_data):
+    for field, array in dist_data.items():
+      PT.set_value(get_node(dist_parent, field), array)
+  return fill
 
-    location = PT.Subset.GridLocation(d_sol)
-    has_pl   = PT.get_child_from_name(d_sol, 'PointList') is not None
+def _sollike_transfer(dist_zone, part_zones, mask_sol, status):
+  """
+  Return the transfer of a FlowSolution_t or DiscreteData_t container, or None
+  if the container is not present on the partitioned zones.
+  status is the existence status of the container and its fields (see exists_status)
+  """
+  d_sol = PT.get_child_from_name(dist_zone, PT.get_name(mask_sol)) #True container
+
+  _exists_everywhere = lambda path : status[path][1]
+  if not _exists_everywhere(PT.get_name(d_sol)):
+    return None #Skip FS that remains on dist_tree but are not present on part tree
+
+  location = PT.Subset.GridLocation(d_sol)
+  has_pl   = PT.get_child_from_name(d_sol, 'PointList') is not None
+
+  if has_pl:
+    distribution = te_utils.get_cgns_distribution(d_sol, 'Index')
+    lntogn_list  = te_utils.collect_cgns_g_numbering(part_zones, 'Index', PT.get_name(d_sol))
+  else:
+    assert location in ['Vertex', 'CellCenter']
+    if location == 'Vertex':
+      distribution = te_utils.get_cgns_distribution(dist_zone, 'Vertex')
+      lntogn_list  = te_utils.collect_cgns_g_numbering(part_zones, 'Vertex')
+    elif location == 'CellCenter':
+      distribution = te_utils.get_cgns_distribution(dist_zone, 'Cell')
+      lntogn_list  = te_utils.collect_cgns_g_numbering(part_zones, 'Cell')
+
+  #Discover data
+  fields = [PT.get_name(n) for n in PT.get_children(mask_sol) if _exists_everywhere(f'{PT.get_name(d_sol)}/{PT.get_name(n)}')]
+  part_data = {field : [] for field in fields}
 
-    if has_pl:
-      distribution = te_utils.get_cgns_distribution(d_sol, 'Index')
-      lntogn_list  = te_utils.collect_cgns_g_numbering(part_zones, 'Index', PT.get_name(d_sol))
-    else:
-      assert location in ['Vertex', 'CellCenter']
-      if location == 'Vertex':
-        distribution = te_utils.get_cgns_distribution(dist_zone, 'Vertex')
-        lntogn_list  = te_utils.collect_cgns_g_numbering(part_zones, 'Vertex')
-      elif location == 'CellCenter':
-        distribution = te_utils.get_cgns_distribution(dist_zone, 'Cell')
-        lntogn_list  = te_utils.collect_cgns_g_numbering(part_zones, 'Cell')
+  for part_zone in part_zones:
+    p_sol = PT.get_child_from_name(part_zone, PT.get_name(d_sol))
+    for field in fields:
+      part_data[field].append(PT.get_child_from_name(p_sol, field)[1]) #Structured arrays are flattened by the exchange
 
-    #Discover data
-    _exists_everywhere = lambda name : par_utils.exists_everywhere(part_zones, f'{PT.get_name(d_sol)}/{name}', comm)
-    fields = [PT.get_name(n) for n in PT.get_children(mask_sol) if _exists_everywhere(PT.get_name(n))]
-    part_data = {field : [] for field in fields}
+  return part_data, distribution, lntogn_list, _set_dist_values(d_sol, PT.get_child_from_name)
 
-    for part_zone in part_zones:
-      p_sol = PT.get_child_from_name(part_zone, PT.get_name(d_sol))
-      for field in fields:
-        flat_data = PT.get_child_from_name(p_sol, field)[1].ravel(order='A') #Reshape structured arrays for PDM exchange
-        part_data[field].append(flat_data)
+def _part_to_dist_sollike(dist_zone, part_zones, mask_tree, comm, reduce_func=None, request=None):
+  """
+  Shared code for FlowSolution_t and DiscreteData_t
+  """
+  # Get the existence status of all the containers and fields at once
+  paths = PT.predicates_to_paths(mask_tree, ['*']) + PT.predicates_to_paths(mask_tree, ['*', '*'])
+  status = par_utils.exists_status(part_zones, paths, comm)
+  transfers = (_sollike_transfer(dist_zone, part_zones, mask_sol, status) for mask_sol in PT.get_children(mask_tree))
+  _transfer((t for t in transfers if t is not None), comm, reduce_func, request)
 
-    # Exchange
-    dist_data = EP.part_to_block(part_data, distribution, lntogn_list, comm, reduce_func)
-    for field, array in dist_data.items():
-      dist_field = PT.get_child_from_name(d_sol, field)
-      PT.set_value(dist_field, array)
+def _part_to_dist_container(dist_zone, part_zones, comm, label, include, exclude, reduce_func, request):
+  """
+  Shared code for FlowSolution_t and DiscreteData_t : complete dist tree,
+  exchange and cleanup
+  """
+  # Complete distree with partitioned fields and exchange PL if needed
+  _discover_wrapper(dist_zone, part_zones, label, f'{label}/DataArray_t', comm)
+  mask_tree = te_utils.create_mask_tree(dist_zone, [label, 'DataArray_t'], include, exclude)
+  _part_to_dist_sollike(dist_zone, part_zones, mask_tree, comm, reduce_func, request)
+  #Cleanup : if field is None, data has been added by wrapper and must be removed
+  def cleanup():
+    for dist_sol in PT.iter_children_from_label(dist_zone, label):
+      PT.rm_children_from_predicate(dist_sol, lambda n : PT.get_label(n) == 'DataArray_t' and n[1] is None)
+  _finalize(cleanup, request)
 
-def part_sol_to_dist_sol(dist_zone, part_zones, comm, include=[], exclude=[], reduce_func=None):
+def part_sol_to_dist_sol(dist_zone, part_zones, comm, include=[], exclude=[], reduce_func=None, request=None):
   """
   Transfert all the data included in FlowSolution_t nodes from partitioned
   zones to the distributed zone. Data created on (one or more) partitions and not present in dist_tree
   is also reported to the distributed zone.
   """
-  # Complete distree with partitioned fields and exchange PL if needed
-  _discover_wrapper(dist_zone, part_zones, 'FlowSolution_t', 'FlowSolution_t/DataArray_t', comm)
-  mask_tree = te_utils.create_mask_tree(dist_zone, ['FlowSolution_t', 'DataArray_t'], include, exclude)
-  _part_to_dist_sollike(dist_zone, part_zones, mask_tree, comm, reduce_func)
-  #Cleanup : if field is None, data has been added by wrapper and must be removed
-  for dist_sol in PT.iter_children_from_label(dist_zone, 'FlowSolution_t'):
-    PT.rm_children_from_predicate(dist_sol, lambda n : PT.get_label(n) == 'DataArray_t' and n[1] is None)
+  _part_to_dist_container(dist_zone, part_zones, comm, 'FlowSolution_t', include, exclude, reduce_func, request)
 
-def part_discdata_to_dist_discdata(dist_zone, part_zones, comm, include=[], exclude=[], reduce_func=None):
+def part_discdata_to_dist_discdata(dist_zone, part_zones, comm, include=[], exclude=[], reduce_func=None, request=None):
   """
   Transfert all the data included in DiscreteData_t from partitioned
   zones to the distributed zone. Data created on (one or more) partitions and not present in dist_tree
   is also reported to the distributed zone.
   """
-  # Complete distree with partitioned fields and exchange PL if needed
-  _discover_wrapper(dist_zone, part_zones, 'DiscreteData_t', 'DiscreteData_t/DataArray_t', comm)
-  mask_tree = te_utils.create_mask_tree(dist_zone, ['DiscreteData_t', 'DataArray_t'], include, exclude)
-  _part_to_dist_sollike(dist_zone, part_zones, mask_tree, comm, reduce_func)
-  #Cleanup : if field is None, data has been added by wrapper and must be removed
-  for dist_sol in PT.iter_children_from_label(dist_zone, 'DiscreteData_t'):
-    PT.rm_children_from_predicate(dist_sol, lambda n : PT.get_label(n) == 'DataArray_t' and n[1] is None)
+  _part_to_dist_container(dist_zone, part_zones, comm, 'DiscreteData_t', include, exclude, reduce_func, request)
 
-def part_subregion_to_dist_subregion(dist_zone, part_zones, comm, include=[], exclude=[], reduce_func=None):
+def _subregion_transfer(dist_zone, part_zones, mask_zsr):
+  """
+  Return the transfer of a ZoneSubRegion_t node
+  """
+  d_zsr = PT.get_child_from_name(dist_zone, PT.get_name(mask_zsr)) #True ZSR
+  # Search matching region
+  matching_region_path = PT.getSubregionExtent(d_zsr, dist_zone)
+  matching_region = PT.get_node_from_path(dist_zone, matching_region_path)
+  assert matching_region is not None
+
+  #Get distribution
+  distribution = te_utils.get_cgns_distribution(matching_region, 'Index')
+
+  #Get lngn and data
+  fields = [PT.get_name(n) for n in PT.get_children(mask_zsr)]
+  part_data = {field : [] for field in fields}
+  if PT.get_label(matching_region) in ['GridConnectivity_t', 'GridConnectivity1to1_t']:
+    # ZSR have been split
+    ancestor, leaf = PT.path_head(matching_region_path), PT.path_tail(matching_region_path)
+    lngn_list = []
+    for part_zone in part_zones:
+      for node in PT.iter_children_from_predicates(part_zone, [ancestor, leaf+'*']):
+        # Get corresponding part ZSR
+        lngn_list.append(PT.get_value(MT.getGlobalNumbering(node, 'Index')))
+        good_zsr = lambda n: PT.get_label(n) == 'ZoneSubRegion_t' \
+                             and PT.get_child_from_name(n, 'GridConnectivityRegionName') is not None \
+                             and PT.get_value(PT.get_child_from_name(n, 'GridConnectivityRegionName')) == PT.get_name(node)
+        p_zsr = PT.get_node_from_predicate(part_zone, good_zsr)
+        for field in fields:
+          part_data[field].append(PT.get_child_from_name(p_zsr, field)[1])
+  else:
+    lngn_list    = te_utils.collect_cgns_g_numbering(part_zones, 'Index', matching_region_path)
+    #Discover data
+    for part_zone in part_zones:
+      p_zsr = PT.get_node_from_path(part_zone, PT.get_name(d_zsr))
+      if p_zsr is not None:
+        for field in fields:
+          part_data[field].append(PT.get_child_from_name(p_zsr, field)[1])
+
+    #Partitions having no data must be removed from lngn list since they have no contribution
+    empty_parts_ids = [ipart for ipart, part_zone in enumerate(part_zones)\
+        if PT.get_node_from_path(part_zone, PT.get_name(d_zsr)) is None]
+    for ipart in empty_parts_ids[::-1]:
+      lngn_list.pop(ipart)
+
+  return part_data, distribution, lngn_list, _set_dist_values(d_zsr, PT.get_child_from_name)
+
+def part_subregion_to_dist_subregion(dist_zone, part_zones, comm, include=[], exclude=[], reduce_func=None, request=None):
   """
   Transfert all the data included in ZoneSubRegion_t nodes from the partitioned
   zones to the distributed zone.
   """
   _discover_wrapper(dist_zone, part_zones, 'ZoneSubRegion_t', 'ZoneSubRegion_t/DataArray_t', comm)
   mask_tree = te_utils.create_mask_tree(dist_zone, ['ZoneSubRegion_t', 'DataArray_t'], include, exclude)
-  for mask_zsr in PT.get_children(mask_tree):
-    d_zsr = PT.get_child_from_name(dist_zone, PT.get_name(mask_zsr)) #True ZSR
-    # Search matching region
-    matching_region_path = PT.getSubregionExtent(d_zsr, dist_zone)
-    matching_region = PT.get_node_from_path(dist_zone, matching_region_path)
-    assert matching_region is not None
-
-    #Get distribution
-    distribution = te_utils.get_cgns_distribution(matching_region, 'Index')
-
-    #Get lngn and data
-    fields = [PT.get_name(n) for n in PT.get_children(mask_zsr)]
-    part_data = {field : [] for field in fields}
-    if PT.get_label(matching_region) in ['GridConnectivity_t', 'GridConnectivity1to1_t']:
-      # ZSR have been split
-      ancestor, leaf = PT.path_head(matching_region_path), PT.path_tail(matching_region_path)
-      lngn_list = []
-      for part_zone in part_zones:
-        for node in PT.iter_children_from_predicates(part_zone, [ancestor, leaf+'*']):
-          # Get corresponding part ZSR
-          lngn_list.append(PT.get_value(MT.getGlobalNumbering(node, 'Index')))
-          good_zsr = lambda n: PT.get_label(n) == 'ZoneSubRegion_t' \
-                               and PT.get_child_from_name(n, 'GridConnectivityRegionName') is not None \
-                               and PT.get_value(PT.get_child_from_name(n, 'GridConnectivityRegionName')) == PT.get_name(node)
-          p_zsr = PT.get_node_from_predicate(part_zone, good_zsr)
-          for field in fields:
-            part_data[field].append(PT.get_child_from_name(p_zsr, field)[1])
-    else:
-      lngn_list    = te_utils.collect_cgns_g_numbering(part_zones, 'Index', matching_region_path)
-      #Discover data
-      for part_zone in part_zones:
-        p_zsr = PT.get_node_from_path(part_zone, PT.get_name(d_zsr))
-        if p_zsr is not None:
-          for field in fields:
-            part_data[field].append(PT.get_child_from_name(p_zsr, field)[1])
-
-      #Partitions having no data must be removed from lngn list since they have no contribution
-      empty_parts_ids = [ipart for ipart, part_zone in enumerate(part_zones)\
-          if PT.get_node_from_path(part_zone, PT.get_name(d_zsr)) is None]
-      for ipart in empty_parts_ids[::-1]:
-        lngn_list.pop(ipart)
-
-    # Exchange
-    dist_data = EP.part_to_block(part_data, distribution, lngn_list, comm, reduce_func)
-    for field, array in dist_data.items():
-      dist_field = PT.get_child_from_name(d_zsr, field)
-      PT.set_value(dist_field, array)
+  transfers = (_subregion_transfer(dist_zone, part_zones, mask_zsr) for mask_zsr in PT.get_children(mask_tree))
+  _transfer(transfers, comm, reduce_func, request)
 
   #Cleanup : if field is None, data has been added by wrapper and must be removed
-  for dist_zsr in PT.iter_children_from_label(dist_zone, 'ZoneSubRegion_t'):
-    PT.rm_children_from_predicate(dist_zsr, lambda n : PT.get_label(n) == 'DataArray_t' and n[1] is None)
+  def cleanup():
+    for dist_zsr in PT.iter_children_from_label(dist_zone, 'ZoneSubRegion_t'):
+      PT.rm_children_from_predicate(dist_zsr, lambda n : PT.get_label(n) == 'DataArray_t' and n[1] is None)
+  _finalize(cleanup, request)
+
+def _dataset_transfer(dist_zone, part_zones, bc_path, mask_dataset):
+  """
+  Return the transfer of a BCDataSet_t node
+  """
+  d_bc = PT.get_node_from_path(dist_zone, bc_path) #True BC
+  ds_path = bc_path + '/' + PT.get_name(mask_dataset)
+  d_dataset = PT.get_node_from_path(dist_zone, ds_path) #True DataSet
+  #If dataset has its own PointList, we must override bc distribution and lngn
+  if MT.getDistribution(d_dataset) is not None:
+    distribution = te_utils.get_cgns_distribution(d_dataset, 'Index')
+    lngn_list    = te_utils.collect_cgns_g_numbering(part_zones, 'Index', ds_path)
+  else: #Fallback to bc distribution
+    distribution = te_utils.get_cgns_distribution(d_bc, 'Index')
+    lngn_list    = te_utils.collect_cgns_g_numbering(part_zones, 'Index', bc_path)
+
+  #Discover data
+  data_paths = PT.predicates_to_paths(mask_dataset, ['*', '*'])
+  part_data = {path : [] for path in data_paths}
+
+  for part_zone in part_zones:
+    p_dataset = PT.get_node_from_path(part_zone, ds_path)
+    if p_dataset is not None:
+      for path in data_paths:
+        part_data[path].append(PT.get_node_from_path(p_dataset, path)[1])
+
+  #Partitions having no data must be removed from lngn list since they have no contribution
+  empty_parts_ids = [ipart for ipart, part_zone in enumerate(part_zones)\
+      if PT.get_node_from_path(part_zone, ds_path) is None]
+  for ipart in empty_parts_ids[::-1]:
+    lngn_list.pop(ipart)
+
+  return part_data, distribution, lngn_list, _set_dist_values(d_dataset, PT.get_node_from_path)
 
-def part_dataset_to_dist_dataset(dist_zone, part_zones, comm, include=[], exclude=[], reduce_func=None):
+def part_dataset_to_dist_dataset(dist_zone, part_zones, comm, include=[], exclude=[], reduce_func=None, request=None):
   """
   Transfert all the data included in BCDataSet_t/BCData_t nodes from partitioned
   zones to the distributed zone.
@@ -220,45 +299,18 @@ def part_dataset_to_dist_dataset(dist_zone, part_zones, comm, include=[], exclud
   bc_ds_path = 'ZoneBC_t/BC_t/BCDataSet_t'
   _discover_wrapper(dist_zone, part_zones, bc_ds_path, bc_ds_path+'/BCData_t/DataArray_t', comm)
 
+  transfers = []
   for d_zbc in PT.iter_children_from_label(dist_zone, "ZoneBC_t"):
     labels = ['BC_t', 'BCDataSet_t', 'BCData_t', 'DataArray_t']
     mask_tree = te_utils.create_mask_tree(d_zbc, labels, include, exclude)
     for mask_bc in PT.get_children(mask_tree):
       bc_path   = PT.get_name(d_zbc) + '/' + PT.get_name(mask_bc)
-      d_bc = PT.get_node_from_path(dist_zone, bc_path) #True BC
       for mask_dataset in PT.get_children(mask_bc):
-        ds_path = bc_path + '/' + PT.get_name(mask_dataset)
-        d_dataset = PT.get_node_from_path(dist_zone, ds_path) #True DataSet
-        #If dataset has its own PointList, we must override bc distribution and lngn
-        if MT.getDistribution(d_dataset) is not None:
-          distribution = te_utils.get_cgns_distribution(d_dataset, 'Index')
-          lngn_list    = te_utils.collect_cgns_g_numbering(part_zones, 'Index', ds_path)
-        else: #Fallback to bc distribution
-          distribution = te_utils.get_cgns_distribution(d_bc, 'Index')
-          lngn_list    = te_utils.collect_cgns_g_numbering(part_zones, 'Index', bc_path)
-
-        #Discover data
-        data_paths = PT.predicates_to_paths(mask_dataset, ['*', '*'])
-        part_data = {path : [] for path in data_paths}
-
-        for part_zone in part_zones:
-          p_dataset = PT.get_node_from_path(part_zone, ds_path)
-          if p_dataset is not None:
-            for path in data_paths:
-              part_data[path].append(PT.get_node_from_path(p_dataset, path)[1])
-
-        #Partitions having no data must be removed from lngn list since they have no contribution
-        empty_parts_ids = [ipart for ipart, part_zone in enumerate(part_zones)\
-            if PT.get_node_from_path(part_zone, ds_path) is None]
-        for ipart in empty_parts_ids[::-1]:
-          lngn_list.pop(ipart)
-
-        #Exchange
-        dist_data = EP.part_to_block(part_data, distribution, lngn_list, comm, reduce_func)
-        for field, array in dist_data.items():
-          dist_field = PT.get_node_from_path(d_dataset, field)
-          PT.set_value(dist_field, array)
-  #Cleanup : if field is None, data has been added by wrapper and must be removed
-  for dist_ddata in PT.iter_nodes_from_predicates(dist_zone, bc_ds_path+'/BCData_t'):
-    PT.rm_children_from_predicate(dist_ddata, lambda n : PT.get_label(n) == 'DataArray_t' and n[1] is None)
+        transfers.append(_dataset_transfer(dist_zone, part_zones, bc_path, mask_dataset))
+  _transfer(transfers, comm, reduce_func, request)
 
+  #Cleanup : if field is None, data has been added by wrapper and must be removed
+  def cleanup():
+    for dist_ddata in PT.iter_nodes_from_predicates(dist_zone, bc_ds_path+'/BCData_t'):
+      PT.rm_children_from_predicate(dist_ddata, lambda n : PT.get_label(n) == 'DataArray_t' and n[1] is None)
+  _finalize(cleanup, request)
@@ -1,12 +1,14 @@
 import maia.pytree as PT
 
 import maia.transfer as TE
+from maia.transfer import protocols as EP
 from . import data_exchange
 
 __all__ = ['part_zones_to_dist_zone_only',
            'part_zones_to_dist_zone_all',
            'part_tree_to_dist_tree_only_labels',
-           'part_tree_to_dist_tree_all']
+           'part_tree_to_dist_tree_all',
+           'ipart_tree_to_dist_tree_all']
 
 #Managed labels and corresponding funcs
 LABELS = ['FlowSolution_t', 'DiscreteData_t', 'ZoneSubRegion_t', 'BCDataSet_t']
@@ -15,7 +17,7 @@ FUNCS = [data_exchange.part_sol_to_dist_sol,
          data_exchange.part_subregion_to_dist_subregion,
          data_exchange.part_dataset_to_dist_dataset]
 
-def _part_zones_to_dist_zone(dist_zone, part_zones, comm, filter_dict):
+def _part_zones_to_dist_zone(dist_zone, part_zones, comm, filter_dict, request=None):
   """
   Low level API to transfert data fields from the partitioned zones to the distributed zone.
   filter_dict must a dict containing, for each label defined in LABELS, a tuple (flag, paths):
@@ -24,13 +26,14 @@ def _part_zones_to_dist_zone(dist_zone, part_zones, comm, filter_dict):
       data_exchange functions defined in FUNCS
   If paths == [], all data will be transfered if flag == 'E' (= exclude nothing), and not data
   will be transfered if flag == 'I' (=include nothing)
+  If request is not None, the exchanges are posted in this TransferRequest
   """
   for label, func in zip(LABELS, FUNCS):
     tag, paths = filter_dict[label]
     if tag == 'I' and paths != []:
-      func(dist_zone, part_zones, comm, include=paths)
+      func(dist_zone, part_zones, comm, include=paths, request=request)
     elif tag == 'E':
-      func(dist_zone, part_zones, comm, exclude=paths)
+      func(dist_zone, part_zones, comm, exclude=paths, request=request)
 
 def part_zones_to_dist_zone_only(dist_zone, part_zones, comm, include_dict):
   """ Transfer the data fields specified in include_dict from the partitioned zones
@@ -65,5 +68,23 @@ def part_tree_to_dist_tree_all(dist_tree, part_tree, comm):
   to the corresponding distributed tree.
   """
   part_tree_to_dist_tree_only_labels(dist_tree, part_tree, LABELS, comm)
+
+def ipart_tree_to_dist_tree_all(dist_tree, part_tree, comm):
+  """ Non blocking version of :func:`part_tree_to_dist_tree_all`.
+
+  The exchanges of all the data fields are posted, and a request handle is returned.
+  Its ``wait()`` method must then be called collectively to complete the exchanges
+  and fill the distributed tree. Until then, the fields of the partitioned tree
+  must not be modified.
+
+  Returns:
+    TransferRequest: Handle on the posted exchanges
+  """
+  request = EP.TransferRequest()
+  filter_dict = {label : ('E', []) for label in LABELS}
+  for d_base, d_zone in PT.get_children_from_labels(dist_tree, ['CGNSBase_t', 'Zone_t'], ancestors=True):
+    p_zones = TE.utils.get_partitioned_zones(part_tree, PT.get_name(d_base) + '/' + PT.get_name(d_zone))
+    _part_zones_to_dist_zone(d_zone, p_zones, comm, filter_dict, request)
+  return request
  
 #Possible improvement : dist_tree_to_part_tree only and all API with global paths
@@ -0,0 +1 @@
+from .tree_api import *
@@ -0,0 +1,215 @@
+from mpi4py import MPI
+import numpy as np
+
+import maia.pytree      as PT
+import maia.pytree.maia as MT
+
+from maia.transfer import protocols as EP
+
+from maia.factory.dist_from_part import discover_nodes_from_matching
+
+LOC_TO_GNUM = {'Vertex' : 'Vertex', 'CellCenter' : 'Cell'}
+
+def _get_index_gnum(node):
+  """ Return the Index global numbering of node, or None if node is None """
+  return None if node is None else PT.get_value(MT.getGlobalNumbering(node, 'Index'))
+
+def _all_true(flags, comm):
+  """ Reduce a list of local booleans with a logical and, using a single allreduce """
+  flags = np.array(flags, dtype=np.uint8)
+  comm.Allreduce(MPI.IN_PLACE, flags, op=MPI.MIN)
+  return [bool(flag) for flag in flags]
+
+class _Container:
+  """
+  Description of a container to transfer : path (from the zone) of the container, path
+  (from the container) of its fields, and functions returning the global numbering
+  of a source or target partition (None if the container does not exist on it)
+  and filling a target partition with the received fields.
+  Containers having the same key share their numbering.
+  """
+  def __init__(self, key, path, fields, src_lngn, tgt_lngn, fill):
+    self.key      = key
+    self.path     = path
+    self.fields   = fields
+    self.src_lngn = src_lngn
+    self.tgt_lngn = tgt_lngn
+    self.fill     = fill
+
+def _sollike_containers(mask_zone, src_zones, label, comm):
+  """
+  Containers of FlowSolution_t or DiscreteData_t label
+  """
+  mask_sols = PT.get_children_from_label(mask_zone, label)
+  # Get all the needed flags at once : container is everywhere, container has no PointList,
+  # then for each field : field exists on each partition having the container
+  flags = []
+  for mask_sol in mask_sols:
+    p_sols = [PT.get_child_from_name(zone, PT.get_name(mask_sol)) for zone in src_zones]
+    flags.append(all([p_sol is not None for p_sol in p_sols]))
+    flags.append(all([PT.get_child_from_name(p_sol, 'PointList') is None for p_sol in p_sols if p_sol is not None]))
+    for field in PT.get_children(mask_sol):
+      flags.append(all([PT.get_child_from_name(p_sol, PT.get_name(field)) is not None for p_sol in p_sols if p_sol is not None]))
+  flags = iter(_all_true(flags, comm))
+
+  containers = []
+  for mask_sol in mask_sols:
+    sol_name = PT.get_name(mask_sol)
+    everywhere, has_pl = next(flags), not next(flags)
+    fields = [PT.get_name(field) for field in PT.get_children(mask_sol) if next(flags)]
+    location = PT.Subset.GridLocation(mask_sol)
+    if has_pl:
+      key = sol_name
+      get_lngn = lambda zone, sol_name=sol_name: _get_index_gnum(PT.get_child_from_name(zone, sol_name))
+      def fill(zone, part_data, sol_name=sol_name):
+        p_sol = PT.get_child_from_name(zone, sol_name)
+        for field, data in part_data.items():
+          PT.update_child(p_sol, field, 'DataArray_t', data)
+      containers.append(_Container(key, sol_name, fields, get_lngn, get_lngn, fill))
+    else:
+      assert location in LOC_TO_GNUM
+      # Full containers at the same location share their numbering if they exist everywhere
+      key = location if everywhere else sol_name
+      get_lngn = lambda zone, location=location: PT.get_value(MT.getGlobalNumbering(zone, LOC_TO_GNUM[location]))
+      src_lngn = lambda zone, sol_name=sol_name, get_lngn=get_lngn: \
+          get_lngn(zone) if PT.get_child_from_name(zone, sol_name) is not None else None
+      def fill(zone, part_data, sol_name=sol_name, location=location):
+        p_sol = PT.update_child(zone, sol_name, label)
+        PT.update_child(p_sol, 'GridLocation', 'GridLocation_t', location)
+        shape = PT.Zone.VertexSize(zone) if location == 'Vertex' else PT.Zone.CellSize(zone)
+        for field, data in part_data.items():
+          #F is mandatory to keep shared reference. Normally no copy is done
+          PT.update_child(p_sol, field, 'DataArray_t', data.reshape(shape, order='F'))
+      containers.append(_Container(key, sol_name, fields, src_lngn, get_lngn, fill))
+  return containers
+
+def _subregion_containers(mask_zone, src_zones, comm):
+  """
+  Containers of ZoneSubRegion_t label. ZoneSubRegion_t related to a GridConnectivity are not managed.
+  """
+  is_gc_zsr = lambda n: PT.get_child_from_name(n, 'GridConnectivityRegionName') is not None
+  mask_zsrs = [zsr for zsr in PT.get_children_from_label(mask_zone, 'ZoneSubRegion_t') if not is_gc_zsr(zsr)]
+
+  flags = []
+  for mask_zsr in mask_zsrs:
+    p_zsrs = [PT.get_child_from_name(zone, PT.get_name(mask_zsr)) for zone in src_zones]
+    for field in PT.get_children_from_label(mask_zsr, 'DataArray_t'):
+      flags.append(all([PT.get_child_from_name(p_zsr, PT.get_name(field)) is not None for p_zsr in p_zsrs if p_zsr is not None]))
+  flags = iter(_all_true(flags, comm))
+
+  def _region_lngn(zone, zsr):
+    try:
+      region_path = PT.getSubregionExtent(zsr, zone)
+    except ValueError: # Related BC does not exist on this partition
+      return None
+    return _get_index_gnum(PT.get_node_from_path(zone, region_path))
+
+  containers = []
+  for mask_zsr in mask_zsrs:
+    zsr_name = PT.get_name(mask_zsr)
+    fields = [PT.get_name(field) for field in PT.get_children_from_label(mask_zsr, 'DataArray_t') if next(flags)]
+    src_lngn = lambda zone, zsr_name=zsr_name: \
+        None if PT.get_child_from_name(zone, zsr_name) is None else _region_lngn(zone, PT.get_child_from_name(zone, zsr_name))
+    tgt_lngn = lambda zone, mask_zsr=mask_zsr: _region_lngn(zone, mask_zsr)
+    def fill(zone, part_data, mask_zsr=mask_zsr):
+      # Create ZSR if not existing (eg was defined by bc)
+      p_zsr = PT.update_child(zone, PT.get_name(mask_zsr), PT.get_label(mask_zsr), PT.get_value(mask_zsr))
+      for descriptor in PT.get_children_from_label(mask_zsr, 'Descriptor_t'):
+        PT.update_child(p_zsr, PT.get_name(descriptor), PT.get_label(descriptor), PT.get_value(descriptor))
+      for field, data in part_data.items():
+        PT.update_child(p_zsr, field, 'DataArray_t', data)
+    containers.append(_Container(zsr_name, zsr_name, fields, src_lngn, tgt_lngn, fill))
+  return containers
+
+def _dataset_containers(mask_zone, src_zones, comm):
+  """
+  Containers of BCDataSet_t label
+  """
+  ds_paths = PT.predicates_to_paths(mask_zone, 'ZoneBC_t/BC_t/BCDataSet_t')
+
+  flags = []
+  for ds_path in ds_paths:
+    p_dss = [PT.get_node_from_path(zone, ds_path) for zone in src_zones]
+    flags.append(all([MT.getGlobalNumbering(p_ds, 'Index') is None for p_ds in p_dss if p_ds is not None]))
+    for field_path in PT.predicates_to_paths(PT.get_node_from_path(mask_zone, ds_path), 'BCData_t/DataArray_t'):
+      flags.append(all([PT.get_node_from_path(p_ds, field_path) is not None for p_ds in p_dss if p_ds is not None]))
+  flags = iter(_all_true(flags, comm))
+
+  containers = []
+  for ds_path in ds_paths:
+    mask_ds = PT.get_node_from_path(mask_zone, ds_path)
+    has_pl = not next(flags)
+    fields = [path for path in PT.predicates_to_paths(mask_ds, 'BCData_t/DataArray_t') if next(flags)]
+    src_lngn = lambda zone, ds_path=ds_path, has_pl=has_pl: \
+        None if PT.get_node_from_path(zone, ds_path) is None else \
+        _get_index_gnum(PT.get_node_from_path(zone, ds_path if has_pl else PT.path_head(ds_path)))
+    # Dataset are created on the target partitions if they do not have their own PointList
+    tgt_lngn = lambda zone, ds_path=ds_path, has_pl=has_pl: \
+        _get_index_gnum(PT.get_node_from_path(zone, ds_path if has_pl else PT.path_head(ds_path)))
+    def fill(zone, part_data, ds_path=ds_path, mask_ds=mask_ds):
+      part_bc = PT.get_node_from_path(zone, PT.path_head(ds_path))
+      part_ds = PT.update_child(part_bc, PT.get_name(mask_ds), PT.get_label(mask_ds), PT.get_value(mask_ds))
+      for field_path, data in part_data.items():
+        container_name, field_name = field_path.split('/')
+        p_container = PT.update_child(part_ds, container_name, 'BCData_t')
+        PT.update_child(p_container, field_name, 'DataArray_t', data)
+    containers.append(_Container(ds_path, ds_path, fields, src_lngn, tgt_lngn, fill))
+  return containers
+
+def _discover_containers(src_zones, labels, comm):
+  """
+  Return a zone gathering the containers (and their fields) found on the
+  source partitions of all the ranks, for the requested labels
+  """
+  mask_zone = PT.new_Zone('MaskedZone')
+  for label in labels:
+    if label in ['FlowSolution_t', 'DiscreteData_t', 'ZoneSubRegion_t']:
+      discover_nodes_from_matching(mask_zone, src_zones, label, comm,
+                                   child_list=['GridLocation_t', 'Descriptor_t'], get_value='all')
+      discover_nodes_from_matching(mask_zone, src_zones, [label, 'DataArray_t'], comm)
+    elif label == 'BCDataSet_t':
+      discover_nodes_from_matching(mask_zone, src_zones, 'ZoneBC_t/BC_t/BCDataSet_t/BCData_t/DataArray_t', comm)
+  return mask_zone
+
+def part_zones_to_part_zones(src_zones, tgt_zones, comm, labels):
+  """
+  Transfer the data fields of the specified labels from the source partitioned zones
+  to the target partitioned zones, all of them coming from the same distributed zone.
+  Elements are matched using their global numbering, and the exchanges of all
+  the containers are posted before being waited.
+  """
+  mask_zone = _discover_containers(src_zones, labels, comm)
+  containers = []
+  for label in labels:
+    if label in ['FlowSolution_t', 'DiscreteData_t']:
+      containers.extend(_sollike_containers(mask_zone, src_zones, label, comm))
+    elif label == 'ZoneSubRegion_t':
+      containers.extend(_subregion_containers(mask_zone, src_zones, comm))
+    elif label == 'BCDataSet_t':
+      containers.extend(_dataset_containers(mask_zone, src_zones, comm))
+
+  ptps = dict()
+  requests = []
+  for container in containers:
+    if not container.fields:
+      continue
+    src_lngn = [container.src_lngn(zone) for zone in src_zones]
+    src_ids  = [i for i, lngn in enumerate(src_lngn) if lngn is not None]
+    src_lngn = [src_lngn[i] for i in src_ids]
+    tgt_lngn = [container.tgt_lngn(zone) for zone in tgt_zones]
+    tgt_ids  = [i for i, lngn in enumerate(tgt_lngn) if lngn is not None]
+    tgt_lngn = [tgt_lngn[i] for i in tgt_ids]
+
+    src_data = dict()
+    for field in container.fields:
+      src_data[field] = [PT.get_node_from_path(src_zones[i], f'{container.path}/{field}')[1] for i in src_ids]
+
+    if container.key not in ptps:
+      ptps[container.key] = EP.PartToPartFromGnum(src_lngn, tgt_lngn, comm)
+    request = EP.ipart_to_part(src_data, src_lngn, tgt_lngn, comm, ptps[container.key])
+    requests.append((container, tgt_ids, request))
+
+  for container, tgt_ids, request in requests:
+    tgt_data = request.wait()
+    for j, i_zone in enumerate(tgt_ids):
+      container.fill(tgt_zones[i_zone], {field : data[j] for field, data in tgt_data.items()})
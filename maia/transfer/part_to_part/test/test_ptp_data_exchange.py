@@ -0,0 +1,85 @@
+import pytest
+import numpy      as np
+import maia.pytree        as PT
+
+from pytest_mpi_check._decorator import mark_mpi_test
+
+from   maia.pytree.yaml   import parse_yaml_cgns
+import maia.transfer.part_to_part.data_exchange as PTP
+from maia import npy_pdm_gnum_dtype as pdm_dtype
+
+dtype = 'I4' if pdm_dtype == np.int32 else 'I8'
+
+@mark_mpi_test(2)
+def test_part_zones_to_part_zones(sub_comm):
+  if sub_comm.Get_rank() == 0:
+    src_pt = """
+  Zone.P0.N0 Zone_t [[3,0,0]]:
+    ZBC ZoneBC_t:
+      BC BC_t:
+        PointList IndexArray_t [[1,2]]:
+        :CGNS#GlobalNumbering UserDefinedData_t:
+          Index DataArray_t {0} [1,2]:
+        BCDataSet BCDataSet_t:
+          NeumannData BCData_t:
+            dfield DataArray_t R8 [-1., -2.]:
+    FlowSolution FlowSolution_t:
+      GridLocation GridLocation_t "Vertex":
+      field DataArray_t R8 [10., 20., 30.]:
+      ifield DataArray_t I4 [1, 2, 3]:
+    ZSR ZoneSubRegion_t:
+      BCRegionName Descriptor_t "BC":
+      zfield DataArray_t R8 [1., 2.]:
+    :CGNS#GlobalNumbering UserDefinedData_t:
+      Vertex DataArray_t {0} [1,2,3]:
+  """.format(dtype)
+    tgt_pt = """
+  Zone.P0.N0 Zone_t [[2,0,0]]:
+    ZBC ZoneBC_t:
+      BC BC_t:
+        PointList IndexArray_t [[1]]:
+        :CGNS#GlobalNumbering UserDefinedData_t:
+          Index DataArray_t {0} [2]:
+    :CGNS#GlobalNumbering UserDefinedData_t:
+      Vertex DataArray_t {0} [6,1]:
+  """.format(dtype)
+  else:
+    src_pt = """
+  Zone.P1.N0 Zone_t [[3,0,0]]:
+    FlowSolution FlowSolution_t:
+      GridLocation GridLocation_t "Vertex":
+      field DataArray_t R8 [40., 50., 60.]:
+      ifield DataArray_t I4 [4, 5, 6]:
+    :CGNS#GlobalNumbering UserDefinedData_t:
+      Vertex DataArray_t {0} [4,5,6]:
+  """.format(dtype)
+    tgt_pt = """
+  Zone.P1.N0 Zone_t [[4,0,0]]:
+    ZBC ZoneBC_t:
+      BC BC_t:
+        PointList IndexArray_t [[3]]:
+        :CGNS#GlobalNumbering UserDefinedData_t:
+          Index DataArray_t {0} [1]:
+    :CGNS#GlobalNumbering UserDefinedData_t:
+      Vertex DataArray_t {0} [2,5,3,4]:
+  """.format(dtype)
+
+  src_zones = parse_yaml_cgns.to_nodes(src_pt)
+  tgt_zones = parse_yaml_cgns.to_nodes(tgt_pt)
+
+  PTP.part_zones_to_part_zones(src_zones, tgt_zones, sub_comm,
+      ['FlowSolution_t', 'ZoneSubRegion_t', 'BCDataSet_t'])
+
+  tgt_zone = tgt_zones[0]
+  gnum = PT.get_node_from_path(tgt_zone, ':CGNS#GlobalNumbering/Vertex')[1]
+  assert PT.Subset.GridLocation(PT.get_node_from_name(tgt_zone, 'FlowSolution')) == 'Vertex'
+  assert (PT.get_node_from_path(tgt_zone, 'FlowSolution/field')[1] == 10.*gnum).all()
+  assert (PT.get_node_from_path(tgt_zone, 'FlowSolution/ifield')[1] == gnum).all()
+  assert PT.get_node_from_path(tgt_zone, 'FlowSolution/ifield')[1].dtype == np.int32
+  if sub_comm.Get_rank() == 0:
+    assert (PT.get_node_from_path(tgt_zone, 'ZSR/zfield')[1] == [2.]).all()
+    assert PT.get_value(PT.get_node_from_path(tgt_zone, 'ZSR/BCRegionName')) == 'BC'
+    assert (PT.get_node_from_path(tgt_zone, 'ZBC/BC/BCDataSet/NeumannData/dfield')[1] == [-2.]).all()
+  else:
+    assert (PT.get_node_from_path(tgt_zone, 'ZSR/zfield')[1] == [1.]).all()
+    assert (PT.get_node_from_path(tgt_zone, 'ZBC/BC/BCDataSet/NeumannData/dfield')[1] == [-1.]).all()
@@ -0,0 +1,51 @@
+import maia.transfer as TE
+from maia.factory.dist_from_part import get_parts_per_blocks
+from . import data_exchange
+
+__all__ = ['part_zones_to_part_zones_only_labels',
+           'part_tree_to_part_tree_only_labels',
+           'part_tree_to_part_tree_all']
+
+#Managed labels
+LABELS = ['FlowSolution_t', 'DiscreteData_t', 'ZoneSubRegion_t', 'BCDataSet_t']
+
+def part_zones_to_part_zones_only_labels(src_zones, tgt_zones, labels, comm):
+  """ Transfer all the data fields of the specified labels from the partitioned zones
+  of a block to other partitioned zones of the same block.
+
+  Source and target zones may come from two different partitionings : values
+  are matched using the global numbering of the partitions.
+  """
+  assert isinstance(labels, list)
+  data_exchange.part_zones_to_part_zones(src_zones, tgt_zones, comm, labels)
+
+def part_tree_to_part_tree_only_labels(src_tree, tgt_tree, labels, comm):
+  """ Transfer all the data fields of the specified labels from a partitioned tree
+  to another partitioned tree of the same distributed tree.
+
+  The two trees may come from different partitionings (eg with a different number
+  of partitions or a different method) : values are directly exchanged between the
+  partitions, using their global numbering, without going through the distributed tree.
+
+  Example:
+      .. literalinclude:: snippets/test_transfer.py
+        :start-after: #part_tree_to_part_tree_only_labels@start
+        :end-before: #part_tree_to_part_tree_only_labels@end
+        :dedent: 2
+  """
+  assert isinstance(labels, list)
+  for zone_path, src_zones in get_parts_per_blocks(src_tree, comm).items():
+    tgt_zones = TE.utils.get_partitioned_zones(tgt_tree, zone_path)
+    data_exchange.part_zones_to_part_zones(src_zones, tgt_zones, comm, labels)
+
+def part_tree_to_part_tree_all(src_tree, tgt_tree, comm):
+  """ Transfer all the data fields from a partitioned tree
+  to another partitioned tree of the same distributed tree.
+
+  Example:
+      .. literalinclude:: snippets/test_transfer.py
+        :start-after: #part_tree_to_part_tree_all@start
+        :end-before: #part_tree_to_part_tree_all@end
+        :dedent: 2
+  """
+  part_tree_to_part_tree_only_labels(src_tree, tgt_tree, LABELS, comm)
@@ -1,8 +1,18 @@
+import functools
+import hashlib
+import inspect
+import json
+import sys
+import time
+from collections import OrderedDict
+
 import numpy as np
+from mpi4py import MPI
 
 import Pypdm.Pypdm        as PDM
 
 import maia
+import maia.utils.logging as mlog
 from maia.utils import par_utils, np_utils
 
 def auto_expand_distri(distri, comm):
@@ -56,13 +66,259 @@ def PartToBlock(distri, ln_to_gn_list, comm, *, weight=False, keep_multiple=Fals
   return PDM.PartToBlock(comm, _ln_to_gn_list, pWeight=pWeight, partN=len(_ln_to_gn_list),
                          t_distrib=0, t_post=t_post, userDistribution=_full_distri)
 
+def BlockToPartP2P(distri, ln_to_gn_list, comm):
+  """
+  Create a PDM PartToPart object whose part1 is the block (of the extended
+  distribution) and part2 are the partitions described by ln_to_gn_list.
+  Unlike BlockToPart, it allows non blocking exchanges.
+  """
+  full_distri = auto_expand_distri(distri, comm)
+  i_rank = comm.Get_rank()
+  block_gnum = np.arange(full_distri[i_rank], full_distri[i_rank+1], dtype=maia.npy_pdm_gnum_dtype) + 1
+  _ln_to_gn_list = [maia.utils.as_pdm_gnum(ln_to_gn) for ln_to_gn in ln_to_gn_list]
+  return PDM.PartToPart(comm, [block_gnum], _ln_to_gn_list,
+                        [np.arange(block_gnum.size+1, dtype=np.int32)], [block_gnum])
+
+def PartToBlockP2P(distri, ln_to_gn_list, comm):
+  """
+  Create a PDM PartToPart object whose part1 are the partitions described by
+  ln_to_gn_list and part2 is the block (of the extended distribution).
+  Unlike PartToBlock, it allows non blocking exchanges.
+  """
+  full_distri = auto_expand_distri(distri, comm)
+  i_rank = comm.Get_rank()
+  block_gnum = np.arange(full_distri[i_rank], full_distri[i_rank+1], dtype=maia.npy_pdm_gnum_dtype) + 1
+  _ln_to_gn_list = [maia.utils.as_pdm_gnum(ln_to_gn) for ln_to_gn in ln_to_gn_list]
+  _part1_to_part2_idx = [np.arange(ln_to_gn.size+1, dtype=np.int32) for ln_to_gn in _ln_to_gn_list]
+  return PDM.PartToPart(comm, _ln_to_gn_list, [block_gnum], _part1_to_part2_idx, _ln_to_gn_list)
+
+def PartToPartFromGnum(part1_ln_to_gn_list, part2_ln_to_gn_list, comm):
+  """
+  Create a PDM PartToPart object linking each element of the part1 partitions
+  to the elements of the part2 partitions having the same global number
+  """
+  _part1_ln_to_gn_list = [maia.utils.as_pdm_gnum(ln_to_gn) for ln_to_gn in part1_ln_to_gn_list]
+  _part2_ln_to_gn_list = [maia.utils.as_pdm_gnum(ln_to_gn) for ln_to_gn in part2_ln_to_gn_list]
+  _part1_to_part2_idx = [np.arange(ln_to_gn.size+1, dtype=np.int32) for ln_to_gn in _part1_ln_to_gn_list]
+  return PDM.PartToPart(comm, _part1_ln_to_gn_list, _part2_ln_to_gn_list, _part1_to_part2_idx, _part1_ln_to_gn_list)
+
+class TransferContext:
+  """
+  Cache of the BlockToPart and PartToBlock objects created by block_to_part,
+  block_to_part_strided and part_to_block.
+
+  Inside a ``with TransferContext(comm):`` block, the exchange objects are
+  kept and reused by the next transfers involving the same distribution and
+  ln_to_gn arrays, so repeated transfers (eg in a solver loop) only pay for
+  the data exchange. Objects are indexed by a digest of the content of
+  the numbering arrays : a modified numbering thus leads to a new object.
+  Since digests are local, each object is also tagged with the sequence number
+  of its (collective) build : an object is only reused if all the ranks selected
+  the same build, which costs one allreduce.
+
+  At most max_size objects are kept (least recently used are dropped first).
+  """
+  _active = []
+
+  def __init__(self, comm, max_size=128):
+    self.comm     = comm
+    self.max_size = max_size
+    self.n_hits   = 0
+    self.n_builds = 0
+    self._plans   = OrderedDict()
+    self._seq     = 0 # Incremented by all the ranks at each build
+
+  def __enter__(self):
+    TransferContext._active.append(self)
+    return self
+
+  def __exit__(self, *args):
+    TransferContext._active.remove(self)
+
+  def __len__(self):
+    return len(self._plans)
+
+  def clear(self):
+    """ Drop all the cached objects """
+    self._plans.clear()
+
+  @staticmethod
+  def _digest(distri, ln_to_gn_list):
+    h = hashlib.blake2b(digest_size=16)
+    for array in [distri] + list(ln_to_gn_list):
+      if array is None:
+        h.update(b'None')
+      else:
+        array = np.ascontiguousarray(array)
+        h.update(f'{array.dtype.str}{array.size};'.encode())
+        h.update(array)
+    return h.digest()
+
+  def get(self, builder, distri, ln_to_gn_list, comm, **kwargs):
+    """ Return a cached exchange object built with builder(distri, ln_to_gn_list, comm, **kwargs),
+    or create it. Must be called collectively. """
+    return self._get(builder, distri, ln_to_gn_list, comm, **kwargs)[0]
+
+  def _get(self, builder, distri, ln_to_gn_list, comm, **kwargs):
+    """ Same than get, but also return a dict kept (and dropped) with the exchange object,
+    where data depending on it can be stored """
+    key = (builder.__name__, self._digest(distri, ln_to_gn_list), tuple(sorted(kwargs.items())))
+    seq, plan, extras = self._plans.get(key, (-1, None, None))
+    # Local digests may collide (eg empty ln_to_gn) : reuse only if all the ranks
+    # selected the object coming from the same build
+    seq_min_max = np.array([-seq, seq])
+    comm.Allreduce(MPI.IN_PLACE, seq_min_max, op=MPI.MAX)
+    if -seq_min_max[0] == seq_min_max[1] >= 0:
+      self._plans.move_to_end(key)
+      self.n_hits += 1
+    else:
+      plan, extras = builder(distri, ln_to_gn_list, comm, **kwargs), dict()
+      self._plans[key] = (self._seq, plan, extras)
+      self._plans.move_to_end(key)
+      self._seq += 1
+      if len(self._plans) > self.max_size:
+        self._plans.popitem(last=False)
+      self.n_builds += 1
+    return plan, extras
+
+def _get_exchanger(builder, distri, ln_to_gn_list, comm, with_extras=False, **kwargs):
+  """
+  Create an exchange object using builder, or reuse it from the active
+  TransferContext (if any, and if defined on the same communicator).
+  If with_extras is True, also return a dict kept with the exchange object
+  (empty if the object has just been created)
+  """
+  for context in TransferContext._active[::-1]:
+    if MPI.Comm.Compare(context.comm, comm) == MPI.IDENT:
+      plan, extras = context._get(builder, distri, ln_to_gn_list, comm, **kwargs)
+      break
+  else:
+    plan, extras = builder(distri, ln_to_gn_list, comm, **kwargs), dict()
+  return (plan, extras) if with_extras else plan
 
+class TransferStats:
+  """
+  Opt-in instrumentation of the block_to_block, block_to_part, block_to_part_strided
+  and part_to_block transfers.
+
+  Inside a ``with TransferStats(comm):`` block, each transfer records, for its call
+  site (first caller outside of this module), the number of calls, the bytes sent and
+  received by the current rank and the elapsed time. Measures are purely local :
+  the statistics of all the ranks are only gathered when report() or dump() are
+  called, which must be done collectively.
+  """
+  _active = []
+  _keys = ['calls', 'sent', 'received', 'time']
+
+  def __init__(self, comm):
+    self.comm    = comm
+    self.records = dict()
+
+  def __enter__(self):
+    TransferStats._active.append(self)
+    return self
+
+  def __exit__(self, *args):
+    TransferStats._active.remove(self)
+
+  def record(self, site, n_sent, n_received, elapsed):
+    """ Add a transfer to the records of site """
+    record = self.records.setdefault(site, [0, 0, 0, 0.])
+    for j, value in enumerate([1, n_sent, n_received, elapsed]):
+      record[j] += value
+
+  def gather(self):
+    """ Return, for each call site, the min, max and sum across the ranks of each
+    recorded quantity. Must be called collectively. """
+    all_records = self.comm.allgather(self.records)
+    stats = dict()
+    for site in sorted(set().union(*all_records)):
+      values = np.array([records.get(site, [0, 0, 0, 0.]) for records in all_records], dtype=np.float64)
+      stats[site] = dict()
+      for j, key in enumerate(TransferStats._keys):
+        _type = float if key == 'time' else int
+        stats[site][key] = {'min' : _type(values[:,j].min()), 'max' : _type(values[:,j].max()),
+                            'sum' : _type(values[:,j].sum())}
+    return stats
+
+  def report(self):
+    """ Log the gathered statistics through the maia-stats logger, from the most
+    to the least expensive call site. Must be called collectively. """
+    stats = self.gather()
+    n_rank = self.comm.Get_size()
+    lines = [f"Transfer statistics over {n_rank} ranks (per rank values are given as min/max):"]
+    for site, stat in sorted(stats.items(), key=lambda item: -item[1]['time']['max']):
+      mean_time = stat['time']['sum'] / n_rank
+      imbalance = stat['time']['max'] / mean_time if mean_time > 0 else 1.
+      lines.append(f"  {site} : {stat['calls']['max']} calls"
+                   f" -- sent {mlog.bsize_to_str(stat['sent']['min'])}/{mlog.bsize_to_str(stat['sent']['max'])}"
+                   f" -- received {mlog.bsize_to_str(stat['received']['min'])}/{mlog.bsize_to_str(stat['received']['max'])}"
+                   f" -- time {stat['time']['min']:.3f}s/{stat['time']['max']:.3f}s (imbalance {imbalance:.2f})")
+    mlog.stat('\n'.join(lines))
+
+  def dump(self, filename):
+    """ Write the gathered statistics in a JSON file (from rank 0).
+    Must be called collectively. """
+    stats = self.gather()
+    if self.comm.Get_rank() == 0:
+      with open(filename, 'w') as f:
+        json.dump({'n_rank' : self.comm.Get_size(), 'sites' : stats}, f, indent=2)
+
+def _nbytes(data):
+  """ Total size in bytes of the arrays found in data (array, or nested lists / dicts of arrays) """
+  if isinstance(data, np.ndarray):
+    return data.nbytes
+  elif isinstance(data, dict):
+    return sum([_nbytes(value) for value in data.values()])
+  elif isinstance(data, (list, tuple)):
+    return sum([_nbytes(value) for value in data])
+  return 0
+
+def _instrumented(*data_args):
+  """
+  Decorate a transfer function to record it in the active TransferStats (if any,
+  and if defined on the same communicator). data_args are the names of the
+  arguments holding the sent data.
+  """
+  def decorator(func):
+    signature = inspect.signature(func)
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+      if not TransferStats._active:
+        return func(*args, **kwargs)
+      arguments = signature.bind(*args, **kwargs).arguments
+      stats = [stats for stats in TransferStats._active[::-1] \
+          if MPI.Comm.Compare(stats.comm, arguments['comm']) == MPI.IDENT]
+      if not stats:
+        return func(*args, **kwargs)
+      start = time.perf_counter()
+      result = func(*args, **kwargs)
+      elapsed = time.perf_counter() - start
+      frame = sys._getframe(1)
+      while frame.f_code.co_filename == __file__:
+        frame = frame.f_back
+      site = f"{func.__name__}@{frame.f_globals.get('__name__')}.{frame.f_code.co_name}:{frame.f_lineno}"
+      n_sent = sum([_nbytes(arguments[name]) for name in data_args])
+      stats[0].record(site, n_sent, _nbytes(result), elapsed)
+      return result
+    return wrapper
+  return decorator
+
+def _as_arrays(data):
+  """ Convert the field(s) of data (single field or dict of fields) which are not
+  numpy arrays, eg values not yet read from the file (see maia.io.lazy_loading.LazyArray) """
+  if isinstance(data, dict):
+    return {name : _as_arrays(field) for name, field in data.items()}
+  return data if isinstance(data, np.ndarray) else np.asarray(data)
+
+@_instrumented('data_in')
 def block_to_block(data_in, distri_in, distri_out, comm):
   """
   Create and exchange using a BlockToBlock object.
   Allow single field or dict of fields
   """
   BTB = BlockToBlock(distri_in, distri_out, comm)
+  data_in = _as_arrays(data_in)
 
   if isinstance(data_in, dict):
     block_data_out = dict()
@@ -73,28 +329,92 @@ def block_to_block(data_in, distri_in, distri_out, comm):
 
   return block_data_out
 
-def block_to_part(dist_data, distri, ln_to_gn_list, comm):
+def _group_by_dtype(dtypes):
+  """
+  Group the names of fields sharing the same dtype. dtypes maps each field
+  name to its dtype, or to None if the field can not be packed with others.
+  Return a list of groups (list of names), in order of first appearance.
+  """
+  groups = dict()
+  for name, dtype in dtypes.items():
+    key = (None, name) if dtype is None else dtype
+    groups.setdefault(key, []).append(name)
+  return list(groups.values())
+
+def _flat_view(array):
+  """ Return the array as a flat contiguous array, in Fortran order for multidimensional
+  (structured) arrays. This is a view if the array is contiguous; otherwise, a copy
+  can not be avoided since PDM requires contiguous buffers """
+  return array.reshape(-1, order='F')
+
+def _interlace(arrays):
+  """ Pack a list of arrays of same size into a single flat interlaced array.
+  Multidimensional arrays are read in Fortran order, directly from their
+  buffers (no intermediate copy is done, even for non contiguous views) """
+  n_field = len(arrays)
+  packed = np.empty((arrays[0].size, n_field), arrays[0].dtype)
+  for j, array in enumerate(arrays):
+    np.copyto(packed[:,j].reshape(array.shape, order='F'), array)
+  return packed.reshape(-1)
+
+def _deinterlace(packed, n_field):
+  """ Unpack a flat interlaced array into a list of n_field contiguous arrays,
+  which are views on a same buffer """
+  return list(np.ascontiguousarray(packed.reshape(-1, n_field).T))
+
+def _dist_dtypes(dist_data, comm):
+  """
+  Return the dtype of each field of dist_data (dict of distributed arrays),
+  or None if the field can not be packed with others, eg because dtype differs
+  between the ranks (which can occur for empty arrays) or because the field is
+  multidimensional. Result is the same on all the ranks.
+  """
+  l_dtypes = [d_field.dtype.str if d_field.ndim == 1 else None for d_field in dist_data.values()]
+  dtypes = dict()
+  for name, all_dtypes in zip(dist_data.keys(), zip(*comm.allgather(l_dtypes))):
+    dtype = set(all_dtypes)
+    dtypes[name] = dtype.pop() if len(dtype) == 1 else None
+  return dtypes
+
+@_instrumented('dist_data')
+def block_to_part(dist_data, distri, ln_to_gn_list, comm, packed=True):
   """
   Create and exchange using a BlockToPart object.
-  Allow single field or dict of fields
+  Allow single field or dict of fields.
+  If packed is True, the fields of a dict having the same dtype are interlaced
+  and exchanged at once.
   """
-  BTP = BlockToPart(distri, ln_to_gn_list, comm)
+  BTP = _get_exchanger(BlockToPart, distri, ln_to_gn_list, comm)
+  dist_data = _as_arrays(dist_data)
 
   if isinstance(dist_data, dict):
     part_data = dict()
-    for name, d_field in dist_data.items():
-      part_data[name] = BTP.exchange_field(d_field)[1]
+    if packed and len(dist_data) > 1:
+      groups = _group_by_dtype(_dist_dtypes(dist_data, comm))
+    else:
+      groups = [[name] for name in dist_data]
+    for names in groups:
+      if len(names) == 1:
+        part_data[names[0]] = BTP.exchange_field(dist_data[names[0]])[1]
+      else:
+        _, p_packed = BTP.exchange_field(_interlace([dist_data[name] for name in names]), len(names))
+        p_unpacked = [_deinterlace(p_array, len(names)) for p_array in p_packed]
+        for j, name in enumerate(names):
+          part_data[name] = [p_fields[j] for p_fields in p_unpacked]
+    part_data = {name : part_data[name] for name in dist_data} # Restore initial order
   else:
     _, part_data = BTP.exchange_field(dist_data)
 
   return part_data
 
+@_instrumented('dist_stride', 'dist_data')
 def block_to_part_strided(dist_stride, dist_data, distri, ln_to_gn_list, comm):
   """
   Create and exchange using a BlockToPart object with variable stride.
   Allow single field or dict of fields
   """
-  BTP = BlockToPart(distri, ln_to_gn_list, comm)
+  BTP = _get_exchanger(BlockToPart, distri, ln_to_gn_list, comm)
+  dist_data = _as_arrays(dist_data)
 
   if isinstance(dist_data, dict):
     part_data = dict()
@@ -106,54 +426,400 @@ def block_to_part_strided(dist_stride, dist_data, distri, ln_to_gn_list, comm):
 
   return part_stride, part_data
 
-def part_to_block(part_data, distri, ln_to_gn_list, comm, reduce_func=None, **kwargs):
+def _part_dtypes(part_data, ln_to_gn_list, comm):
+  """
+  Return the dtype of each field of part_data (dict of list of partitioned arrays),
+  or None if the field can not be packed with others, eg because dtype differs
+  between the ranks or because of a size mismatch. Result is the same on all the ranks.
+  """
+  sizes = [lngn.size for lngn in ln_to_gn_list]
+  l_dtypes = []
+  for p_fields in part_data.values():
+    if len(p_fields) != len(sizes) or [p_f.size for p_f in p_fields] != sizes:
+      l_dtypes.append({None})
+    else:
+      l_dtypes.append({p_f.dtype.str for p_f in p_fields})
+  dtypes = dict()
+  for name, all_dtypes in zip(part_data.keys(), zip(*comm.allgather(l_dtypes))):
+    dtype = set.union(*all_dtypes)
+    dtypes[name] = dtype.pop() if len(dtype) == 1 else None
+  return dtypes
+
+@_instrumented('part_data')
+def part_to_block(part_data, distri, ln_to_gn_list, comm, reduce_func=None, packed=True, **kwargs):
   """
   Create and exchange using a PartToBlock object.
-  Allow single field or dict of fields
+  Allow single field or dict of fields.
+  If packed is True, the fields of a dict having the same dtype are interlaced
+  and exchanged at once.
+  If reduce_func is a Reduction, the packed fields are also reduced at once.
   """
-  if reduce_func is not None:
-    PTB = PartToBlock(distri, ln_to_gn_list, comm, keep_multiple=True, **kwargs)
-    def _exchange_one(part_fields):
-      p_stride = [np.ones(p_f.size, dtype=np.int32) for p_f in part_fields]
+  if isinstance(reduce_func, Reduction):
+    PTB, extras = _get_exchanger(PartToBlock, distri, ln_to_gn_list, comm, with_extras=True,
+                                 keep_multiple=True, **kwargs)
+    plan = reduce_func._get_plan(PTB, extras, ln_to_gn_list, comm)
+    def _exchange(part_fields, n_field=1):
+      p_stride = [np.full(p_f.size // n_field, n_field, dtype=np.int32) for p_f in part_fields]
       dist_stride, dist_data = PTB.exchange_field(part_fields, p_stride)
-      dist_data = reduce_func(dist_data, dist_stride)
-      return dist_data
+      plan.set_stride(dist_stride // n_field)
+      if n_field == 1:
+        return plan.apply(dist_data)
+      return list(np.ascontiguousarray(plan.apply(dist_data.reshape(-1, n_field)).T))
+  elif reduce_func is not None:
+    PTB = _get_exchanger(PartToBlock, distri, ln_to_gn_list, comm, keep_multiple=True, **kwargs)
+    def _exchange(part_fields, n_field=1):
+      p_stride = [np.full(p_f.size // n_field, n_field, dtype=np.int32) for p_f in part_fields]
+      dist_stride, dist_data = PTB.exchange_field(part_fields, p_stride)
+      if n_field == 1:
+        return reduce_func(dist_data, dist_stride)
+      return [reduce_func(d_f, dist_stride // n_field) for d_f in _deinterlace(dist_data, n_field)]
   else:
-    PTB = PartToBlock(distri, ln_to_gn_list, comm, **kwargs)
-    def _exchange_one(part_fields):
-      _, dist_data = PTB.exchange_field(part_fields)
-      return dist_data
+    PTB = _get_exchanger(PartToBlock, distri, ln_to_gn_list, comm, **kwargs)
+    def _exchange(part_fields, n_field=1):
+      if n_field == 1:
+        return PTB.exchange_field(part_fields)[1]
+      _, dist_data = PTB.exchange_field(part_fields, n_field)
+      return _deinterlace(dist_data, n_field)
 
   if isinstance(part_data, dict):
-    dist_data = {name: _exchange_one(p_field) for name, p_field in part_data.items()}
+    dist_data = dict()
+    if packed and len(part_data) > 1:
+      groups = _group_by_dtype(_part_dtypes(part_data, ln_to_gn_list, comm))
+    else:
+      groups = [[name] for name in part_data]
+    for names in groups:
+      if len(names) == 1:
+        dist_data[names[0]] = _exchange([_flat_view(p_f) for p_f in part_data[names[0]]])
+      else:
+        p_packed = [_interlace(p_fields) for p_fields in zip(*[part_data[name] for name in names])]
+        for name, d_field in zip(names, _exchange(p_packed, len(names))):
+          dist_data[name] = d_field
+    dist_data = {name : dist_data[name] for name in part_data} # Restore initial order
   else:
-    dist_data = _exchange_one(part_data)  
+    dist_data = _exchange([_flat_view(p_f) for p_f in part_data])
   return dist_data
 
+class _P2PRequest:
+  """
+  Exchanges posted on a PartToPart object, one per group of packed fields.
+  wait() completes them and returns the received fields, after applying
+  unpack(names, recv_data, n_field) which must return a list (one item per field)
+  """
+  def __init__(self, PTP, is_dict, unpack):
+    self.PTP     = PTP
+    self.is_dict = is_dict
+    self.unpack  = unpack
+    self.posted  = []
+
+  def post(self, names, part1_data, n_field):
+    request = self.PTP.iexch(PDM._PDM_MPI_COMM_KIND_P2P,
+                             PDM._PDM_PART_TO_PART_DATA_DEF_ORDER_PART1_TO_PART2,
+                             part1_data,
+                             part1_stride=n_field)
+    self.posted.append((names, request, n_field))
+
+  def wait(self):
+    data = dict()
+    for names, request, n_field in self.posted:
+      _, recv_data = self.PTP.wait(request)
+      for name, field in zip(names, self.unpack(recv_data, n_field)):
+        data[name] = field
+    self.posted = []
+    return data if self.is_dict else data[None]
+
+def iblock_to_part(dist_data, distri, ln_to_gn_list, comm):
+  """
+  Non blocking version of block_to_part : exchanges are posted, and the
+  returned object has a wait() method, which returns the partitioned data.
+  Allow single field or dict of fields
+  """
+  PTP = _get_exchanger(BlockToPartP2P, distri, ln_to_gn_list, comm)
+
+  def _unpack(recv_data, n_field):
+    referenced = PTP.get_referenced_lnum2()
+    part_fields = []
+    for ref_lnum, recv, ln_to_gn in zip(referenced, recv_data, ln_to_gn_list):
+      # Each partitioned element receives exactly one value from the block
+      p_packed = np.empty((ln_to_gn.size, n_field), recv.dtype)
+      p_packed[ref_lnum-1] = recv.reshape(-1, n_field)
+      part_fields.append(_deinterlace(p_packed, n_field))
+    return [list(p_field) for p_field in zip(*part_fields)] if part_fields else [[] for j in range(n_field)]
+
+  is_dict = isinstance(dist_data, dict)
+  _dist_data = _as_arrays(dist_data) if is_dict else {None : _as_arrays(dist_data)}
+  request = _P2PRequest(PTP, is_dict, _unpack)
+  if len(_dist_data) > 1:
+    groups = _group_by_dtype(_dist_dtypes(_dist_data, comm))
+  else:
+    groups = [list(_dist_data.keys())]
+  for names in groups:
+    if len(names) == 1:
+      request.post(names, [_dist_data[names[0]]], 1)
+    else:
+      request.post(names, [_interlace([_dist_data[name] for name in names])], len(names))
+  return request
+
+def ipart_to_block(part_data, distri, ln_to_gn_list, comm, reduce_func=None):
+  """
+  Non blocking version of part_to_block : exchanges are posted, and the
+  returned object has a wait() method, which returns the distributed data.
+  If no reduce_func is given, the first received value is kept for
+  elements known by several partitions. Elements known by no partition are set to 0.
+  Allow single field or dict of fields
+  """
+  PTP = _get_exchanger(PartToBlockP2P, distri, ln_to_gn_list, comm)
+  full_distri = auto_expand_distri(distri, comm)
+  dn = full_distri[comm.Get_rank()+1] - full_distri[comm.Get_rank()]
+
+  def _unpack(recv_data, n_field):
+    ref_lnum = PTP.get_referenced_lnum2()[0]
+    come_from_idx = PTP.get_gnum1_come_from()[0]['come_from_idx']
+    recv = recv_data[0].reshape(-1, n_field)
+    dist_fields = []
+    for j in range(n_field):
+      if reduce_func is None:
+        reduced = recv[come_from_idx[:-1], j]
+      elif recv.shape[0] > 0:
+        reduced = reduce_func(np.ascontiguousarray(recv[:,j]), np.diff(come_from_idx))
+      else:
+        reduced = recv[:0,j]
+      d_field = np.zeros(dn, reduced.dtype)
+      d_field[ref_lnum-1] = reduced
+      dist_fields.append(d_field)
+    return dist_fields
+
+  is_dict = isinstance(part_data, dict)
+  _part_data = part_data if is_dict else {None : part_data}
+  request = _P2PRequest(PTP, is_dict, _unpack)
+  if len(_part_data) > 1:
+    groups = _group_by_dtype(_part_dtypes(_part_data, ln_to_gn_list, comm))
+  else:
+    groups = [[name] for name in _part_data]
+  for names in groups:
+    if len(names) == 1:
+      request.post(names, [_flat_view(p_f) for p_f in _part_data[names[0]]], 1)
+    else:
+      p_packed = [_interlace(p_fields) for p_fields in zip(*[_part_data[name] for name in names])]
+      request.post(names, p_packed, len(names))
+  return request
+
+def ipart_to_part(part1_data, part1_ln_to_gn_list, part2_ln_to_gn_list, comm, PTP=None):
+  """
+  Non blocking exchange from the part1 partitions to the part2 partitions, matching
+  the elements by global number (see PartToPartFromGnum; PTP can be provided
+  to reuse an existing one). The returned object has a wait() method, which returns
+  the data of the part2 partitions.
+  Elements received from several part1 elements take the first received value;
+  elements known by no part1 element are set to 0.
+  Allow single field or dict of fields
+  """
+  if PTP is None:
+    PTP = PartToPartFromGnum(part1_ln_to_gn_list, part2_ln_to_gn_list, comm)
+
+  def _unpack(recv_data, n_field):
+    referenced = PTP.get_referenced_lnum2()
+    come_from  = PTP.get_gnum1_come_from()
+    part2_fields = []
+    for i_part, ln_to_gn in enumerate(part2_ln_to_gn_list):
+      recv = recv_data[i_part].reshape(-1, n_field)
+      p_packed = np.zeros((ln_to_gn.size, n_field), recv.dtype)
+      p_packed[referenced[i_part]-1] = recv[come_from[i_part]['come_from_idx'][:-1]]
+      part2_fields.append(_deinterlace(p_packed, n_field))
+    return [list(p_field) for p_field in zip(*part2_fields)] if part2_fields else [[] for j in range(n_field)]
+
+  is_dict = isinstance(part1_data, dict)
+  _part1_data = part1_data if is_dict else {None : part1_data}
+  request = _P2PRequest(PTP, is_dict, _unpack)
+  if len(_part1_data) > 1:
+    groups = _group_by_dtype(_part_dtypes(_part1_data, part1_ln_to_gn_list, comm))
+  else:
+    groups = [[name] for name in _part1_data]
+  for names in groups:
+    if len(names) == 1:
+      request.post(names, [_flat_view(p_f) for p_f in _part1_data[names[0]]], 1)
+    else:
+      p_packed = [_interlace(p_fields) for p_fields in zip(*[_part1_data[name] for name in names])]
+      request.post(names, p_packed, len(names))
+  return request
+
+class TransferRequest:
+  """
+  Handle on non blocking field transfers, returned by the idist_tree_to_part_tree_all
+  and ipart_tree_to_dist_tree_all functions.
+
+  Exchanges are posted when the handle is created; calling wait() completes
+  them and fills the destination tree with the received fields.
+  """
+  def __init__(self):
+    self._pending = []
+
+  def add(self, request, callback):
+    """ Register a posted exchange (object having a wait() method) and the function
+    to call with the received data. If request is None, callback is called without
+    argument once the previously registered exchanges are done. """
+    self._pending.append((request, callback))
+
+  def wait(self):
+    """ Complete the exchanges and fill the tree """
+    for request, callback in self._pending:
+      if request is None:
+        callback()
+      else:
+        callback(request.wait())
+    self._pending = []
+
+def _as_column(dist_stride, dist_data):
+  """ Reshape dist_stride to allow its broadcast against a (n, k) dist_data """
+  return dist_stride.reshape((-1,) + (1,)*(dist_data.ndim-1))
+
 def reduce_sum(dist_data,dist_stride):
   """
-  Function that sum all data sharing the same global number
+  Function that sum all data sharing the same global number.
+  dist_data can be a (n, k) array of multi-component data
   """
   indices = np_utils.sizes_to_indices(dist_stride)[:-1]
-  return np.add.reduceat(dist_data, indices)
+  return np.add.reduceat(dist_data, indices, axis=0)
 
 def reduce_max(dist_data,dist_stride):
   """
-  Function that return the maximum of all data sharing the same global number
+  Function that return the maximum of all data sharing the same global number.
+  dist_data can be a (n, k) array of multi-component data
   """
   indices = np_utils.sizes_to_indices(dist_stride)[:-1]
-  return np.maximum.reduceat(dist_data, indices)
+  return np.maximum.reduceat(dist_data, indices, axis=0)
 
 def reduce_min(dist_data,dist_stride):
   """
-  Function that return the minimum of all data sharing the same global number
+  Function that return the minimum of all data sharing the same global number.
+  dist_data can be a (n, k) array of multi-component data
   """
   indices = np_utils.sizes_to_indices(dist_stride)[:-1]
-  return np.minimum.reduceat(dist_data, indices)
+  return np.minimum.reduceat(dist_data, indices, axis=0)
 
 def reduce_mean(dist_data,dist_stride):
   """
-  Function that return the mean of all data sharing the same global number
+  Function that return the mean of all data sharing the same global number.
+  dist_data can be a (n, k) array of multi-component data
   """
   indices = np_utils.sizes_to_indices(dist_stride)[:-1]
-  return np.add.reduceat(dist_data, indices) / dist_stride
+  return np.add.reduceat(dist_data, indices, axis=0) / _as_column(dist_stride, dist_data)
+
+class Reduction:
+  """
+  Reduction rule usable as reduce_func in part_to_block, combining the values
+  received for a same global number.
+
+  Compared to the reduce_* functions, the offsets of the received values are computed
+  once per exchange, and the fields packed together are reduced in a single pass as a
+  (n, k) array. Moreover, the following rules are available:
+
+  - ``'sum'``, ``'min'``, ``'max'``, ``'mean'``;
+  - ``'first'`` (resp. ``'last'``) keeps the value sent by the lowest (resp. highest) owner,
+    owners being sorted by rank then by partition index.
+
+  If weights are provided (one array per partition, having the size of the ln_to_gn of the
+  partition), values are multiplied by their weight for the 'sum' rule, and a weighted
+  mean is computed for the 'mean' rule.
+  Rules requiring an additional exchange (weights, first and last) are only supported
+  by part_to_block. Inside a TransferContext, the data prepared for a reduction (offsets,
+  exchanged weights and owners) is kept with the exchange object, and reused by the next
+  transfers using the same rule and weights.
+  """
+  ufuncs = {'sum' : np.add, 'mean' : np.add, 'min' : np.minimum, 'max' : np.maximum}
+
+  def __init__(self, rule, weights=None):
+    if rule not in ['sum', 'min', 'max', 'mean', 'first', 'last']:
+      raise ValueError(f"Unknown reduction rule {rule}")
+    if weights is not None and rule not in ['sum', 'mean']:
+      raise ValueError(f"Weights can not be used with {rule} reduction rule")
+    self.rule    = rule
+    self.weights = weights
+
+  def _get_plan(self, PTB, extras, ln_to_gn_list, comm):
+    """ Return the _ReductionPlan of this reduction for PTB. Plans are stored in extras
+    (dict kept with PTB by the TransferContext), indexed by the rule and a digest of the
+    weights, and reused if the ones requiring an exchange have been prepared by the same
+    (collective) call on all the ranks. """
+    plans = extras.setdefault('reduction_plans', {'generation' : 0, 'plans' : dict()})
+    weights_key = None if self.weights is None else TransferContext._digest(None, self.weights)
+    key = (self.rule, weights_key)
+    if self.weights is None and self.rule not in ['first', 'last']:
+      # Plan only depends on PTB
+      if key not in plans['plans']:
+        plans['plans'][key] = (-1, self._prepare(PTB, ln_to_gn_list, comm))
+      return plans['plans'][key][1]
+
+    # Plans are built collectively, so they are known by all the ranks or by none
+    if plans['generation'] > 0:
+      generation, plan = plans['plans'].get(key, (-1, None))
+      gen_min_max = np.array([-generation, generation])
+      comm.Allreduce(MPI.IN_PLACE, gen_min_max, op=MPI.MAX)
+      if -gen_min_max[0] == gen_min_max[1] >= 0:
+        return plan
+    plan = self._prepare(PTB, ln_to_gn_list, comm)
+    plans['plans'][key] = (plans['generation'], plan)
+    plans['generation'] += 1
+    return plan
+
+  def _prepare(self, PTB, ln_to_gn_list, comm):
+    """ Exchange the data needed by the reduction and return a _ReductionPlan """
+    plan = _ReductionPlan(self)
+    p_stride = [np.ones(lngn.size, dtype=np.int32) for lngn in ln_to_gn_list]
+    if self.weights is not None:
+      p_weights = [np.asarray(w, dtype=np.float64) for w in self.weights]
+      dist_stride, plan.weights = PTB.exchange_field(p_weights, p_stride)
+      plan.set_stride(dist_stride)
+    if self.rule in ['first', 'last']:
+      # Owner key : rank in the high bits, partition index in the low bits
+      owners = [np.full(lngn.size, (comm.Get_rank() << 32) + i_part, dtype=np.int64) \
+          for i_part, lngn in enumerate(ln_to_gn_list)]
+      dist_stride, dist_owners = PTB.exchange_field(owners, p_stride)
+      plan.set_stride(dist_stride)
+      group = np.repeat(np.arange(dist_stride.size), dist_stride)
+      order = np.lexsort((dist_owners, group))
+      pos = plan.indices[:-1] if self.rule == 'first' else plan.indices[1:]-1
+      plan.select = order[pos]
+    return plan
+
+  def __call__(self, dist_data, dist_stride):
+    if self.weights is not None or self.rule in ['first', 'last']:
+      raise ValueError(f"Reduction rule {self.rule} is only supported by part_to_block")
+    plan = _ReductionPlan(self)
+    plan.set_stride(dist_stride)
+    return plan.apply(dist_data)
+
+class _ReductionPlan:
+  """
+  Data needed to apply a Reduction on the data received by a PartToBlock
+  object : offsets of the values of each global number, exchanged weights
+  and selected positions (for first and last rules)
+  """
+  def __init__(self, reduction):
+    self.reduction = reduction
+    self.stride  = None
+    self.indices = None
+    self.weights = None
+    self.select  = None
+
+  def set_stride(self, dist_stride):
+    if self.stride is None:
+      self.stride  = dist_stride
+      self.indices = np_utils.sizes_to_indices(dist_stride)
+
+  def apply(self, dist_data):
+    """ Reduce dist_data, which is either a 1D array or a (n, k) array """
+    rule = self.reduction.rule
+    if rule in ['first', 'last']:
+      return dist_data[self.select]
+    if self.stride.size == 0:
+      return np.empty((0,) + dist_data.shape[1:], dist_data.dtype)
+    if self.weights is not None:
+      dist_data = dist_data * _as_column(self.weights, dist_data)
+    reduced = Reduction.ufuncs[rule].reduceat(dist_data, self.indices[:-1], axis=0)
+    if rule == 'mean':
+      if self.weights is not None:
+        total = np.add.reduceat(self.weights, self.indices[:-1])
+      else:
+        total = self.stride
+      reduced = reduced / _as_column(total, reduced)
+    return reduced
@@ -0,0 +1,171 @@
+import time
+import zlib
+
+import numpy as np
+from mpi4py import MPI
+
+import maia.pytree        as PT
+import maia.pytree.maia   as MT
+import maia.utils.logging as mlog
+
+from maia.transfer import utils as te_utils
+from maia.factory.dist_from_part import get_parts_per_blocks
+from .dist_to_part.tree_api import dist_zone_to_part_zones_only
+from .part_to_dist.tree_api import part_zones_to_dist_zone_only
+
+# Predicates (from the zone) of the DataArray_t nodes managed for each label
+FIELD_PREDICATES = {'FlowSolution_t'  : ['FlowSolution_t', 'DataArray_t'],
+                    'DiscreteData_t'  : ['DiscreteData_t', 'DataArray_t'],
+                    'ZoneSubRegion_t' : ['ZoneSubRegion_t', 'DataArray_t'],
+                    'BCDataSet_t'     : ['ZoneBC_t', 'BC_t', 'BCDataSet_t', 'BCData_t', 'DataArray_t']}
+
+def _checksum(array):
+  """ Return a cheap checksum of array (including its dtype and shape),
+  or None if the value is not a loaded array """
+  if not isinstance(array, np.ndarray):
+    return None
+  crc = zlib.crc32(f'{array.dtype.str}{array.shape}'.encode())
+  return zlib.crc32(array.ravel(order='K'), crc) # No copy for C or F contiguous arrays
+
+def _iter_fields(zone, labels, is_part):
+  """
+  Yield the (label, path, include_path, node) of the DataArray_t nodes of zone managed
+  by labels, where path starts from the zone and include_path follows the format expected
+  by the zone level transfer functions
+  """
+  for label in labels:
+    for nodes in PT.iter_children_from_predicates(zone, FIELD_PREDICATES[label], ancestors=True):
+      if nodes[-1][1] is None:
+        continue
+      names = [PT.get_name(node) for node in nodes]
+      path = '/'.join(names)
+      if label == 'BCDataSet_t': # Paths start from ZoneBC_t node
+        names = names[1:]
+      elif label == 'ZoneSubRegion_t' and is_part and \
+          PT.get_child_from_name(nodes[0], 'GridConnectivityRegionName') is not None:
+        names[0] = MT.conv.get_split_prefix(names[0]) # ZSR has been split with its GC
+      yield label, path, '/'.join(names), nodes[-1]
+
+class TransferSync:
+  """
+  Incremental synchronisation of the data fields between a distributed tree
+  and the corresponding partitioned tree.
+
+  A checksum of each DataArray_t is kept after each synchronisation. Then,
+  part_to_dist() (resp. dist_to_part()) only transfers the fields which have been
+  modified since on the partitioned (resp. distributed) tree on at least one rank.
+  Fields written by a synchronisation are considered as up to date, so they are not sent
+  back by the synchronisation in the other direction.
+
+  Both methods must be called collectively, on trees whose fields are not
+  modified elsewhere than by the user (ie not by other transfer functions).
+
+  Args:
+    dist_tree (CGNSTree) : Distributed tree
+    part_tree (CGNSTree) : Corresponding partitioned tree
+    comm      (MPIComm)  : MPI communicator
+    labels (list of str, optional) : Labels of the synchronised containers. Defaults to
+      FlowSolution_t, DiscreteData_t, ZoneSubRegion_t and BCDataSet_t.
+  """
+  def __init__(self, dist_tree, part_tree, comm, labels=list(FIELD_PREDICATES.keys())):
+    self.dist_tree = dist_tree
+    self.part_tree = part_tree
+    self.comm      = comm
+    self.labels    = labels
+    self._checksums = dict()
+    self.n_moved       = 0
+    self.n_skipped     = 0
+    self.bytes_moved   = 0
+    self.bytes_skipped = 0
+    self.time          = 0.
+
+  def _check(self, side, zone_path, zone, is_part):
+    """ Compare the checksums of the fields of zone with the stored ones. Return
+    the set of modified and of all fields (as (label, include_path)), and the number
+    of bytes of each field """
+    modified, fields, nbytes = set(), set(), dict()
+    for label, path, include_path, node in _iter_fields(zone, self.labels, is_part):
+      key = (label, include_path)
+      checksum = _checksum(node[1])
+      if checksum is None or self._checksums.get((side, zone_path, path)) != checksum:
+        modified.add(key)
+      fields.add(key)
+      nbytes[key] = nbytes.get(key, 0) + getattr(node[1], 'nbytes', 0)
+    return modified, fields, nbytes
+
+  def _update(self, side, zone_path, zone, is_part, transferred=None):
+    """ Store the checksums of the fields of zone (or only of the transferred ones) """
+    for label, path, include_path, node in _iter_fields(zone, self.labels, is_part):
+      if transferred is None or (label, include_path) in transferred:
+        self._checksums[(side, zone_path, path)] = _checksum(node[1])
+
+  def _sync(self, blocks, src_side, tgt_side, transfer):
+    """ blocks is a list of (zone_path, dist_zone, part_zones) """
+    start = time.perf_counter()
+    src_is_part = src_side == 'part'
+    # Detect the modified fields of all the blocks, and agree on them with a single allgather
+    l_modified, l_fields = dict(), dict()
+    l_nbytes = dict()
+    for zone_path, dist_zone, part_zones in blocks:
+      src_zones = part_zones if src_is_part else [dist_zone]
+      l_modified[zone_path], l_fields[zone_path] = set(), set()
+      for src_zone in src_zones:
+        src_path = f'{PT.path_head(zone_path)}/{PT.get_name(src_zone)}'
+        modified, fields, nbytes = self._check(src_side, src_path, src_zone, src_is_part)
+        l_modified[zone_path] |= modified
+        l_fields[zone_path] |= fields
+        for key, n in nbytes.items():
+          l_nbytes[(zone_path, key)] = l_nbytes.get((zone_path, key), 0) + n
+    all_modified, all_fields = zip(*self.comm.allgather((l_modified, l_fields)))
+
+    for zone_path, dist_zone, part_zones in blocks:
+      modified = set().union(*[rank_modified.get(zone_path, set()) for rank_modified in all_modified])
+      fields   = set().union(*[rank_fields.get(zone_path, set()) for rank_fields in all_fields])
+      self.n_moved   += len(modified)
+      self.n_skipped += len(fields - modified)
+      for key in fields:
+        n = l_nbytes.get((zone_path, key), 0)
+        if key in modified:
+          self.bytes_moved += n
+        else:
+          self.bytes_skipped += n
+      if modified:
+        include_dict = {label : sorted([path for _label, path in modified if _label == label]) \
+            for label in self.labels}
+        transfer(dist_zone, part_zones, self.comm, include_dict)
+
+      src_zones, tgt_zones = (part_zones, [dist_zone]) if src_is_part else ([dist_zone], part_zones)
+      for src_zone in src_zones:
+        self._update(src_side, f'{PT.path_head(zone_path)}/{PT.get_name(src_zone)}', src_zone, src_is_part)
+      for tgt_zone in tgt_zones:
+        self._update(tgt_side, f'{PT.path_head(zone_path)}/{PT.get_name(tgt_zone)}', tgt_zone,
+                     not src_is_part, modified)
+    self.time += time.perf_counter() - start
+
+  def part_to_dist(self):
+    """ Transfer the fields modified in the partitioned tree since the last
+    synchronisation to the distributed tree """
+    blocks = []
+    for zone_path, part_zones in get_parts_per_blocks(self.part_tree, self.comm).items():
+      blocks.append((zone_path, PT.get_node_from_path(self.dist_tree, zone_path), part_zones))
+    self._sync(blocks, 'part', 'dist', part_zones_to_dist_zone_only)
+
+  def dist_to_part(self):
+    """ Transfer the fields modified in the distributed tree since the last
+    synchronisation to the partitioned tree """
+    blocks = []
+    for zone_path in PT.predicates_to_paths(self.dist_tree, 'CGNSBase_t/Zone_t'):
+      part_zones = te_utils.get_partitioned_zones(self.part_tree, zone_path)
+      blocks.append((zone_path, PT.get_node_from_path(self.dist_tree, zone_path), part_zones))
+    self._sync(blocks, 'dist', 'part', dist_zone_to_part_zones_only)
+
+  def report(self):
+    """ Log, through the maia-stats logger, the number of fields and the amount of
+    data moved and skipped by the synchronisations, and an estimation of the time saved
+    (assuming a constant transfer rate). Must be called collectively. """
+    moved, skipped = self.comm.allreduce(np.array([self.bytes_moved, self.bytes_skipped]), MPI.SUM)
+    elapsed = self.comm.allreduce(self.time, MPI.MAX)
+    saved = elapsed * skipped / moved if moved > 0 else 0.
+    mlog.stat(f"Incremental transfers : {self.n_moved} fields moved ({mlog.bsize_to_str(moved)}), "
+              f"{self.n_skipped} fields skipped ({mlog.bsize_to_str(skipped)}) -- "
+              f"synchronisation time {elapsed:.3f}s, estimated time saved {saved:.3f}s")
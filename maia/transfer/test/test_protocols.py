@@ -83,6 +83,29 @@ def test_block_to_part_with_void(sub_comm):
     assert part_data["field"][i_part].dtype == np.float64
     assert (part_data["field"][i_part] == expected_part_data["field"][i_part]).all()
 
+@mark_mpi_test(2)
+def test_block_to_part_dtype_mismatch(sub_comm):
+  # Empty arrays of rank 1 are created with default dtype : fields must be grouped
+  # the same way on all the ranks
+  if sub_comm.Get_rank() == 0:
+    partial_distri = np.array([0, 3, 3])
+    ln_to_gn_list = [np.array([3,1]), np.array([2])]
+    dist_data = {'A' : np.array([1., 2., 3.]), 'I' : np.array([10, 20, 30], np.int32), 'B' : np.array([-1., -2., -3.])}
+  else:
+    partial_distri = np.array([3, 3, 3])
+    ln_to_gn_list = []
+    dist_data = {'A' : np.array([]), 'I' : np.array([]), 'B' : np.array([])}
+
+  part_data = EP.block_to_part(dist_data, partial_distri, ln_to_gn_list, sub_comm)
+  part_data_i = EP.iblock_to_part(dist_data, partial_distri, ln_to_gn_list, sub_comm).wait()
+  for data in [part_data, part_data_i]:
+    assert len(data['I']) == len(ln_to_gn_list)
+    for i_part, ln_to_gn in enumerate(ln_to_gn_list):
+      assert np.array_equal(data['A'][i_part], ln_to_gn.astype(float))
+      assert np.array_equal(data['B'][i_part], -ln_to_gn.astype(float))
+      assert data['I'][i_part].dtype == np.int32
+      assert np.array_equal(data['I'][i_part], 10*ln_to_gn)
+
 @mark_mpi_test(2)
 def test_part_to_block(sub_comm):
   part_data = dict()
@@ -145,3 +168,245 @@ def test_part_to_block_with_reduce(reduce_func, sub_comm):
   assert dist_data["field"].dtype == np.float64
   assert (dist_data["field"] == expected_dist_data["field"]).all()
 
+
+def test_reduce_multi_component():
+  dist_data = np.array([[1., 10.], [3., 30.], [2., 20.], [5., 50.]])
+  dist_stride = np.array([2, 1, 1], np.int32)
+  assert np.array_equal(EP.reduce_sum(dist_data, dist_stride), [[4., 40.], [2., 20.], [5., 50.]])
+  assert np.array_equal(EP.reduce_max(dist_data, dist_stride), [[3., 30.], [2., 20.], [5., 50.]])
+  assert np.array_equal(EP.reduce_mean(dist_data, dist_stride), [[2., 20.], [2., 20.], [5., 50.]])
+  assert np.array_equal(EP.Reduction('min')(dist_data, dist_stride), [[1., 10.], [2., 20.], [5., 50.]])
+  with pytest.raises(ValueError):
+    EP.Reduction('first')(dist_data, dist_stride)
+  with pytest.raises(ValueError):
+    EP.Reduction('max', weights=[np.ones(4)])
+
+@mark_mpi_test(2)
+@pytest.mark.parametrize("rule", ["first", "last", "mean", "sum"])
+def test_part_to_block_with_reduction(rule, sub_comm):
+  if sub_comm.Get_rank() == 0:
+    partial_distri = np.array([0, 5, 9])
+    ln_to_gn_list = [np.array([2,4,6,9])]
+    part_x = [np.array([2., 4., 6., 1000.])]
+    weights = [np.array([1., 1., 1., 3.])]
+  else:
+    partial_distri = np.array([5, 9, 9])
+    ln_to_gn_list = [np.array([9,7,5,3,1]), np.array([8]), np.array([1])]
+    part_x = [np.array([9., 7., 5., 3., 1.]), np.array([8.]), np.array([2.])]
+    weights = [np.ones(5), np.ones(1), np.array([3.])]
+  part_data = {'X' : part_x, 'Y' : [-x for x in part_x]}
+
+  # Value of gnum 1 and 9, which are the only ones received twice
+  expected = {'first' : (1., 1000.),
+              'last'  : (2., 9.),
+              'mean'  : ((1.+3*2.)/4, (3*1000.+9.)/4),
+              'sum'   : (1.+3*2., 3*1000.+9.)}[rule]
+  if sub_comm.Get_rank() == 0:
+    expected_x = np.array([expected[0], 2., 3., 4., 5.])
+  else:
+    expected_x = np.array([6., 7., 8., expected[1]])
+
+  reduction = EP.Reduction(rule, weights if rule in ['mean', 'sum'] else None)
+  dist_data = EP.part_to_block(part_data, partial_distri, ln_to_gn_list, sub_comm, reduction)
+  assert np.allclose(dist_data['X'], expected_x)
+  assert np.allclose(dist_data['Y'], -expected_x)
+  dist_x = EP.part_to_block(part_x, partial_distri, ln_to_gn_list, sub_comm, reduction)
+  assert np.allclose(dist_x, expected_x)
+
+  # Inside a TransferContext, the data prepared for the reduction is kept with the exchange object
+  prepare = reduction._prepare
+  n_prepare = []
+  reduction._prepare = lambda *args: n_prepare.append(1) or prepare(*args)
+  with EP.TransferContext(sub_comm):
+    for i in range(3):
+      dist_x = EP.part_to_block(part_x, partial_distri, ln_to_gn_list, sub_comm, reduction)
+      assert np.allclose(dist_x, expected_x)
+  assert len(n_prepare) == 1
+
+@mark_mpi_test(2)
+def test_transfer_context(sub_comm):
+  if sub_comm.Get_rank() == 0:
+    partial_distri = np.array([0, 5, 10])
+    ln_to_gn_list = [np.array([2,4,6,10])]
+    dist_data = np.array([1., 2., 3., 4., 5.])
+    expected_part_data = [np.array([2., 4., 6., 1000.])]
+  else:
+    partial_distri = np.array([5, 10, 10])
+    ln_to_gn_list = [np.array([9,7,5,3,1])]
+    dist_data = np.array([6., 7., 8., 9., 1000.])
+    expected_part_data = [np.array([9., 7., 5., 3., 1.])]
+
+  with EP.TransferContext(sub_comm) as context:
+    for i in range(3):
+      part_data = EP.block_to_part(dist_data, partial_distri, ln_to_gn_list, sub_comm)
+      assert (part_data[0] == expected_part_data[0]).all()
+    assert context.n_builds == 1 and context.n_hits == 2
+    dist_back = EP.part_to_block(part_data, partial_distri, ln_to_gn_list, sub_comm)
+    assert context.n_builds == 2 and len(context) == 2
+
+    # Numbering is modified on one rank only : object must be rebuilt everywhere
+    if sub_comm.Get_rank() == 1:
+      ln_to_gn_list[0][:] = [1,3,5,7,9]
+      expected_part_data = [np.array([1000., 9., 8., 7., 6.])]
+    part_data = EP.block_to_part(dist_data, partial_distri, ln_to_gn_list, sub_comm)
+    assert (part_data[0] == expected_part_data[0]).all()
+    assert context.n_builds == 3
+
+  # Outside of the context, nothing is cached
+  EP.block_to_part(dist_data, partial_distri, ln_to_gn_list, sub_comm)
+  assert context.n_builds == 3 and context.n_hits == 2
+
+@mark_mpi_test(2)
+def test_transfer_context_local_collision(sub_comm):
+  # Two exchanges having the same distribution, but rank 1 has no element in both :
+  # its local key is the same, while rank 0 has different ones
+  partial_distri = np.array([0, 2, 4]) if sub_comm.Get_rank() == 0 else np.array([2, 4, 4])
+  dist_data = np.array([1., 2.]) if sub_comm.Get_rank() == 0 else np.array([3., 4.])
+  if sub_comm.Get_rank() == 0:
+    ln_to_gn_lists = [[np.array([1,2])], [np.array([3,4])]]
+  else:
+    ln_to_gn_lists = [[np.empty(0, np.int32)], [np.empty(0, np.int32)]]
+
+  with EP.TransferContext(sub_comm) as context:
+    for i in range(2):
+      for ln_to_gn_list in ln_to_gn_lists:
+        part_data = EP.block_to_part(dist_data, partial_distri, ln_to_gn_list, sub_comm)
+        if sub_comm.Get_rank() == 0:
+          assert np.array_equal(part_data[0], ln_to_gn_list[0].astype(float))
+    # Rank 1 only kept the last object : objects can never be reused
+    assert context.n_hits == 0 and context.n_builds == 4
+
+@mark_mpi_test(2)
+def test_transfer_stats(sub_comm, tmp_path):
+  if sub_comm.Get_rank() == 0:
+    partial_distri = np.array([0, 5, 10])
+    ln_to_gn_list = [np.array([2,4,6,10])]
+    dist_data = np.array([1., 2., 3., 4., 5.])
+  else:
+    partial_distri = np.array([5, 10, 10])
+    ln_to_gn_list = [np.array([9,7,5,3,1])]
+    dist_data = np.array([6., 7., 8., 9., 1000.])
+
+  EP.block_to_part(dist_data, partial_distri, ln_to_gn_list, sub_comm) # Not recorded
+  with EP.TransferStats(sub_comm) as stats:
+    for i in range(2):
+      part_data = EP.block_to_part(dist_data, partial_distri, ln_to_gn_list, sub_comm)
+    EP.part_to_block(part_data, partial_distri, ln_to_gn_list, sub_comm)
+
+  assert len(stats.records) == 2
+  btp_site = [site for site in stats.records if site.startswith('block_to_part@')][0]
+  assert 'test_transfer_stats' in btp_site
+  n_calls, n_sent, n_received, _ = stats.records[btp_site]
+  assert n_calls == 2 and n_sent == 2*dist_data.nbytes
+  assert n_received == 2*sum([lngn.size for lngn in ln_to_gn_list]) * 8
+
+  gathered = stats.gather()
+  assert gathered[btp_site]['calls'] == {'min' : 2, 'max' : 2, 'sum' : 4}
+  assert gathered[btp_site]['received'] == {'min' : 64, 'max' : 80, 'sum' : 144}
+
+  stats.report()
+  filename = sub_comm.bcast(str(tmp_path / 'stats.json'), root=0)
+  stats.dump(filename)
+  if sub_comm.Get_rank() == 0:
+    import json
+    with open(filename) as f:
+      assert json.load(f)['sites'][btp_site]['sent']['sum'] == 4*dist_data.nbytes
+
+@mark_mpi_test(2)
+@pytest.mark.parametrize("packed", [False, True])
+def test_multi_fields(packed, sub_comm):
+  if sub_comm.Get_rank() == 0:
+    partial_distri = np.array([0, 3, 5])
+    ln_to_gn_list = [np.array([2,4]), np.array([5,1])]
+    dist_data = {'A' : np.array([1., 2., 3.]), 'I' : np.array([10, 20, 30], np.int32), 'B' : np.array([-1., -2., -3.])}
+  else:
+    partial_distri = np.array([3, 5, 5])
+    ln_to_gn_list = [np.array([3,4,1])]
+    dist_data = {'A' : np.array([4., 5.]), 'I' : np.array([40, 50], np.int32), 'B' : np.array([-4., -5.])}
+
+  part_data = EP.block_to_part(dist_data, partial_distri, ln_to_gn_list, sub_comm, packed=packed)
+  assert list(part_data.keys()) == ['A', 'I', 'B']
+  for i_part, ln_to_gn in enumerate(ln_to_gn_list):
+    assert np.array_equal(part_data['A'][i_part], ln_to_gn.astype(float))
+    assert np.array_equal(part_data['B'][i_part], -ln_to_gn.astype(float))
+    assert np.array_equal(part_data['I'][i_part], 10*ln_to_gn)
+    assert part_data['I'][i_part].dtype == np.int32
+    assert part_data['A'][i_part].flags.c_contiguous
+
+  dist_back = EP.part_to_block(part_data, partial_distri, ln_to_gn_list, sub_comm, packed=packed)
+  for name in dist_data:
+    assert np.array_equal(dist_back[name], dist_data[name])
+    assert dist_back[name].dtype == dist_data[name].dtype
+
+  dist_sum = EP.part_to_block(part_data, partial_distri, ln_to_gn_list, sub_comm, EP.reduce_sum, packed=packed)
+  count = np.array([2, 1, 1, 2, 1]) # Number of occurences of each gnum
+  for name in dist_data:
+    assert np.array_equal(dist_sum[name], count[partial_distri[0]:partial_distri[1]] * dist_data[name])
+
+@mark_mpi_test(2)
+@pytest.mark.parametrize("packed", [False, True])
+def test_part_to_block_structured_views(packed, sub_comm):
+  # Each rank holds a 2x2x2 structured partition, taken as a non contiguous view
+  # of a larger Fortran array. Vertices are numbered with i varying fastest
+  ln_to_gn = np.arange(1, 9) + 8*sub_comm.Get_rank()
+  partial_distri = np.array([0, 8, 16]) if sub_comm.Get_rank() == 0 else np.array([8, 16, 16])
+  full = np.zeros((3,3,3), order='F')
+  view = full[1:,1:,1:]
+  view[...] = ln_to_gn.reshape((2,2,2), order='F')
+  assert not view.flags.f_contiguous
+
+  part_data = {'X' : [view], 'Y' : [-view]}
+  dist_data = EP.part_to_block(part_data, partial_distri, [ln_to_gn], sub_comm, packed=packed)
+  expected = np.arange(partial_distri[0], partial_distri[1]) + 1.
+  assert np.array_equal(dist_data['X'], expected)
+  assert np.array_equal(dist_data['Y'], -expected)
+  assert np.array_equal(EP.part_to_block([view], partial_distri, [ln_to_gn], sub_comm), expected)
+
+@mark_mpi_test(2)
+def test_iblock_to_part(sub_comm):
+  if sub_comm.Get_rank() == 0:
+    partial_distri = np.array([0, 3, 5])
+    ln_to_gn_list = [np.array([2,4]), np.array([5,1])]
+    dist_data = {'A' : np.array([1., 2., 3.]), 'I' : np.array([10, 20, 30], np.int32), 'B' : np.array([-1., -2., -3.])}
+  else:
+    partial_distri = np.array([3, 5, 5])
+    ln_to_gn_list = [np.array([3,4,1])]
+    dist_data = {'A' : np.array([4., 5.]), 'I' : np.array([40, 50], np.int32), 'B' : np.array([-4., -5.])}
+
+  request = EP.iblock_to_part(dist_data, partial_distri, ln_to_gn_list, sub_comm)
+  single_request = EP.iblock_to_part(dist_data['A'], partial_distri, ln_to_gn_list, sub_comm)
+  part_data = request.wait()
+  part_data_A = single_request.wait()
+  for i_part, ln_to_gn in enumerate(ln_to_gn_list):
+    assert np.array_equal(part_data['A'][i_part], ln_to_gn.astype(float))
+    assert np.array_equal(part_data['B'][i_part], -ln_to_gn.astype(float))
+    assert np.array_equal(part_data['I'][i_part], 10*ln_to_gn)
+    assert np.array_equal(part_data_A[i_part], ln_to_gn.astype(float))
+
+  request = EP.ipart_to_block(part_data, partial_distri, ln_to_gn_list, sub_comm)
+  sum_request = EP.ipart_to_block(part_data, partial_distri, ln_to_gn_list, sub_comm, EP.reduce_sum)
+  dist_back = request.wait()
+  dist_sum = sum_request.wait()
+  count = np.array([2, 1, 1, 2, 1]) # Number of occurences of each gnum
+  for name in dist_data:
+    assert np.array_equal(dist_back[name], dist_data[name])
+    assert np.array_equal(dist_sum[name], count[partial_distri[0]:partial_distri[1]] * dist_data[name])
+
+@mark_mpi_test(2)
+def test_ipart_to_part(sub_comm):
+  if sub_comm.Get_rank() == 0:
+    part1_ln_to_gn_list = [np.array([2,4]), np.array([5,1])]
+    part2_ln_to_gn_list = [np.array([6,1,3])]
+  else:
+    part1_ln_to_gn_list = [np.array([3,4])]
+    part2_ln_to_gn_list = [np.array([5,4]), np.array([2])]
+  part1_data = {'A' : [gnum.astype(float) for gnum in part1_ln_to_gn_list],
+                'I' : [10*gnum.astype(np.int32) for gnum in part1_ln_to_gn_list]}
+
+  request = EP.ipart_to_part(part1_data, part1_ln_to_gn_list, part2_ln_to_gn_list, sub_comm)
+  part2_data = request.wait()
+  for i_part, ln_to_gn in enumerate(part2_ln_to_gn_list):
+    expected = np.where(ln_to_gn == 6, 0, ln_to_gn) # Gnum 6 is not known by part1
+    assert np.array_equal(part2_data['A'][i_part], expected.astype(float))
+    assert np.array_equal(part2_data['I'][i_part], 10*expected)
+    assert part2_data['I'][i_part].dtype == np.int32
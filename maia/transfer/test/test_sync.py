@@ -0,0 +1,46 @@
+import pytest
+from   pytest_mpi_check._decorator import mark_mpi_test
+import numpy as np
+
+import maia
+import maia.pytree as PT
+
+from maia.transfer import sync
+
+@mark_mpi_test(2)
+def test_transfer_sync(sub_comm):
+  dist_tree = maia.factory.generate_dist_block(4, 'Poly', sub_comm)
+  dist_zone = PT.get_all_Zone_t(dist_tree)[0]
+  n_vtx = PT.get_value(PT.get_node_from_path(dist_zone, ':CGNS#Distribution/Vertex'))
+  dn_vtx = n_vtx[1] - n_vtx[0]
+  PT.new_FlowSolution('FlowSolution', loc='Vertex', parent=dist_zone,
+      fields={'A' : np.ones(dn_vtx), 'B' : np.zeros(dn_vtx)})
+  part_tree = maia.factory.partition_dist_tree(dist_tree, sub_comm)
+  part_zones = PT.get_all_Zone_t(part_tree)
+
+  synchro = sync.TransferSync(dist_tree, part_tree, sub_comm, ['FlowSolution_t'])
+  synchro.dist_to_part() # First call transfers everything
+  assert synchro.n_moved == 2 and synchro.n_skipped == 0
+  for part_zone in part_zones:
+    assert (PT.get_node_from_path(part_zone, 'FlowSolution/A')[1] == 1.).all()
+
+  synchro.part_to_dist() # Nothing changed since last synchronisation
+  assert synchro.n_moved == 2 and synchro.n_skipped == 2
+
+  # Modify A on one rank only
+  if sub_comm.Get_rank() == 0:
+    for part_zone in part_zones:
+      PT.get_node_from_path(part_zone, 'FlowSolution/A')[1][:] = 2.
+  synchro.part_to_dist()
+  assert synchro.n_moved == 3 and synchro.n_skipped == 3
+
+  # Fields received from the partitions are not sent back
+  synchro.dist_to_part()
+  assert synchro.n_moved == 3 and synchro.n_skipped == 5
+
+  PT.get_node_from_path(dist_zone, 'FlowSolution/B')[1][:] = 3.
+  synchro.dist_to_part()
+  assert synchro.n_moved == 4 and synchro.n_skipped == 6
+  for part_zone in part_zones:
+    assert (PT.get_node_from_path(part_zone, 'FlowSolution/B')[1] == 3.).all()
+  synchro.report()
@@ -144,3 +144,51 @@ def test_exists_everywhere(sub_comm):
     trees.append(zone)
   assert utils.exists_everywhere(trees, 'ZoneBC/BCA', sub_comm) == True
   assert utils.exists_everywhere(trees, 'ZoneBC/BCB', sub_comm) == False
+
+@mark_mpi_test(3)
+def test_allgather_unique(sub_comm):
+  rank = sub_comm.Get_rank()
+  entries = {f'key{i}' : (rank, i) for i in range(rank, rank+3)}
+  gathered = utils.allgather_unique(entries, sub_comm)
+  assert gathered == [{'key0' : (0,0), 'key1' : (0,1), 'key2' : (0,2)},
+                      {'key3' : (1,3)},
+                      {'key4' : (2,4)}]
+  assert utils.allgather_unique({}, sub_comm) == [{}, {}, {}]
+
+@mark_mpi_test(3)
+def test_exists_status(sub_comm):
+  trees = []
+  if sub_comm.Get_rank() > 0:
+    zone = PT.new_Zone()
+    zbc  = PT.new_ZoneBC(parent=zone)
+    bc   = PT.new_BC('BCA', parent=zbc)
+    if sub_comm.Get_rank() > 1:
+      bc   = PT.new_BC('BCB', parent=zbc)
+    trees.append(zone)
+  status = utils.exists_status(trees, ['ZoneBC/BCA', 'ZoneBC/BCB', 'ZoneBC/BCC'], sub_comm)
+  assert status == {'ZoneBC/BCA' : (True, True), 'ZoneBC/BCB' : (True, False), 'ZoneBC/BCC' : (False, False)}
+  assert utils.exists_status(trees, [], sub_comm) == {}
+
+@mark_mpi_test(2)
+def test_bcast_tree(sub_comm):
+  if sub_comm.Get_rank() == 1:
+    tree = PT.new_CGNSTree()
+    base = PT.new_CGNSBase(parent=tree)
+    zone = PT.new_Zone('Zone', size=[[3,2,0],[3,2,0]], type='Structured', parent=base)
+    PT.new_GridCoordinates(fields={'CX' : np.ones((3,3), order='F')}, parent=zone)
+    PT.new_PointList('PointList', np.empty((2,0), np.int32, order='F'), parent=zone)
+    PT.new_node('Empty', 'UserDefinedData_t', parent=zone)
+  else:
+    tree = None
+  recv_tree = utils.bcast_tree(tree, sub_comm, root=1)
+
+  if sub_comm.Get_rank() == 1:
+    assert recv_tree is tree
+  else:
+    assert PT.get_label(recv_tree) == 'CGNSTree_t'
+    cx = PT.get_node_from_name(recv_tree, 'CX')[1]
+    assert np.array_equal(cx, np.ones((3,3))) and cx.flags.f_contiguous
+    assert PT.get_value(PT.get_node_from_name(recv_tree, 'ZoneType')) == 'Structured'
+    assert PT.get_node_from_name(recv_tree, 'PointList')[1].shape == (2,0)
+    assert PT.get_value(PT.get_node_from_name(recv_tree, 'Empty')) is None
+    assert PT.get_value(PT.get_node_from_name(recv_tree, 'Zone')).tolist() == [[3,2,0],[3,2,0]]
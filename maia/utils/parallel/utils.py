@@ -1,3 +1,4 @@
+import zlib
 from mpi4py import MPI
 import numpy as np
 
@@ -88,3 +89,153 @@ def exists_everywhere(trees, node_path, comm):
     exists_loc = exists_loc and (PT.get_node_from_path(tree, node_path) is not None)
   return comm.allreduce(exists_loc, op=MPI.LAND)
 
+def allgather_unique(entries, comm):
+  """
+  Gather on all the ranks the dictionnaries entries, keeping, for each key, only the
+  entry of the lowest rank knowing it. Keys must be str.
+  Return a list of dict (one per rank), which is the result of comm.allgather(entries)
+  once the duplicated keys have been removed.
+  Duplicates are detected using a distributed directory : each key is sent to
+  an owner rank, choosen by hashing, which selects the rank providing the value.
+  Values are thus exchanged only once, whatever the number of ranks knowing them.
+  """
+  n_rank = comm.Get_size()
+  send_keys = [[] for i in range(n_rank)]
+  for key in entries:
+    send_keys[zlib.crc32(key.encode()) % n_rank].append(key)
+  recv_keys = comm.alltoall(send_keys)
+
+  # Owner side : iterate in rank order to select the lowest rank
+  selected = set()
+  send_flags = []
+  for rank_keys in recv_keys:
+    send_flags.append([key not in selected for key in rank_keys])
+    selected.update(rank_keys)
+  recv_flags = comm.alltoall(send_flags)
+
+  kept = set()
+  for keys, flags in zip(send_keys, recv_flags):
+    kept.update([key for key, flag in zip(keys, flags) if flag])
+  return comm.allgather({key : value for key, value in entries.items() if key in kept})
+
+def exists_status(trees, node_paths, comm):
+  """
+  Batched version of exists_anywhere and exists_everywhere : return a dict mapping
+  each path of node_paths to a tuple of booleans (anywhere, everywhere).
+  Only one allreduce is done for all the paths.
+  """
+  # Pack 'exists in a tree' and 'is missing in a tree' flags : both are reduced with a MAX
+  flags = np.zeros(2*len(node_paths), np.uint8)
+  for i, node_path in enumerate(node_paths):
+    found = [PT.get_node_from_path(tree, node_path) is not None for tree in trees]
+    flags[2*i]   = any(found)
+    flags[2*i+1] = not all(found)
+  comm.Allreduce(MPI.IN_PLACE, flags, op=MPI.MAX)
+  return {node_path : (bool(flags[2*i]), not flags[2*i+1]) for i, node_path in enumerate(node_paths)}
+
+
+def _tree_to_buffers(tree):
+  """
+  Serialize a CGNS tree (or node) into 3 flat numpy arrays:
+  - strings (uint8) is the concatenation of the names, labels and dtypes of the nodes;
+  - table (int64) stores the number of nodes, then for each node (in depth first order)
+    the length of its 3 strings, its number of children and the description of its value
+    ([-1] if value is None, [ndim, is_fortran, offset, *shape] otherwise);
+  - values (uint8) stores the data of all the values, each one starting at
+    a 8 bytes aligned offset.
+  """
+  strings = []
+  table   = [0]
+  to_copy = []
+  offset  = 0
+  stack = [tree]
+  while stack:
+    name, value, children, label = stack.pop()
+    if value is None:
+      dtype_str, value_desc = '', [-1]
+    else:
+      if value.dtype.hasobject:
+        raise TypeError(f"Value of node {name} can not be serialized")
+      dtype_str, value_desc = value.dtype.str, [value.ndim, np.isfortran(value), offset, *value.shape]
+      to_copy.append((value, offset))
+      offset += -(-value.nbytes // 8) * 8 # Keep next offset aligned
+    node_strings = [name.encode(), label.encode(), dtype_str.encode()]
+    strings.extend(node_strings)
+    table.extend([len(s) for s in node_strings] + [len(children)] + value_desc)
+    table[0] += 1
+    stack.extend(children[::-1])
+
+  values = np.empty(offset, np.uint8)
+  for value, offset in to_copy:
+    order = 'F' if np.isfortran(value) else 'C'
+    values[offset:offset+value.nbytes].view(value.dtype).reshape(value.shape, order=order)[...] = value
+
+  return np.frombuffer(b''.join(strings), np.uint8).copy(), np.array(table, np.int64), values
+
+def _buffers_to_tree(strings, table, values):
+  """
+  Rebuild a CGNS tree (or node) from the buffers produced by _tree_to_buffers.
+  Values of the nodes are views on the values buffer (no copy is done).
+  """
+  table   = table.tolist()
+  strings = strings.tobytes()
+  t_pos, s_pos = 1, 0
+  root   = None
+  parents = [] # Stack of (parent node, number of children to add)
+  for i_node in range(table[0]):
+    name_len, label_len, dtype_len, n_children, ndim = table[t_pos:t_pos+5]
+    t_pos += 5
+    name  = strings[s_pos:s_pos+name_len].decode()
+    s_pos += name_len
+    label = strings[s_pos:s_pos+label_len].decode()
+    s_pos += label_len
+    dtype = strings[s_pos:s_pos+dtype_len].decode()
+    s_pos += dtype_len
+    if ndim == -1:
+      value = None
+    else:
+      is_fortran, offset = table[t_pos:t_pos+2]
+      shape = tuple(table[t_pos+2:t_pos+2+ndim])
+      t_pos += 2 + ndim
+      dtype = np.dtype(dtype)
+      nbytes = dtype.itemsize * int(np.prod(shape))
+      value = values[offset:offset+nbytes].view(dtype).reshape(shape, order='F' if is_fortran else 'C')
+
+    node = [name, value, [], label]
+    if parents:
+      parent, n_left = parents[-1]
+      parent[2].append(node)
+      if n_left == 1:
+        parents.pop()
+      else:
+        parents[-1] = (parent, n_left-1)
+    else:
+      root = node
+    if n_children > 0:
+      parents.append((node, n_children))
+  return root
+
+def bcast_tree(tree, comm, root=0):
+  """
+  Broadcast a CGNS tree (or node) from rank root to all the ranks of comm.
+  Contrary to comm.bcast, the tree is not pickled : it is serialized into
+  flat buffers, which are broadcasted as raw data. On the receiving ranks,
+  the values of the nodes are views on a single contiguous buffer.
+  Rank root returns its input tree, other ranks can use None as input.
+  """
+  if comm.Get_rank() == root:
+    buffers = _tree_to_buffers(tree)
+    sizes = np.array([buffer.size for buffer in buffers], np.int64)
+  else:
+    sizes = np.empty(3, np.int64)
+  comm.Bcast(sizes, root=root)
+
+  if comm.Get_rank() != root:
+    buffers = [np.empty(sizes[0], np.uint8), np.empty(sizes[1], np.int64), np.empty(sizes[2], np.uint8)]
+  for buffer in buffers:
+    comm.Bcast(buffer, root=root)
+
+  if comm.Get_rank() == root:
+    return tree
+  else:
+    return _buffers_to_tree(*buffers)